@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Benchmarks module.
+
+Description   : Invoke with `python -m benchmarks.<name>`
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 10:12:31 2026 +0200
+Last modified : Sa Okt 17 10:12:31 2026 +0200
+"""
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Load test of the sync and async read paths.
+
+Description   : Invoke with `python -m benchmarks.async_load`
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 11:20:13 2026 +0200
+Last modified : Sa Okt 17 11:20:13 2026 +0200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from movies_backend.crud import (
+    get_all_actors,
+    get_all_actors_async,
+    get_movie,
+    get_movie_async,
+)
+from movies_backend.database import (
+    create_db_engine,
+    get_async_db_session,
+    get_db_session,
+    init_db,
+)
+from movies_backend.models import Actor, Movie
+from movies_backend.schemas import ActorSchema, MovieSchema
+
+from .library import seed_library
+
+
+def create_bench_app() -> FastAPI:
+    """
+    Create an app serving the same reads on a sync and an async path.
+
+    Returns
+    -------
+    FastAPI
+        The benchmark app
+    """
+    app = FastAPI()
+
+    @app.get("/sync/actors", response_model=List[ActorSchema])
+    def sync_actors(db: Session = Depends(get_db_session)) -> List[Actor]:
+        return get_all_actors(db=db)
+
+    @app.get("/async/actors", response_model=List[ActorSchema])
+    async def async_actors(
+        db: AsyncSession = Depends(get_async_db_session),
+    ) -> List[Actor]:
+        return await get_all_actors_async(db=db)
+
+    @app.get("/sync/movies/{movie_id}", response_model=MovieSchema)
+    def sync_movie(
+        movie_id: int, db: Session = Depends(get_db_session)
+    ) -> Movie | None:
+        return get_movie(db=db, movie_id=movie_id, schema=MovieSchema)
+
+    @app.get("/async/movies/{movie_id}", response_model=MovieSchema)
+    async def async_movie(
+        movie_id: int, db: AsyncSession = Depends(get_async_db_session)
+    ) -> Movie | None:
+        return await get_movie_async(
+            db=db, movie_id=movie_id, schema=MovieSchema
+        )
+
+    return app
+
+
+async def load(
+    app: FastAPI, urls: List[str], concurrency: int
+) -> Dict[str, float]:
+    """
+    Request all URLs with the given number of concurrent clients.
+
+    Parameters
+    ----------
+    app : FastAPI
+        The app under test
+    urls : List[str]
+        URLs to request
+    concurrency : int
+        Number of concurrent clients
+
+    Returns
+    -------
+    Dict[str, float]
+        Requests per second, median and p99 latency in milliseconds
+    """
+    latencies: List[float] = []
+    queue = list(reversed(urls))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def worker() -> None:
+            while queue:
+                url = queue.pop()
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "req/s": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    """Compare requests/sec and latency of the sync and async paths."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as path:
+        os.environ["MM_SQLITE_PATH"] = f"{path}/bench.sqlite3"
+        engine = create_db_engine(path=os.environ["MM_SQLITE_PATH"])
+        seed_library(engine=engine, movies=args.movies)
+        engine.dispose()
+        init_db()
+        app = create_bench_app()
+        movie_ids = [rng.randint(1, args.movies) for _ in range(args.requests)]
+        print(
+            f"{args.movies} movies, {args.requests} requests,"
+            f" concurrency {args.concurrency}"
+        )
+        for endpoint in ("movies/{}", "actors"):
+            for path_type in ("sync", "async"):
+                urls = [
+                    f"/{path_type}/{endpoint.format(movie_id)}"
+                    for movie_id in movie_ids
+                ]
+                if endpoint == "actors":
+                    urls = urls[: args.requests // 10]
+                result = asyncio.run(load(app, urls, args.concurrency))
+                print(
+                    f"{path_type:>6} /{endpoint:<10}"
+                    f" {result['req/s']:9.1f} req/s"
+                    f" p50 {result['p50']:8.2f} ms"
+                    f" p99 {result['p99']:8.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Read throughput under concurrent writes per engine profile.
+
+Description   : Invoke with `python -m benchmarks.engine_profile`
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 10:14:02 2026 +0200
+Last modified : Sa Okt 17 10:14:02 2026 +0200
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from movies_backend.config import EngineProfile
+from movies_backend.crud import get_all_movies
+from movies_backend.database import create_db_engine, read_only_engine
+from movies_backend.models import Movie
+
+from .library import seed_library
+
+
+def run(
+    profile: EngineProfile, movies: int, readers: int, duration: float
+) -> Dict[str, float]:
+    """
+    Run readers against a concurrent writer.
+
+    Parameters
+    ----------
+    profile : EngineProfile
+        Engine profile
+    movies : int
+        Number of movies
+    readers : int
+        Number of reader threads
+    duration : float
+        Duration in seconds
+
+    Returns
+    -------
+    Dict[str, float]
+        Reads and writes per second, number of lock errors
+    """
+    with tempfile.TemporaryDirectory() as path:
+        engine = create_db_engine(
+            path=f"{path}/bench.sqlite3", profile=profile
+        )
+        seed_library(engine=engine, movies=movies)
+        read_engine = read_only_engine(engine)
+        counts: Dict[str, int] = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def count(key: str) -> None:
+            with lock:
+                counts[key] += 1
+
+        def reader() -> None:
+            while not stop.is_set():
+                try:
+                    with Session(read_engine) as db:
+                        get_all_movies(db=db)
+                    count("reads")
+                except OperationalError:
+                    count("locked")
+
+        def writer() -> None:
+            movie_id = 0
+            while not stop.is_set():
+                movie_id = movie_id % movies + 1
+                try:
+                    with Session(engine) as db:
+                        db.execute(
+                            update(Movie)
+                            .where(Movie.id == movie_id)
+                            .values(processed=~Movie.processed)
+                        )
+                        db.commit()
+                    count("writes")
+                except OperationalError:
+                    count("locked")
+
+        threads: List[threading.Thread] = [
+            threading.Thread(target=reader) for _ in range(readers)
+        ]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+    return {
+        "reads/s": counts["reads"] / duration,
+        "writes/s": counts["writes"] / duration,
+        "locked": counts["locked"],
+    }
+
+
+def main() -> None:
+    """Compare the default and the tuned engine profile."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+    print(
+        f"{args.movies} movies, {args.readers} readers, 1 writer,"
+        f" {args.duration}s"
+    )
+    for label, profile in (
+        ("default", EngineProfile(tuned=False)),
+        ("tuned", EngineProfile()),
+    ):
+        result = run(
+            profile=profile,
+            movies=args.movies,
+            readers=args.readers,
+            duration=args.duration,
+        )
+        print(
+            f"{label:>8}: {result['reads/s']:10.1f} reads/s"
+            f" {result['writes/s']:10.1f} writes/s"
+            f" {result['locked']:6.0f} locked"
+        )
+
+
+if __name__ == "__main__":
+    main()
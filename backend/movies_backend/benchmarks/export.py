@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Peak memory of a buffered versus a streamed catalog export.
+
+Description   : Invoke with `python -m benchmarks.export`
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 23:41:09 2026 +0200
+Last modified : Sa Okt 17 23:41:09 2026 +0200
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from movies_backend.crud import get_all_movies_async, stream_movies_async
+from movies_backend.database import create_async_db_engine, create_db_engine
+from movies_backend.export import encode_ndjson
+from movies_backend.schemas import MovieSchema
+
+from .library import seed_library
+
+
+async def _buffered(db: AsyncSession, batch_size: int) -> int:
+    movies = await get_all_movies_async(db=db, schema=MovieSchema)
+    return len(encode_ndjson(movies))
+
+
+async def _streamed(db: AsyncSession, batch_size: int) -> int:
+    size = 0
+    async for batch in stream_movies_async(db=db, batch_size=batch_size):
+        size += len(encode_ndjson(batch))
+    return size
+
+
+EXPORTS: Dict[str, Callable[[AsyncSession, int], Awaitable[int]]] = {
+    "buffered": _buffered,
+    "streamed": _streamed,
+}
+
+
+async def measure(path: str, batch_size: int) -> Dict[str, Dict[str, float]]:
+    """
+    Measure duration and peak memory of every export.
+
+    Parameters
+    ----------
+    path : str
+        Path of the sqlite database
+    batch_size : int
+        Number of movies per batch of the streamed export
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        Duration in milliseconds, peak memory in MiB and exported bytes per
+        export
+    """
+    engine = create_async_db_engine(path=path)
+    results = {}
+    for name, export in EXPORTS.items():
+        async with AsyncSession(engine) as db:
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = await export(db, batch_size)
+            duration = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        results[name] = {
+            "ms": duration * 1000,
+            "mib": peak / 1024 / 1024,
+            "bytes": size,
+        }
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    """Print duration and peak memory of buffered and streamed exports."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/bench.sqlite3"
+        engine = create_db_engine(path=path)
+        seed_library(engine=engine, movies=args.movies)
+        engine.dispose()
+        results = asyncio.run(measure(path, args.batch_size))
+    print(f"{args.movies} movies, batches of {args.batch_size}")
+    for name, result in results.items():
+        print(
+            f"{name:<9} {result['bytes'] / 1024 / 1024:7.1f} MiB exported"
+            f" {result['ms']:9.1f} ms"
+            f" peak {result['mib']:7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Synthetic movie library for benchmarks.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 11:02:45 2026 +0200
+Last modified : Sa Okt 17 11:02:45 2026 +0200
+"""
+
+import random
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from movies_backend.migrations import migrate_db
+from movies_backend.models import (
+    Actor,
+    Category,
+    Movie,
+    Series,
+    Studio,
+    movie_actors,
+    movie_categories,
+)
+
+STUDIOS = 100
+SERIES = 500
+ACTORS = 2000
+CATEGORIES = 40
+
+
+def seed_library(engine: Engine, movies: int, seed: int = 42) -> None:
+    """
+    Create the schema and insert a synthetic library.
+
+    Every movie has a studio, every fourth movie belongs to a series, and
+    movies get one to four actors and one to three categories.
+
+    Parameters
+    ----------
+    engine : Engine
+        Database engine
+    movies : int
+        Number of movies
+    seed : int
+        Random seed
+    """
+    rng = random.Random(seed)
+    migrate_db(engine=engine)
+    with Session(engine) as db:
+        db.execute(
+            insert(Studio),
+            [
+                {"name": f"Studio {i}", "sort_name": f"studio {i}"}
+                for i in range(STUDIOS)
+            ],
+        )
+        db.execute(
+            insert(Series),
+            [
+                {"name": f"Series {i}", "sort_name": f"series {i}"}
+                for i in range(SERIES)
+            ],
+        )
+        db.execute(
+            insert(Actor), [{"name": f"Actor {i}"} for i in range(ACTORS)]
+        )
+        db.execute(
+            insert(Category),
+            [{"name": f"Category {i}"} for i in range(CATEGORIES)],
+        )
+        db.execute(
+            insert(Movie),
+            [
+                {
+                    "filename": f"movie {i:06d}.mp4",
+                    "name": f"Movie {i:06d}",
+                    "sort_name": f"movie {i:06d}",
+                    "studio_id": rng.randint(1, STUDIOS),
+                    "series_id": (
+                        rng.randint(1, SERIES) if i % 4 == 0 else None
+                    ),
+                    "series_number": i % 7 + 1 if i % 4 == 0 else None,
+                    "processed": i % 3 != 0,
+                }
+                for i in range(movies)
+            ],
+        )
+        db.execute(
+            insert(movie_actors),
+            [
+                {"movie_id": movie_id, "actor_id": actor_id}
+                for movie_id in range(1, movies + 1)
+                for actor_id in rng.sample(
+                    range(1, ACTORS + 1), rng.randint(1, 4)
+                )
+            ],
+        )
+        db.execute(
+            insert(movie_categories),
+            [
+                {"movie_id": movie_id, "category_id": category_id}
+                for movie_id in range(1, movies + 1)
+                for category_id in rng.sample(
+                    range(1, CATEGORIES + 1), rng.randint(1, 3)
+                )
+            ],
+        )
+        db.commit()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Throughput of moves across filesystems per copy method.
+
+Description   : Invoke with `python -m benchmarks.move --target /mnt/other`
+
+Author        : Vadim Titov
+Created       : So Okt 18 15:20:11 2026 +0200
+Last modified : So Okt 18 15:20:11 2026 +0200
+"""
+
+import argparse
+import errno
+import os
+import tempfile
+from contextlib import ExitStack
+from typing import Dict, List
+from unittest.mock import patch
+
+from movies_backend.move import move_file
+
+METHODS: Dict[str, List[str]] = {
+    "copy_file_range": [],
+    "sendfile": ["copy_file_range"],
+    "read/write": ["copy_file_range", "sendfile"],
+}
+
+
+def _unsupported(*_: object) -> int:
+    raise OSError(errno.ENOSYS, os.strerror(errno.ENOSYS))
+
+
+def measure(
+    source: str, target: str, size: int, chunk: int
+) -> Dict[str, float]:
+    """
+    Measure the throughput of every copy method.
+
+    Parameters
+    ----------
+    source : str
+        Directory the file is moved from
+    target : str
+        Directory on another filesystem the file is moved to
+    size : int
+        Size of the file in bytes
+    chunk : int
+        Bytes copied per system call
+
+    Returns
+    -------
+    Dict[str, float]
+        Throughput in MiB/s per method
+    """
+    results = {}
+    for name, unsupported in METHODS.items():
+        src = os.path.join(source, "movie.mp4")
+        dst = os.path.join(target, "movie.mp4")
+        with open(src, "wb") as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(size // len(block)):
+                f.write(block)
+        with ExitStack() as stack:
+            for method in unsupported:
+                stack.enter_context(patch.object(os, method, _unsupported))
+            stats = move_file(src=src, dst=dst, chunk=chunk)
+        os.unlink(dst)
+        if not stats.copied:
+            raise SystemExit("Source and target are on the same filesystem")
+        results[name] = stats.bytes_per_second / 1024 / 1024
+    return results
+
+
+def main() -> None:
+    """Print the throughput of moves across filesystems per copy method."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target", default="/dev/shm")
+    parser.add_argument("--mib", type=int, default=256)
+    parser.add_argument("--chunk-mib", type=int, default=64)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as source:
+        with tempfile.TemporaryDirectory(dir=args.target) as target:
+            results = measure(
+                source=source,
+                target=target,
+                size=args.mib * 1024 * 1024,
+                chunk=args.chunk_mib * 1024 * 1024,
+            )
+    print(f"{args.mib} MiB to {args.target}, chunks of {args.chunk_mib} MiB")
+    for name, mib_per_second in results.items():
+        print(f"{name:<16} {mib_per_second:8.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
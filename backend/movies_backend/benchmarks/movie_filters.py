@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Latency of filtered movie list queries.
+
+Description   : Invoke with `python -m benchmarks.movie_filters`
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 15:05:48 2026 +0200
+Last modified : Sa Okt 17 15:05:48 2026 +0200
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import Dict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from movies_backend.crud import get_movie_rows_page_async
+from movies_backend.database import (
+    analyze_db,
+    create_async_db_engine,
+    create_db_engine,
+)
+from movies_backend.models import movie_actors
+from movies_backend.schemas import MovieFileSchema, MovieFilterSchema
+
+from .library import seed_library
+
+FILTERS = {
+    "none": MovieFilterSchema(),
+    "actor": MovieFilterSchema(actor=[7]),
+    "actors any": MovieFilterSchema(actor=[7, 8, 9]),
+    "category": MovieFilterSchema(category=[3]),
+    "categories all": MovieFilterSchema(category=[3, 4], category_match="all"),
+    "studio": MovieFilterSchema(studio=5),
+    "series": MovieFilterSchema(series=5),
+    "processed": MovieFilterSchema(processed=False),
+    "name": MovieFilterSchema(name="Movie 0123"),
+    "combined": MovieFilterSchema(
+        category=[3], studio=5, processed=True, name="movie"
+    ),
+}
+
+
+async def measure(
+    path: str, limit: int, repeat: int
+) -> Dict[str, Dict[str, float]]:
+    """
+    Measure the latency of a page of movies for every filter.
+
+    Parameters
+    ----------
+    path : str
+        Path of the sqlite database
+    limit : int
+        Page size
+    repeat : int
+        Number of queries per filter
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        Median and p95 latency in milliseconds and page length per filter
+    """
+    engine = create_async_db_engine(path=path)
+    results = {}
+    async with AsyncSession(engine) as db:
+        cast = await db.scalars(
+            select(movie_actors.c.actor_id).where(movie_actors.c.movie_id == 1)
+        )
+        filters_all = {
+            "actors all": MovieFilterSchema(
+                actor=list(cast), actor_match="all"
+            ),
+        }
+        for name, filters in {**FILTERS, **filters_all}.items():
+            latencies = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows, _, _ = await get_movie_rows_page_async(
+                    db=db, limit=limit, schema=MovieFileSchema, filters=filters
+                )
+                latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            results[name] = {
+                "p50": statistics.median(latencies) * 1000,
+                "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+                "rows": len(rows),
+            }
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    """Print the latency of a filtered page for every filter."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/bench.sqlite3"
+        engine = create_db_engine(path=path)
+        seed_library(engine=engine, movies=args.movies)
+        analyze_db(engine=engine)
+        engine.dispose()
+        results = asyncio.run(measure(path, args.limit, args.repeat))
+    print(f"{args.movies} movies, page size {args.limit}")
+    for name, result in results.items():
+        print(
+            f"{name:<15} {result['rows']:5.0f} rows"
+            f" p50 {result['p50']:7.2f} ms"
+            f" p95 {result['p95']:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Per name and batched name resolution of imports.
+
+Description   : Invoke with `python -m benchmarks.parse_files`
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 17:12:09 2026 +0200
+Last modified : Sa Okt 17 17:12:09 2026 +0200
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from movies_backend.crud import (
+    get_actor_by_name,
+    get_series_by_name,
+    get_studio_by_name,
+    parse_files_info,
+)
+from movies_backend.database import create_db_engine
+from movies_backend.util import parse_filename
+
+from .library import ACTORS, SERIES, STUDIOS, seed_library
+
+
+def generate_filenames(files: int, seed: int = 0) -> List[str]:
+    """
+    Generate import filenames naming existing and new properties.
+
+    Parameters
+    ----------
+    files : int
+        Number of filenames
+    seed : int
+        Random seed
+
+    Returns
+    -------
+    List[str]
+        The filenames
+    """
+    rng = random.Random(seed)
+    filenames = []
+    for i in range(files):
+        actors = ", ".join(
+            f"Actor {rng.randint(0, ACTORS + 100)}"
+            for _ in range(rng.randint(1, 4))
+        )
+        filename = f"[Studio {rng.randint(0, STUDIOS + 10)}] "
+        if i % 2 == 0:
+            filename += f"{{Series {rng.randint(0, SERIES)} {i % 5 + 1}}} "
+        filenames.append(f"{filename}Import {i:06d} ({actors}).mp4")
+    return filenames
+
+
+def resolve_per_name(db: Session, filename: str) -> object:
+    """
+    Resolve the names of a file one query per name, like imports used to.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    filename : str
+        The filename
+
+    Returns
+    -------
+    object
+        Movie name, studio, series, series number and actors
+    """
+    name, studio_name, series_name, series_number, actor_names = (
+        parse_filename(filename=filename)
+    )
+    studio = (
+        get_studio_by_name(db=db, studio_name=studio_name)
+        if studio_name is not None
+        else None
+    )
+    series = (
+        get_series_by_name(db=db, series_name=series_name)
+        if series_name is not None
+        else None
+    )
+    actors = [
+        get_actor_by_name(db=db, actor_name=actor_name)
+        for actor_name in (actor_names.split(", ") if actor_names else [])
+    ]
+    return name, studio, series, series_number, actors
+
+
+def measure(
+    engine: Engine, resolve: Callable[[Session], object]
+) -> Dict[str, float]:
+    """
+    Measure the time and number of statements of a resolver.
+
+    Parameters
+    ----------
+    engine : Engine
+        Database engine
+    resolve : Callable[[Session], object]
+        Resolver called with a session
+
+    Returns
+    -------
+    Dict[str, float]
+        Time in milliseconds and number of statements
+    """
+    statements = []
+
+    def count(*_) -> None:
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    with Session(engine) as db:
+        start = time.perf_counter()
+        resolve(db)
+        elapsed = time.perf_counter() - start
+    event.remove(engine, "before_cursor_execute", count)
+    return {"ms": elapsed * 1000, "statements": len(statements)}
+
+
+def main() -> None:
+    """Compare the per name and the batched resolver."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=1000)
+    parser.add_argument("--files", type=int, default=2000)
+    args = parser.parse_args()
+    filenames = generate_filenames(files=args.files)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(path=f"{directory}/bench.sqlite3")
+        seed_library(engine=engine, movies=args.movies)
+        results = {
+            "per name": measure(
+                engine,
+                lambda db: [
+                    resolve_per_name(db=db, filename=filename)
+                    for filename in filenames
+                ],
+            ),
+            "batched": measure(
+                engine,
+                lambda db: parse_files_info(db=db, filenames=filenames),
+            ),
+        }
+        engine.dispose()
+    print(f"{args.files} files")
+    for name, result in results.items():
+        print(
+            f"{name:<9} {result['ms']:9.1f} ms"
+            f" {result['statements']:6.0f} statements"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Memory and latency of movie entities versus projections.
+
+Description   : Invoke with `python -m benchmarks.projection`
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 22:31:44 2026 +0200
+Last modified : Sa Okt 17 22:31:44 2026 +0200
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from movies_backend.crud import (
+    get_all_movie_rows_async,
+    get_all_movies_async,
+    get_movie_rows_page_async,
+)
+from movies_backend.database import create_async_db_engine, create_db_engine
+from movies_backend.schemas import MovieFileSchema
+
+from .library import seed_library
+
+
+async def _entities(db: AsyncSession) -> Sequence[Any]:
+    return await get_all_movies_async(db=db, schema=MovieFileSchema)
+
+
+async def _rows(db: AsyncSession) -> Sequence[Any]:
+    return await get_all_movie_rows_async(db=db, schema=MovieFileSchema)
+
+
+async def _rows_page(db: AsyncSession) -> Sequence[Any]:
+    rows, _, _ = await get_movie_rows_page_async(
+        db=db, limit=1000, schema=MovieFileSchema
+    )
+    return rows
+
+
+QUERIES: Dict[str, Callable[[AsyncSession], Awaitable[Sequence[Any]]]] = {
+    "list entities": _entities,
+    "list rows": _rows,
+    "page rows": _rows_page,
+}
+
+
+async def measure(path: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Measure latency and peak memory of every query.
+
+    Parameters
+    ----------
+    path : str
+        Path of the sqlite database
+    repeat : int
+        Number of timed queries per query
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        Median latency in milliseconds, peak memory in MiB and number of
+        rows per query
+    """
+    engine = create_async_db_engine(path=path)
+    results = {}
+    async with AsyncSession(engine) as db:
+        for name, query in QUERIES.items():
+            durations = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows = await query(db)
+                durations.append(time.perf_counter() - start)
+                del rows
+                db.expunge_all()
+            # Traced separately, tracing slows allocations down
+            tracemalloc.start()
+            rows = await query(db)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = {
+                "ms": statistics.median(durations) * 1000,
+                "mib": peak / 1024 / 1024,
+                "rows": len(rows),
+            }
+            del rows
+            db.expunge_all()
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    """Print latency and peak memory of entity and projection queries."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/bench.sqlite3"
+        engine = create_db_engine(path=path)
+        seed_library(engine=engine, movies=args.movies)
+        engine.dispose()
+        results = asyncio.run(measure(path, args.repeat))
+    print(f"{args.movies} movies")
+    for name, result in results.items():
+        print(
+            f"{name:<14} {result['rows']:7.0f} rows"
+            f" {result['ms']:8.2f} ms"
+            f" peak {result['mib']:7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
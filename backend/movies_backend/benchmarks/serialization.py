@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Throughput of the movie and actor list serialization.
+
+Description   : Invoke with `python -m benchmarks.serialization`
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 21:55:20 2026 +0200
+Last modified : Sa Okt 17 21:55:20 2026 +0200
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Type
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from movies_backend.crud import (
+    get_all_actors_async,
+    get_all_movie_rows_async,
+    get_all_movies_async,
+    get_all_property_rows_async,
+)
+from movies_backend.database import create_async_db_engine, create_db_engine
+from movies_backend.models import Actor
+from movies_backend.schemas import ActorSchema, MovieFileSchema
+from movies_backend.serialization import encode_rows
+
+from .library import seed_library
+
+
+def _model_path(
+    schema: Type[BaseModel], load: Callable[[AsyncSession], Awaitable[Any]]
+) -> Callable[[AsyncSession], Awaitable[bytes]]:
+    # What FastAPI does with a response model: validate, then dump
+    adapter: TypeAdapter[List[Any]] = TypeAdapter(
+        List[schema]  # type: ignore[valid-type]
+    )
+
+    async def encode(db: AsyncSession) -> bytes:
+        rows = await load(db)
+        return adapter.dump_json(
+            adapter.validate_python(rows, from_attributes=True)
+        )
+
+    return encode
+
+
+def _fast_path(
+    schema: Type[BaseModel], load: Callable[[AsyncSession], Awaitable[Any]]
+) -> Callable[[AsyncSession], Awaitable[bytes]]:
+    async def encode(db: AsyncSession) -> bytes:
+        return encode_rows(schema=schema, rows=await load(db))
+
+    return encode
+
+
+PATHS = {
+    "movies model": _model_path(
+        MovieFileSchema,
+        lambda db: get_all_movies_async(db=db, schema=MovieFileSchema),
+    ),
+    "movies fast": _fast_path(
+        MovieFileSchema,
+        lambda db: get_all_movie_rows_async(db=db, schema=MovieFileSchema),
+    ),
+    "actors model": _model_path(
+        ActorSchema, lambda db: get_all_actors_async(db=db)
+    ),
+    "actors fast": _fast_path(
+        ActorSchema,
+        lambda db: get_all_property_rows_async(
+            db=db, model=Actor, schema=ActorSchema
+        ),
+    ),
+}
+
+
+async def measure(path: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Measure the time to load and encode the lists on every path.
+
+    Parameters
+    ----------
+    path : str
+        Path of the sqlite database
+    repeat : int
+        Number of encodings per path
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        Median time in milliseconds, rows per second and size per path
+    """
+    engine = create_async_db_engine(path=path)
+    results = {}
+    async with AsyncSession(engine) as db:
+        for name, encode in PATHS.items():
+            durations = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                body = await encode(db)
+                durations.append(time.perf_counter() - start)
+                db.expunge_all()
+            rows = body.count(b'{"id":')
+            median = statistics.median(durations)
+            results[name] = {
+                "ms": median * 1000,
+                "rows_per_second": rows / median,
+                "rows": rows,
+                "bytes": len(body),
+            }
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    """Print the serialization throughput of the list endpoints."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/bench.sqlite3"
+        engine = create_db_engine(path=path)
+        seed_library(engine=engine, movies=args.movies)
+        engine.dispose()
+        results = asyncio.run(measure(path, args.repeat))
+    print(f"{args.movies} movies")
+    for name, result in results.items():
+        print(
+            f"{name:<13} {result['rows']:7.0f} rows"
+            f" {result['bytes'] / 1024:8.0f} KiB"
+            f" {result['ms']:8.2f} ms"
+            f" {result['rows_per_second']:11.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
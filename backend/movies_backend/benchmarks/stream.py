@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Throughput of concurrent movie file streams.
+
+Description   : Invoke with `python -m benchmarks.stream`
+
+Author        : Vadim Titov
+Created       : So Okt 18 16:31:52 2026 +0200
+Last modified : So Okt 18 16:31:52 2026 +0200
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+import uvicorn
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from movies_backend import create_app
+from movies_backend.database import create_db_engine, init_db
+from movies_backend.models import Movie
+
+from .library import seed_library
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def prepare(directory: str, size: int) -> None:
+    """
+    Create a library with one movie and its file.
+
+    Parameters
+    ----------
+    directory : str
+        The database directory
+    size : int
+        Size of the movie file in bytes
+    """
+    engine = create_db_engine(path=f"{directory}/sqlite.db")
+    seed_library(engine=engine, movies=1)
+    with Session(engine) as db:
+        filename = db.scalars(select(Movie.filename)).one()
+    engine.dispose()
+    os.mkdir(f"{directory}/movies")
+    with open(f"{directory}/movies/{filename}", "wb") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size // len(block)):
+            f.write(block)
+
+
+async def _download(client: httpx.AsyncClient, url: str) -> int:
+    size = 0
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_raw():
+            size += len(chunk)
+    return size
+
+
+async def _streams(url: str, concurrency: int, rounds: int) -> float:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=None) as client:
+        start = time.perf_counter()
+        sizes = await asyncio.gather(
+            *(_download(client, url) for _ in range(concurrency * rounds))
+        )
+        duration = time.perf_counter() - start
+    return sum(sizes) / duration / 1024 / 1024
+
+
+def measure(
+    url: str, chunks: List[int], concurrency: List[int], rounds: int
+) -> Dict[int, Dict[int, float]]:
+    """
+    Measure the throughput of concurrent streams per chunk size.
+
+    Parameters
+    ----------
+    url : str
+        URL of the movie stream
+    chunks : List[int]
+        Bytes read per chunk
+    concurrency : List[int]
+        Numbers of concurrent streams
+    rounds : int
+        Streams per connection
+
+    Returns
+    -------
+    Dict[int, Dict[int, float]]
+        Throughput in MiB/s per chunk size and number of streams
+    """
+    results: Dict[int, Dict[int, float]] = {}
+    for chunk in chunks:
+        os.environ["MM_STREAM_CHUNK_BYTES"] = str(chunk)
+        results[chunk] = {
+            streams: asyncio.run(_streams(url, streams, rounds))
+            for streams in concurrency
+        }
+    return results
+
+
+def main() -> None:
+    """Print the throughput of concurrent movie file streams."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mib", type=int, default=256)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, nargs="+")
+    args = parser.parse_args()
+    concurrency = args.concurrency or [1, 4, 16]
+    with tempfile.TemporaryDirectory() as directory:
+        prepare(directory=directory, size=args.mib * 1024 * 1024)
+        os.environ["MM_DB_PATH"] = directory
+        init_db()
+        port = _free_port()
+        server = uvicorn.Server(
+            uvicorn.Config(
+                create_app(), port=port, log_level="warning", lifespan="off"
+            )
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        try:
+            results = measure(
+                url=f"http://127.0.0.1:{port}/movies/1/stream",
+                chunks=[64 * 1024, 1024 * 1024],
+                concurrency=concurrency,
+                rounds=args.rounds,
+            )
+        finally:
+            server.should_exit = True
+            thread.join()
+    print(f"{args.mib} MiB file, {args.rounds} streams per connection")
+    for chunk, throughput in results.items():
+        for streams, mib_per_second in throughput.items():
+            print(
+                f"chunk {chunk // 1024:5d} KiB {streams:3d} streams"
+                f" {mib_per_second:8.1f} MiB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
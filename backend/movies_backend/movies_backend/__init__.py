@@ -11,19 +11,56 @@ Last modified : Di Nov 05 16:02:08 2024 +0100
 
 __version__ = "1.0.90"
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .config import get_watch_imports
 from .routes import (
     actors,
+    cache,
     categories,
+    export,
+    jobs,
     movie_actor,
     movie_category,
     movies,
     root,
+    search,
     series,
     studios,
 )
+from .watcher import create_import_watcher
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """
+    Run the background services of the application.
+
+    The imports directory watcher is started if MM_WATCH_IMPORTS is set.
+
+    Parameters
+    ----------
+    _ : FastAPI
+        FastAPI application
+
+    Yields
+    ------
+    None
+        While the application is running
+    """
+    if not get_watch_imports():
+        yield
+        return
+    watcher = create_import_watcher()
+    watcher.start()
+    try:
+        yield
+    finally:
+        watcher.stop()
 
 
 def create_app() -> FastAPI:
@@ -46,6 +83,7 @@ def create_app() -> FastAPI:
             "name": "MIT",
             "url": "https://opensource.org/licenses/MIT",
         },
+        lifespan=lifespan,
     )
     app.add_middleware(
         CORSMiddleware,
@@ -54,13 +92,18 @@ def create_app() -> FastAPI:
         ),
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor", "X-Prev-Cursor"],
     )
     app.include_router(root.router)
     app.include_router(actors.router)
+    app.include_router(cache.router)
     app.include_router(categories.router)
+    app.include_router(export.router)
+    app.include_router(jobs.router)
     app.include_router(movie_actor.router)
     app.include_router(movie_category.router)
     app.include_router(movies.router)
+    app.include_router(search.router)
     app.include_router(series.router)
     app.include_router(studios.router)
     return app
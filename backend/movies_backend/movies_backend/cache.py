@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Property list cache and movie list snapshot.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 19:12:40 2026 +0200
+Last modified : Sa Okt 17 21:40:52 2026 +0200
+
+The lists of actors, categories, series and studios are requested on
+nearly every page but change rarely. Every request reads the change
+counters of the tables it depends on, which triggers bump in the database
+on every committed change. A cached list is only served if it was loaded
+under the same counters, so every worker sees the changes of every other
+worker. The complete movie list is kept as encoded JSON, keyed by the
+counters of the tables it is built from.
+"""
+
+import gzip
+from dataclasses import dataclass
+from threading import Lock
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from anyio import to_thread
+
+T = TypeVar("T")
+
+# Nearly the size of level 9 in a fraction of its time
+GZIP_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """
+    Cache statistics.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups served from the cache
+    misses : int
+        Number of lookups that loaded from the database
+    """
+
+    hits: int
+    misses: int
+
+
+class PropertyCache:
+    """
+    In-process cache of property lists, keyed by table name and counters.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups served from the cache
+    misses : int
+        Number of lookups that loaded from the database
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._generation = 0
+        self._entries: Dict[str, Tuple[Tuple[int, ...], Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        """Drop all cached lists and reset the statistics."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Get the cache statistics.
+
+        Returns
+        -------
+        CacheStats
+            The statistics
+        """
+        with self._lock:
+            return CacheStats(hits=self.hits, misses=self.misses)
+
+    async def get_or_load(
+        self,
+        table: str,
+        versions: Tuple[int, ...],
+        load: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Get the list of a table, loading it on a miss.
+
+        The counters must be read before the list is loaded, so a list
+        stored under them is never older than they are. A list loaded
+        while the cache was cleared is not stored.
+
+        Parameters
+        ----------
+        table : str
+            Name of the table
+        versions : Tuple[int, ...]
+            Change counters the list depends on, read by this request
+        load : Callable[[], Awaitable[T]]
+            Loads the list from the database
+
+        Returns
+        -------
+        T
+            The list, which must not be modified
+        """
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(table)
+            if entry is not None and entry[0] == versions:
+                self.hits += 1
+                return cast(T, entry[1])
+            self.misses += 1
+        items = await load()
+        with self._lock:
+            if self._generation == generation:
+                self._entries[table] = (versions, items)
+        return items
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Encoded response.
+
+    Attributes
+    ----------
+    versions : Tuple[int, ...]
+        Change counters the response was built from
+    etag : str
+        Entity tag of the response
+    body : bytes
+        Encoded response
+    body_gzip : Optional[bytes]
+        Gzipped response, if it is kept
+    """
+
+    versions: Tuple[int, ...]
+    etag: str
+    body: bytes
+    body_gzip: Optional[bytes] = None
+
+    @property
+    def size(self) -> int:
+        """
+        Get the memory held by the snapshot.
+
+        Returns
+        -------
+        int
+            Size of the encoded and gzipped response in bytes
+        """
+        return len(self.body) + len(self.body_gzip or b"")
+
+
+@dataclass(frozen=True)
+class SnapshotStats:
+    """
+    Snapshot statistics.
+
+    Attributes
+    ----------
+    hits : int
+        Number of responses served from the snapshot
+    misses : int
+        Number of responses that were encoded again
+    size : int
+        Memory held by the snapshot in bytes
+    """
+
+    hits: int
+    misses: int
+    size: int
+
+
+def _compress(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class ResponseSnapshot:
+    """Pre-encoded response, rebuilt lazily after its tables changed."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._generation = 0
+        self._snapshot: Optional[Snapshot] = None
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> SnapshotStats:
+        """
+        Get the snapshot statistics.
+
+        Returns
+        -------
+        SnapshotStats
+            The statistics
+        """
+        with self._lock:
+            return SnapshotStats(
+                hits=self.hits,
+                misses=self.misses,
+                size=0 if self._snapshot is None else self._snapshot.size,
+            )
+
+    def clear(self) -> None:
+        """Drop the snapshot and reset the statistics."""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+            self.hits = 0
+            self.misses = 0
+
+    async def get_or_build(
+        self,
+        versions: Tuple[int, ...],
+        build: Callable[[], Awaitable[bytes]],
+        etag: str,
+        max_size: int,
+        compress: bool,
+    ) -> Snapshot:
+        """
+        Get the snapshot, building it if its tables changed.
+
+        A snapshot larger than the maximum size is returned but not kept,
+        so the memory held never exceeds it. Only a body that may be kept
+        is gzipped, in a worker thread.
+
+        Parameters
+        ----------
+        versions : Tuple[int, ...]
+            Change counters the response depends on, read by this request
+            before the response is built
+        build : Callable[[], Awaitable[bytes]]
+            Loads and encodes the response
+        etag : str
+            Entity tag of the response, derived from the counters
+        max_size : int
+            Maximum memory the snapshot may hold in bytes
+        compress : bool
+            Whether to keep a gzipped copy as well
+
+        Returns
+        -------
+        Snapshot
+            The snapshot
+        """
+        with self._lock:
+            generation = self._generation
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.versions == versions:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+        body = await build()
+        body_gzip = None
+        if compress and len(body) <= max_size:
+            body_gzip = await to_thread.run_sync(_compress, body)
+        snapshot = Snapshot(
+            versions=versions, etag=etag, body=body, body_gzip=body_gzip
+        )
+        with self._lock:
+            if snapshot.size > max_size:
+                self._snapshot = None
+            elif self._generation == generation:
+                self._snapshot = snapshot
+        return snapshot
+
+
+PROPERTY_CACHE = PropertyCache()
+MOVIE_LIST_SNAPSHOT = ResponseSnapshot()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Cascade renames of actors, series and studios to movies.
+
+Description   : Renaming a property renames every movie file named after
+                it. The filename changes are planned and checked for
+                collisions first, then the database is committed once and
+                finally the files are renamed and relinked by a bounded
+                thread pool. Files that fail to move get their database
+                filename reverted, so database and disk stay consistent.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 18:03:44 2026 +0200
+Last modified : Sa Okt 17 18:03:44 2026 +0200
+"""
+
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .config import get_cascade_workers, get_logger
+from .crud import loader_options
+from .exceptions import DuplicateEntryException, PathException
+from .models import Actor, Movie, Series, Studio
+from .schemas import MovieSchema
+from .util import (
+    MovieLinks,
+    PathType,
+    generate_movie_filename,
+    generate_sort_name,
+    get_movie_links,
+    get_movie_path,
+    move_movie_links,
+    rename_link_dir,
+)
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class FileRename:
+    """
+    Planned rename of a movie file.
+
+    Attributes
+    ----------
+    movie_id : int
+        Movie ID
+    filename_current : str
+        Current filename
+    filename_new : str
+        New filename
+    links : MovieLinks
+        Link directories of the movie after the rename
+    """
+
+    movie_id: int
+    filename_current: str
+    filename_new: str
+    links: MovieLinks
+
+
+@dataclass
+class CascadeReport:
+    """
+    Outcome of a cascade rename.
+
+    Attributes
+    ----------
+    renamed : List[Tuple[str, str, float]]
+        Current and new filename and seconds taken per renamed file
+    failed : List[Tuple[str, str]]
+        Filename and error per file that could not be renamed
+    seconds : float
+        Seconds taken by the whole cascade
+    """
+
+    renamed: List[Tuple[str, str, float]] = field(default_factory=list)
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def plan_cascade(movies: List[Movie]) -> List[FileRename]:
+    """
+    Plan the file renames of movies and check them for collisions.
+
+    Parameters
+    ----------
+    movies : List[Movie]
+        Movies with their properties already renamed
+
+    Returns
+    -------
+    List[FileRename]
+        The renames of the movies whose filename changes
+    """
+    plan = [
+        FileRename(
+            movie_id=movie.id,
+            filename_current=movie.filename,
+            filename_new=filename,
+            links=get_movie_links(movie=movie),
+        )
+        for movie in movies
+        if (filename := generate_movie_filename(movie=movie)) != movie.filename
+    ]
+    counts = Counter(entry.filename_new for entry in plan)
+    current = {entry.filename_current for entry in plan}
+    path_base = get_movie_path(PathType.MOVIE)
+    collisions = sorted(
+        entry.filename_new
+        for entry in plan
+        if counts[entry.filename_new] > 1
+        or entry.filename_new in current
+        or os.path.lexists(f"{path_base}/{entry.filename_new}")
+    )
+    if collisions:
+        raise PathException(
+            f"Renaming conflicts with existing files {collisions}"
+        )
+    return plan
+
+
+def _move(entry: FileRename) -> float:
+    start = time.perf_counter()
+    move_movie_links(
+        entry.filename_current, entry.links, entry.filename_new, entry.links
+    )
+    return time.perf_counter() - start
+
+
+def run_cascade(
+    plan: List[FileRename], workers: Optional[int] = None
+) -> CascadeReport:
+    """
+    Rename and relink the planned files with a bounded thread pool.
+
+    Parameters
+    ----------
+    plan : List[FileRename]
+        The planned renames
+    workers : Optional[int]
+        Number of threads, read from the environment if not given
+
+    Returns
+    -------
+    CascadeReport
+        The renamed and failed files
+    """
+    report = CascadeReport()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(
+        max_workers=workers or get_cascade_workers()
+    ) as pool:
+        futures = {pool.submit(_move, entry): entry for entry in plan}
+        for done, future in enumerate(as_completed(futures), start=1):
+            entry = futures[future]
+            try:
+                seconds = future.result()
+            except PathException as e:
+                report.failed.append((entry.filename_current, repr(e)))
+                logger.error(
+                    "Failed to rename %s (%d/%d): %s",
+                    entry.filename_current,
+                    done,
+                    len(plan),
+                    repr(e),
+                )
+                continue
+            report.renamed.append(
+                (entry.filename_current, entry.filename_new, seconds)
+            )
+            logger.info(
+                "Renamed %s -> %s in %.1f ms (%d/%d)",
+                entry.filename_current,
+                entry.filename_new,
+                seconds * 1000,
+                done,
+                len(plan),
+            )
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def cascade_rename(
+    db: Session,
+    entity: Actor | Series | Studio,
+    name: str,
+    workers: Optional[int] = None,
+) -> CascadeReport:
+    """
+    Rename an actor, series or studio and every movie file named after it.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    entity : Actor | Series | Studio
+        The actor, series or studio
+    name : str
+        The new name
+    workers : Optional[int]
+        Number of threads renaming files, read from the environment if not
+        given
+
+    Returns
+    -------
+    CascadeReport
+        The renamed and failed files
+    """
+    start = time.perf_counter()
+    if isinstance(entity, Actor):
+        path_type = PathType.ACTOR
+        criterion = Movie.actors.any(Actor.id == entity.id)
+    elif isinstance(entity, Series):
+        path_type = PathType.SERIES
+        criterion = Movie.series_id == entity.id
+    else:
+        path_type = PathType.STUDIO
+        criterion = Movie.studio_id == entity.id
+    name_current = entity.name or ""
+    conflict = (
+        f"Renaming {path_type.value} {name_current} -> {name} conflicts"
+        " with existing"
+    )
+    entity.name = name
+    if not isinstance(entity, Actor):
+        entity.sort_name = generate_sort_name(name=name)
+    try:
+        # The actors of the movies are loaded ordered by the new name
+        db.flush()
+    except IntegrityError as e:
+        db.rollback()
+        raise DuplicateEntryException(conflict) from e
+    movies = list(
+        db.scalars(
+            select(Movie)
+            .where(criterion)
+            .options(*loader_options(model=Movie, schema=MovieSchema))
+        ).unique()
+    )
+    try:
+        plan = plan_cascade(movies=movies)
+    except PathException:
+        db.rollback()
+        raise
+    movies_by_id = {movie.id: movie for movie in movies}
+    for entry in plan:
+        movies_by_id[entry.movie_id].filename = entry.filename_new
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise DuplicateEntryException(conflict) from e
+    try:
+        rename_link_dir(
+            path_type=path_type, name_current=name_current, name_new=name
+        )
+    except PathException:
+        _revert(db=db, entity=entity, name=name_current, plan=plan)
+        raise
+    report = run_cascade(plan=plan, workers=workers)
+    if report.failed:
+        # Only files that were not moved get their old filename back
+        failed = {filename for filename, _ in report.failed}
+        path_base = get_movie_path(PathType.MOVIE)
+        _revert(
+            db=db,
+            entity=None,
+            name=name_current,
+            plan=[
+                entry
+                for entry in plan
+                if entry.filename_current in failed
+                and not os.path.lexists(f"{path_base}/{entry.filename_new}")
+            ],
+        )
+    report.seconds = time.perf_counter() - start
+    logger.info(
+        "Renamed %s %s -> %s with %d files in %.2f s, %d failed",
+        path_type.value,
+        name_current,
+        name,
+        len(report.renamed),
+        report.seconds,
+        len(report.failed),
+    )
+    return report
+
+
+def _revert(
+    db: Session,
+    entity: Actor | Series | Studio | None,
+    name: str,
+    plan: List[FileRename],
+) -> None:
+    if entity is not None:
+        entity.name = name
+        if not isinstance(entity, Actor):
+            entity.sort_name = generate_sort_name(name=name)
+    for entry in plan:
+        db.execute(
+            update(Movie)
+            .where(Movie.id == entry.movie_id)
+            .values(filename=entry.filename_current)
+        )
+    db.commit()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Database change counters.
+
+Description   : Triggers count the changes of every table in the
+                change_counters table and of every movie in its revision
+                column, including changes of its actors and categories.
+                The counters live in the database, so every worker sees the
+                same values and can derive entity tags from them without
+                loading the data.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 20:24:51 2026 +0200
+Last modified : Sa Okt 17 20:24:51 2026 +0200
+"""
+
+from typing import Dict, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CHANGES_TABLE = "change_counters"
+CHANGES_TABLES = (
+    "actors",
+    "categories",
+    "movie_actors",
+    "movie_categories",
+    "movies",
+    "series",
+    "studios",
+)
+
+# Columns of a movie that change its detail, revision itself excluded
+_MOVIE_COLUMNS = (
+    "filename, name, sort_name, series_id, series_number, studio_id, processed"
+)
+_MEDIA_COLUMNS = "duration, width, height, codec, bitrate"
+
+
+def create_change_counters(connection: Connection) -> None:
+    """
+    Create the change counters and the triggers maintaining them.
+
+    Parameters
+    ----------
+    connection : Connection
+        Database connection
+    """
+    connection.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} ("
+        " name VARCHAR(255) NOT NULL PRIMARY KEY,"
+        " version INTEGER NOT NULL DEFAULT 0)"
+    )
+    for table in CHANGES_TABLES:
+        connection.exec_driver_sql(
+            f"INSERT OR IGNORE INTO {CHANGES_TABLE} (name) VALUES ('{table}')"
+        )
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_changes_"
+                f"{event.lower()} AFTER {event} ON {table} BEGIN"
+                f" UPDATE {CHANGES_TABLE} SET version = version + 1"
+                f" WHERE name = '{table}'; END"
+            )
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movies_revision_update"
+        f" AFTER UPDATE OF {_MOVIE_COLUMNS} ON movies BEGIN"
+        " UPDATE movies SET revision = revision + 1 WHERE id = NEW.id; END"
+    )
+    for table in ("movie_actors", "movie_categories"):
+        for event, row in (("INSERT", "NEW"), ("DELETE", "OLD")):
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_revision_"
+                f"{event.lower()} AFTER {event} ON {table} BEGIN"
+                " UPDATE movies SET revision = revision + 1"
+                f" WHERE id = {row}.movie_id; END"
+            )
+
+
+def count_media_revisions(connection: Connection) -> None:
+    """
+    Count the changes of the media metadata in the movie revisions.
+
+    Parameters
+    ----------
+    connection : Connection
+        Database connection
+    """
+    connection.exec_driver_sql("DROP TRIGGER IF EXISTS movies_revision_update")
+    connection.exec_driver_sql(
+        "CREATE TRIGGER movies_revision_update AFTER UPDATE OF"
+        f" {_MOVIE_COLUMNS}, {_MEDIA_COLUMNS} ON movies BEGIN"
+        " UPDATE movies SET revision = revision + 1 WHERE id = NEW.id; END"
+    )
+
+
+def seed_movie_revisions(connection: Connection) -> None:
+    """
+    Start the revision of an inserted movie at the movies change counter.
+
+    SQLite reuses the ID of the last movie once it was deleted. Every
+    change of a revision also changes the counter, so a movie with a
+    reused ID starts above every revision its predecessor had.
+
+    Parameters
+    ----------
+    connection : Connection
+        Database connection
+    """
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movies_revision_insert"
+        " AFTER INSERT ON movies BEGIN UPDATE movies SET revision ="
+        f" (SELECT version FROM {CHANGES_TABLE} WHERE name = 'movies')"
+        " WHERE id = NEW.id; END"
+    )
+
+
+async def get_change_counters_async(
+    db: AsyncSession, tables: Tuple[str, ...]
+) -> Tuple[int, ...]:
+    """
+    Get the change counters of tables.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    tables : Tuple[str, ...]
+        Names of the tables
+
+    Returns
+    -------
+    Tuple[int, ...]
+        The counters in the order of the tables
+    """
+    rows = await db.execute(text(f"SELECT name, version FROM {CHANGES_TABLE}"))
+    versions: Dict[str, int] = {name: version for name, version in rows}
+    return tuple(versions.get(table, 0) for table in tables)
+
+
+async def get_movie_revision_async(
+    db: AsyncSession, movie_id: int, tables: Tuple[str, ...]
+) -> Tuple[int, ...] | None:
+    """
+    Get the revision of a movie and the change counters of tables.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    movie_id : int
+        The movie ID
+    tables : Tuple[str, ...]
+        Names of the tables
+
+    Returns
+    -------
+    Tuple[int, ...] | None
+        The revision followed by the counters, or None if the movie does
+        not exist
+    """
+    columns = ", ".join(
+        f"(SELECT version FROM {CHANGES_TABLE} WHERE name = '{table}')"
+        for table in tables
+    )
+    row = (
+        await db.execute(
+            text(f"SELECT revision, {columns} FROM movies WHERE id = :id"),
+            {"id": movie_id},
+        )
+    ).first()
+    return None if row is None else tuple(row)
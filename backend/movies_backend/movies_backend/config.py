@@ -11,12 +11,107 @@ Last modified : Mo Okt 14 19:33:38 2024 +0200
 
 import os
 import sys
+from dataclasses import dataclass
 from logging import Logger, getLogger
 from logging.config import dictConfig
+from typing import List
 
 import yaml
 
 DEFAULT_DB_PATH = "./../db"
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_PAGE_SIZE = 1000
+DEFAULT_CASCADE_WORKERS = 4
+DEFAULT_SNAPSHOT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_EXPORT_BATCH_SIZE = 500
+DEFAULT_IMPORT_BATCH_SIZE = 100
+DEFAULT_WATCH_SETTLE_SECONDS = 5.0
+DEFAULT_WATCH_POLL_SECONDS = 2.0
+DEFAULT_MOVE_CHUNK_BYTES = 64 * 1024 * 1024
+DEFAULT_MOVE_WORKERS = 2
+DEFAULT_STREAM_CHUNK_BYTES = 1024 * 1024
+DEFAULT_HASH_WORKERS = 4
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass(frozen=True)
+class EngineProfile:
+    """
+    SQLite engine profile.
+
+    Attributes
+    ----------
+    tuned : bool
+        Whether the tuning pragmas are applied to new connections
+    journal_mode : str
+        Journal mode, WAL lets readers and a writer run concurrently
+    synchronous : str
+        Synchronous mode, NORMAL is safe in WAL mode
+    mmap_size : int
+        Memory mapped I/O size in bytes
+    cache_size : int
+        Page cache size, negative values are in KiB
+    temp_store : str
+        Storage of temporary tables and indices
+    busy_timeout : int
+        Time in milliseconds to wait for a lock before failing
+    pool_size : int
+        Number of pooled connections
+    max_overflow : int
+        Number of connections allowed on top of the pool size
+    """
+
+    tuned: bool = True
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 268435456
+    cache_size: int = -65536
+    temp_store: str = "MEMORY"
+    busy_timeout: int = 5000
+    pool_size: int = 20
+    max_overflow: int = 20
+
+    def pragmas(self) -> List[str]:
+        """
+        Get the pragma statements of the profile.
+
+        Returns
+        -------
+        List[str]
+            The pragma statements, empty if the profile is not tuned.
+        """
+        if not self.tuned:
+            return []
+        return [
+            f"PRAGMA journal_mode={self.journal_mode};",
+            f"PRAGMA synchronous={self.synchronous};",
+            f"PRAGMA mmap_size={self.mmap_size};",
+            f"PRAGMA cache_size={self.cache_size};",
+            f"PRAGMA temp_store={self.temp_store};",
+            f"PRAGMA busy_timeout={self.busy_timeout};",
+        ]
+
+
+def getenv_bool(name: str, default: bool) -> bool:
+    """
+    Get a boolean from an environment variable.
+
+    Parameters
+    ----------
+    name : str
+        Name of the environment variable
+    default : bool
+        Value used if the variable is not set
+
+    Returns
+    -------
+    bool
+        False for ``0``, ``false``, ``no`` and ``off``, True otherwise.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
 
 
 def get_db_path() -> str:
@@ -46,6 +141,267 @@ def get_sqlite_path() -> str:
     return f"{get_db_path()}/sqlite.db"
 
 
+def get_engine_profile() -> EngineProfile:
+    """
+    Get the SQLite engine profile.
+
+    Every setting can be overridden with an ``MM_SQLITE_*`` or ``MM_DB_*``
+    environment variable, ``MM_SQLITE_TUNED=0`` disables the pragmas.
+
+    Returns
+    -------
+    EngineProfile
+        The engine profile.
+    """
+    default = EngineProfile()
+    return EngineProfile(
+        tuned=getenv_bool("MM_SQLITE_TUNED", default.tuned),
+        journal_mode=os.getenv("MM_SQLITE_JOURNAL_MODE", default.journal_mode),
+        synchronous=os.getenv("MM_SQLITE_SYNCHRONOUS", default.synchronous),
+        mmap_size=int(os.getenv("MM_SQLITE_MMAP_SIZE", default.mmap_size)),
+        cache_size=int(os.getenv("MM_SQLITE_CACHE_SIZE", default.cache_size)),
+        temp_store=os.getenv("MM_SQLITE_TEMP_STORE", default.temp_store),
+        busy_timeout=int(
+            os.getenv("MM_SQLITE_BUSY_TIMEOUT", default.busy_timeout)
+        ),
+        pool_size=int(os.getenv("MM_DB_POOL_SIZE", default.pool_size)),
+        max_overflow=int(
+            os.getenv("MM_DB_MAX_OVERFLOW", default.max_overflow)
+        ),
+    )
+
+
+def get_page_size() -> int:
+    """
+    Get the default page size of paginated lists.
+
+    Returns
+    -------
+    int
+        The page size.
+    """
+    return int(os.getenv("MM_PAGE_SIZE", str(DEFAULT_PAGE_SIZE)))
+
+
+def get_max_page_size() -> int:
+    """
+    Get the maximum page size of paginated lists.
+
+    Returns
+    -------
+    int
+        The maximum page size.
+    """
+    return int(os.getenv("MM_MAX_PAGE_SIZE", str(DEFAULT_MAX_PAGE_SIZE)))
+
+
+def get_cascade_workers() -> int:
+    """
+    Get the number of threads renaming files after a property rename.
+
+    Returns
+    -------
+    int
+        The number of threads.
+    """
+    return max(
+        1, int(os.getenv("MM_CASCADE_WORKERS", str(DEFAULT_CASCADE_WORKERS)))
+    )
+
+
+def get_snapshot_max_bytes() -> int:
+    """
+    Get the maximum size of the pre-serialized movie list.
+
+    Returns
+    -------
+    int
+        The maximum size in bytes, 0 disables the snapshot.
+    """
+    return max(
+        0,
+        int(
+            os.getenv("MM_SNAPSHOT_MAX_BYTES", str(DEFAULT_SNAPSHOT_MAX_BYTES))
+        ),
+    )
+
+
+def get_snapshot_gzip() -> bool:
+    """
+    Get whether the pre-serialized movie list is also kept gzipped.
+
+    Returns
+    -------
+    bool
+        True if the gzipped snapshot is kept.
+    """
+    return getenv_bool("MM_SNAPSHOT_GZIP", True)
+
+
+def get_fast_json() -> bool:
+    """
+    Get whether flat lists are encoded straight from query rows.
+
+    Returns
+    -------
+    bool
+        True if the fast serialization path is used.
+    """
+    return getenv_bool("MM_FAST_JSON", False)
+
+
+def get_export_batch_size() -> int:
+    """
+    Get the number of movies fetched per batch of a catalog export.
+
+    Returns
+    -------
+    int
+        The batch size.
+    """
+    return max(
+        1,
+        int(os.getenv("MM_EXPORT_BATCH_SIZE", str(DEFAULT_EXPORT_BATCH_SIZE))),
+    )
+
+
+def get_import_batch_size() -> int:
+    """
+    Get the number of files imported per transaction.
+
+    Returns
+    -------
+    int
+        The batch size.
+    """
+    return max(
+        1,
+        int(os.getenv("MM_IMPORT_BATCH_SIZE", str(DEFAULT_IMPORT_BATCH_SIZE))),
+    )
+
+
+def get_watch_imports() -> bool:
+    """
+    Get whether new files of the imports directory are imported
+    automatically.
+
+    Returns
+    -------
+    bool
+        True if the imports directory is watched.
+    """
+    return getenv_bool("MM_WATCH_IMPORTS", False)
+
+
+def get_watch_settle_seconds() -> float:
+    """
+    Get how long a new file must keep its size before it is imported.
+
+    Returns
+    -------
+    float
+        The time in seconds.
+    """
+    return max(
+        0.0,
+        float(
+            os.getenv(
+                "MM_WATCH_SETTLE_SECONDS", str(DEFAULT_WATCH_SETTLE_SECONDS)
+            )
+        ),
+    )
+
+
+def get_watch_poll_seconds() -> float:
+    """
+    Get the interval of the imports directory watcher.
+
+    New files are checked for a stable size at this interval, and the
+    directory is listed at it if inotify is not available.
+
+    Returns
+    -------
+    float
+        The interval in seconds.
+    """
+    return max(
+        0.01,
+        float(
+            os.getenv("MM_WATCH_POLL_SECONDS", str(DEFAULT_WATCH_POLL_SECONDS))
+        ),
+    )
+
+
+def get_move_chunk_bytes() -> int:
+    """
+    Get the number of bytes copied per system call when a movie file moves
+    to another filesystem.
+
+    Returns
+    -------
+    int
+        The chunk size in bytes.
+    """
+    return max(
+        4096,
+        int(os.getenv("MM_MOVE_CHUNK_BYTES", str(DEFAULT_MOVE_CHUNK_BYTES))),
+    )
+
+
+def get_move_workers() -> int:
+    """
+    Get the number of threads moving the files of an import.
+
+    Returns
+    -------
+    int
+        The number of threads.
+    """
+    return max(1, int(os.getenv("MM_MOVE_WORKERS", str(DEFAULT_MOVE_WORKERS))))
+
+
+def get_stream_chunk_bytes() -> int:
+    """
+    Get the number of bytes read per chunk when a movie file is streamed.
+
+    Returns
+    -------
+    int
+        The chunk size in bytes.
+    """
+    return max(
+        4096,
+        int(
+            os.getenv("MM_STREAM_CHUNK_BYTES", str(DEFAULT_STREAM_CHUNK_BYTES))
+        ),
+    )
+
+
+def get_hash_workers() -> int:
+    """
+    Get the number of threads hashing movie files.
+
+    Returns
+    -------
+    int
+        The number of threads.
+    """
+    return max(1, int(os.getenv("MM_HASH_WORKERS", str(DEFAULT_HASH_WORKERS))))
+
+
+def get_import_skip_duplicates() -> bool:
+    """
+    Get whether the import skips files whose content is already in the
+    library, instead of importing and flagging them.
+
+    Returns
+    -------
+    bool
+        Whether duplicates are skipped.
+    """
+    return getenv_bool("MM_IMPORT_SKIP_DUPLICATES", False)
+
+
 def get_log_config() -> str:
     """
     Get the log config path.
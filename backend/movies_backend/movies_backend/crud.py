@@ -9,20 +9,79 @@ Created       : Mo Sep 23 17:31:46 2024 +0200
 Last modified : Do Okt 03 15:33:07 2024 +0200
 """
 
-from typing import List, Optional, Tuple
+from dataclasses import asdict
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    get_args,
+)
 
+from pydantic import BaseModel
+from sqlalchemy import (
+    CompoundSelect,
+    Select,
+    Table,
+    false,
+    func,
+    inspect,
+    literal,
+    select,
+    text,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.strategy_options import _AbstractLoad
 
 from .exceptions import (
     DuplicateEntryException,
     IntegrityConstraintException,
     InvalidIDException,
+    PathException,
+)
+from .models import (
+    Actor,
+    Category,
+    Movie,
+    Series,
+    Studio,
+    TableBase,
+    movie_actors,
+    movie_categories,
+)
+from .pagination import MovieCursor, MovieKey
+from .probe import MediaInfo
+from .schemas import (
+    MovieBatchSchema,
+    MovieFilterSchema,
+    MovieSchema,
+    MovieUpdateSchema,
+    SearchResultSchema,
+)
+from .search import (
+    SEARCH_KINDS,
+    SEARCH_TABLE,
+    SEARCH_WEIGHTS,
+    match_expression,
 )
-from .models import Actor, Category, Movie, Series, Studio
-from .schemas import MovieUpdateSchema
 from .util import (
+    MovieLinks,
+    PathType,
+    generate_movie_filename,
     generate_sort_name,
+    get_movie_links,
+    move_movie_links,
     parse_filename,
     remove_movie,
     rename_movie_file,
@@ -32,6 +91,175 @@ from .util import (
     update_studio_link,
 )
 
+# Stays below the host parameter limit of old sqlite versions
+NAME_BATCH_SIZE = 500
+
+_K = TypeVar("_K", bound=MovieKey)
+_TP = TypeVar("_TP", bound=Tuple[Any, ...])
+
+
+def _nested_schema(annotation: Any) -> Optional[Type[BaseModel]]:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        schema = _nested_schema(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+def loader_options(
+    model: Type[TableBase], schema: Optional[Type[BaseModel]]
+) -> List[_AbstractLoad]:
+    """
+    Get the loader options needed to render a model with a schema.
+
+    Every relationship that is a field of the schema is eager loaded,
+    collections with a SELECT ... IN and scalars with a JOIN, so rendering
+    the schema does not emit a lazy load per row.
+
+    Parameters
+    ----------
+    model : Type[TableBase]
+        The model class
+    schema : Optional[Type[BaseModel]]
+        The response schema, nothing is eager loaded if None
+
+    Returns
+    -------
+    List[_AbstractLoad]
+        The loader options
+    """
+    if schema is None:
+        return []
+    relationships = inspect(model).relationships
+    options: List[_AbstractLoad] = []
+    for name, field in schema.model_fields.items():
+        if name not in relationships:
+            continue
+        relationship = relationships[name]
+        strategy = selectinload if relationship.uselist else joinedload
+        option = strategy(getattr(model, name))
+        nested = loader_options(
+            model=relationship.mapper.class_,
+            schema=_nested_schema(field.annotation),
+        )
+        if nested:
+            option = option.options(*nested)
+        options.append(option)
+    return options
+
+
+def _select_all_actors() -> Select[Tuple[Actor]]:
+    return select(Actor).order_by(Actor.name)
+
+
+def _select_all_categories() -> Select[Tuple[Category]]:
+    return select(Category).order_by(Category.name)
+
+
+_MOVIE_LIST_ORDER = (
+    Movie.processed,
+    Movie.studio_sort_name,
+    Movie.series_sort_name,
+    Movie.sort_name,
+    Movie.id,
+)
+
+
+def _select_movie_ids(
+    association: Table, column: str, ids: List[int], match_all: bool
+) -> Select[Tuple[int]]:
+    statement = select(association.c.movie_id).where(
+        association.c[column].in_(ids)
+    )
+    if match_all:
+        statement = statement.group_by(association.c.movie_id).having(
+            func.count() == len(ids)
+        )
+    return statement
+
+
+def _filter_movies(
+    statement: Select[_TP], filters: MovieFilterSchema
+) -> Select[_TP]:
+    if filters.actor:
+        statement = statement.where(
+            Movie.id.in_(
+                _select_movie_ids(
+                    association=movie_actors,
+                    column="actor_id",
+                    ids=sorted(set(filters.actor)),
+                    match_all=filters.actor_match == "all",
+                )
+            )
+        )
+    if filters.category:
+        statement = statement.where(
+            Movie.id.in_(
+                _select_movie_ids(
+                    association=movie_categories,
+                    column="category_id",
+                    ids=sorted(set(filters.category)),
+                    match_all=filters.category_match == "all",
+                )
+            )
+        )
+    if filters.studio is not None:
+        statement = statement.where(Movie.studio_id == filters.studio)
+    if filters.series is not None:
+        statement = statement.where(Movie.series_id == filters.series)
+    if filters.processed is not None:
+        statement = statement.where(Movie.processed == filters.processed)
+    if filters.name is None:
+        return statement
+    prefix = generate_sort_name(filters.name)
+    if not prefix:
+        # Only articles or characters sort names drop, no movie matches
+        return statement.where(false())
+    # Sort names only hold [a-z0-9 ], so bumping the last character
+    # gives the exclusive upper bound of the prefix range.
+    return statement.where(
+        Movie.sort_name >= prefix,
+        Movie.sort_name < prefix[:-1] + chr(ord(prefix[-1]) + 1),
+    )
+
+
+def _select_all_movies(
+    schema: Optional[Type[BaseModel]] = None,
+    filters: Optional[MovieFilterSchema] = None,
+) -> Select[Tuple[Movie]]:
+    statement = (
+        select(Movie)
+        .order_by(*_MOVIE_LIST_ORDER)
+        .options(*loader_options(model=Movie, schema=schema))
+    )
+    if filters is not None:
+        statement = _filter_movies(statement=statement, filters=filters)
+    return statement
+
+
+def _schema_columns(model: Any, schema: Type[BaseModel]) -> List[Any]:
+    return [getattr(model, field) for field in schema.model_fields]
+
+
+def _select_movie(
+    movie_id: int, schema: Optional[Type[BaseModel]] = None
+) -> Select[Tuple[Movie]]:
+    return (
+        select(Movie)
+        .where(Movie.id == movie_id)
+        .options(*loader_options(model=Movie, schema=schema))
+    )
+
+
+def _select_all_series() -> Select[Tuple[Series]]:
+    return select(Series).order_by(Series.name)
+
+
+def _select_all_studios() -> Select[Tuple[Studio]]:
+    return select(Studio).order_by(Studio.name)
+
 
 def add_actor(
     db: Session,
@@ -92,6 +320,36 @@ def add_category(
 
 
 # pylint: disable=too-many-arguments
+def _new_movie(
+    filename: str,
+    name: str,
+    studio_id: Optional[int] = None,
+    series_id: Optional[int] = None,
+    series_number: Optional[int] = None,
+    actors: Optional[List[Actor]] = None,
+    categories: Optional[List[Category]] = None,
+    processed: Optional[bool] = False,
+    fingerprint: Optional[str] = None,
+    media: Optional[MediaInfo] = None,
+) -> Movie:
+    movie = Movie(
+        filename=filename,
+        name=name,
+        sort_name=generate_sort_name(name),
+        studio_id=studio_id,
+        series_id=series_id,
+        series_number=series_number,
+        processed=processed,
+        fingerprint=fingerprint,
+        **(asdict(media) if media is not None else {}),
+    )
+    if actors is not None:
+        movie.actors = actors
+    if categories is not None:
+        movie.categories = categories
+    return movie
+
+
 def add_movie(
     db: Session,
     filename: str,
@@ -132,19 +390,16 @@ def add_movie(
     Movie
         The added movie, or None if the movie could not be added.
     """
-    movie = Movie(
+    movie = _new_movie(
         filename=filename,
         name=name,
-        sort_name=generate_sort_name(name),
         studio_id=studio_id,
         series_id=series_id,
         series_number=series_number,
+        actors=actors,
+        categories=categories,
         processed=processed,
     )
-    if actors is not None:
-        movie.actors = actors
-    if categories is not None:
-        movie.categories = categories
     try:
         db.add(movie)
         db.commit()
@@ -154,6 +409,70 @@ def add_movie(
     return movie
 
 
+def stage_movie(
+    db: Session,
+    filename: str,
+    name: str,
+    studio_id: Optional[int] = None,
+    series_id: Optional[int] = None,
+    series_number: Optional[int] = None,
+    actors: Optional[List[Actor]] = None,
+    fingerprint: Optional[str] = None,
+    media: Optional[MediaInfo] = None,
+) -> Movie:
+    """
+    Add a movie to the current transaction without committing it.
+
+    The movie is flushed in a savepoint, so a duplicate only rolls back
+    the savepoint and the rest of the transaction stays intact. The caller
+    commits the transaction.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    filename : str
+        Name of the file
+    name : str
+        Name of the movie
+    studio_id : Optional[int]
+        Studio ID
+    series_id : Optional[int]
+        Series ID
+    series_number : Optional[int]
+        Series number
+    actors : Optional[List[Actor]]
+        Actors
+    fingerprint : Optional[str]
+        Content fingerprint of the file
+    media : Optional[MediaInfo]
+        Media metadata of the file
+
+    Returns
+    -------
+    Movie
+        The added movie
+    """
+    try:
+        # Built inside the savepoint, so its rollback also expires the
+        # movie collections of the actors
+        with db.begin_nested():
+            movie = _new_movie(
+                filename=filename,
+                name=name,
+                studio_id=studio_id,
+                series_id=series_id,
+                series_number=series_number,
+                actors=actors,
+                fingerprint=fingerprint,
+                media=media,
+            )
+            db.add(movie)
+    except IntegrityError as e:
+        raise DuplicateEntryException(f"Movie {name} already exists") from e
+    return movie
+
+
 def add_series(
     db: Session,
     name: str,
@@ -232,7 +551,7 @@ def add_movie_category(
     Tuple[Movie, Category]
         The updated movie and category
     """
-    movie = get_movie(db=db, movie_id=movie_id)
+    movie = get_movie(db=db, movie_id=movie_id, schema=MovieSchema)
     if movie is None:
         raise InvalidIDException(f"Movie ID {movie_id} does not exist")
     category = get_category(db=db, category_id=category_id)
@@ -274,7 +593,7 @@ def add_movie_actor(
     Tuple[Movie, Actor]
         The updated movie and actor
     """
-    movie = get_movie(db=db, movie_id=movie_id)
+    movie = get_movie(db=db, movie_id=movie_id, schema=MovieSchema)
     if movie is None:
         raise InvalidIDException(f"Movie ID {movie_id} does not exist")
     actor = get_actor(db=db, actor_id=actor_id)
@@ -311,7 +630,24 @@ def get_all_actors(db: Session) -> List[Actor]:
     List[Actor]
         List of all actors
     """
-    return db.query(Actor).order_by(Actor.name).all()
+    return list(db.scalars(_select_all_actors()).all())
+
+
+async def get_all_actors_async(db: AsyncSession) -> List[Actor]:
+    """
+    Get all actors from the database.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+
+    Returns
+    -------
+    List[Actor]
+        List of all actors
+    """
+    return list((await db.scalars(_select_all_actors())).all())
 
 
 def get_actor(db: Session, actor_id: int) -> Actor | None:
@@ -366,7 +702,24 @@ def get_all_categories(db: Session) -> List[Category]:
     List[Category]
         List of all categories
     """
-    return db.query(Category).order_by(Category.name).all()
+    return list(db.scalars(_select_all_categories()).all())
+
+
+async def get_all_categories_async(db: AsyncSession) -> List[Category]:
+    """
+    Get all categories from the database.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+
+    Returns
+    -------
+    List[Category]
+        List of all categories
+    """
+    return list((await db.scalars(_select_all_categories())).all())
 
 
 def get_category(db: Session, category_id: int) -> Category | None:
@@ -407,7 +760,11 @@ def get_category_by_name(db: Session, category_name: str) -> Category | None:
     return db.query(Category).filter(Category.name == category_name).first()
 
 
-def get_all_movies(db: Session) -> List[Movie]:
+def get_all_movies(
+    db: Session,
+    schema: Optional[Type[BaseModel]] = None,
+    filters: Optional[MovieFilterSchema] = None,
+) -> List[Movie]:
     """
     Get all movies from the database.
 
@@ -415,29 +772,255 @@ def get_all_movies(db: Session) -> List[Movie]:
     ----------
     db : Session
         Database session
+    schema : Optional[Type[BaseModel]]
+        Schema the movies are rendered with, its relationships are eager
+        loaded
+    filters : Optional[MovieFilterSchema]
+        Filters the movies must match
 
     Returns
     -------
     List[Movie]
         List of all movies
     """
-    return (
-        db.query(Movie)
-        .outerjoin(Studio)
-        .outerjoin(Series)
-        .order_by(
-            Movie.processed,
-            Studio.sort_name,
-            Series.sort_name,
-            Movie.sort_name,
-        )
+    return list(
+        db.scalars(_select_all_movies(schema=schema, filters=filters))
+        .unique()
         .all()
     )
 
 
+async def get_all_movies_async(
+    db: AsyncSession,
+    schema: Optional[Type[BaseModel]] = None,
+    filters: Optional[MovieFilterSchema] = None,
+) -> List[Movie]:
+    """
+    Get all movies from the database.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    schema : Optional[Type[BaseModel]]
+        Schema the movies are rendered with, its relationships are eager
+        loaded
+    filters : Optional[MovieFilterSchema]
+        Filters the movies must match
+
+    Returns
+    -------
+    List[Movie]
+        List of all movies
+    """
+    statement = _select_all_movies(schema=schema, filters=filters)
+    return list((await db.scalars(statement)).unique().all())
+
+
+async def stream_movies_async(
+    db: AsyncSession, batch_size: int, schema: Type[BaseModel] = MovieSchema
+) -> AsyncIterator[List[Movie]]:
+    """
+    Stream all movies from the database in batches.
+
+    The movies are read through a server-side cursor with ``yield_per``,
+    the relationships of every batch are eager loaded by one SELECT ... IN
+    per collection. The movies of a batch are expunged from the session
+    once the next one is requested, and their properties are only weakly
+    referenced by it, so memory does not grow with the number of movies. All
+    batches are read in one transaction and form a consistent snapshot.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    batch_size : int
+        Number of movies per batch
+    schema : Type[BaseModel]
+        Schema the movies are rendered with, its relationships are eager
+        loaded
+
+    Yields
+    ------
+    List[Movie]
+        The next batch of movies in list order
+    """
+    statement = _select_all_movies(schema=schema).execution_options(
+        yield_per=batch_size
+    )
+    result = await db.stream_scalars(statement)
+    try:
+        async for batch in result.partitions():
+            movies = list(batch)
+            yield movies
+            for movie in movies:
+                db.expunge(movie)
+    finally:
+        await result.close()
+
+
+def _seek_movies(
+    statement: Select[_TP], cursor: Optional[MovieCursor]
+) -> Select[_TP]:
+    if cursor is None:
+        return statement
+    key = tuple_(*_MOVIE_LIST_ORDER)
+    position = tuple_(
+        *(
+            literal(value, column.type)
+            for column, value in zip(_MOVIE_LIST_ORDER, cursor.key)
+        )
+    )
+    if not cursor.backward:
+        return statement.where(key > position)
+    return (
+        statement.where(key < position)
+        .order_by(None)
+        .order_by(*(column.desc() for column in _MOVIE_LIST_ORDER))
+    )
+
+
+def _page(
+    items: List[_K], limit: int, cursor: Optional[MovieCursor]
+) -> Tuple[List[_K], Optional[MovieCursor], Optional[MovieCursor]]:
+    backward = cursor is not None and cursor.backward
+    more = len(items) > limit
+    items = items[:limit]
+    if backward:
+        items.reverse()
+    if not items:
+        return items, None, None
+    prev_cursor = None
+    next_cursor = None
+    if cursor is not None and (more or not backward):
+        prev_cursor = MovieCursor.from_movie(items[0], backward=True)
+    if more or backward:
+        next_cursor = MovieCursor.from_movie(items[-1])
+    return items, prev_cursor, next_cursor
+
+
+def _select_movie_rows(
+    schema: Type[BaseModel],
+    filters: Optional[MovieFilterSchema],
+    keys: bool = False,
+) -> Select[Any]:
+    # Pages also need the list order columns for their cursors
+    statement = select(
+        *_schema_columns(model=Movie, schema=schema),
+        *(
+            column
+            for column in _MOVIE_LIST_ORDER
+            if keys and column.key not in schema.model_fields
+        ),
+    ).order_by(*_MOVIE_LIST_ORDER)
+    if filters is not None:
+        statement = _filter_movies(statement=statement, filters=filters)
+    return statement
+
+
+async def get_all_movie_rows_async(
+    db: AsyncSession,
+    schema: Type[BaseModel],
+    filters: Optional[MovieFilterSchema] = None,
+) -> Sequence[Row[Any]]:
+    """
+    Get the columns of a flat schema of all movies from the database.
+
+    Only the columns are selected, so no movie is loaded into the identity
+    map.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    schema : Type[BaseModel]
+        Flat schema, every field must be a column of the movies
+    filters : Optional[MovieFilterSchema]
+        Filters the movies must match
+
+    Returns
+    -------
+    Sequence[Row[Any]]
+        The rows in list order
+    """
+    statement = _select_movie_rows(schema=schema, filters=filters)
+    return (await db.execute(statement)).all()
+
+
+async def get_movie_rows_page_async(
+    db: AsyncSession,
+    limit: int,
+    schema: Type[BaseModel],
+    cursor: Optional[MovieCursor] = None,
+    filters: Optional[MovieFilterSchema] = None,
+) -> Tuple[List[Row[Any]], Optional[MovieCursor], Optional[MovieCursor]]:
+    """
+    Get the columns of a flat schema of a page of movies from the database.
+
+    The rows start with the fields of the schema and also hold the list
+    order columns the cursors are made of.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    limit : int
+        Maximum number of movies on the page
+    schema : Type[BaseModel]
+        Flat schema, every field must be a column of the movies
+    cursor : Optional[MovieCursor]
+        Position to continue from, the first page if None
+    filters : Optional[MovieFilterSchema]
+        Filters the movies must match
+
+    Returns
+    -------
+    Tuple[List[Row[Any]], Optional[MovieCursor], Optional[MovieCursor]]
+        The rows, the cursor of the previous and of the next page
+    """
+    statement = _seek_movies(
+        statement=_select_movie_rows(
+            schema=schema, filters=filters, keys=True
+        ),
+        cursor=cursor,
+    )
+    rows = list((await db.execute(statement.limit(limit + 1))).all())
+    return _page(items=rows, limit=limit, cursor=cursor)
+
+
+async def get_all_property_rows_async(
+    db: AsyncSession,
+    model: Type[Actor] | Type[Category] | Type[Series] | Type[Studio],
+    schema: Type[BaseModel],
+) -> Sequence[Tuple[Any, ...]]:
+    """
+    Get the columns of a flat schema of all actors, categories, series or
+    studios from the database.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    model : Type[Actor] | Type[Category] | Type[Series] | Type[Studio]
+        Model of the property
+    schema : Type[BaseModel]
+        Flat schema, every field must be a column of the model
+
+    Returns
+    -------
+    Sequence[Tuple[Any, ...]]
+        The rows ordered by name, their values in the order of the fields
+    """
+    statement = select(*_schema_columns(model=model, schema=schema)).order_by(
+        model.name
+    )
+    return (await db.execute(statement)).tuples().all()
+
+
 def get_movie(
     db: Session,
     movie_id: int,
+    schema: Optional[Type[BaseModel]] = None,
 ) -> Movie | None:
     """
     Get movie.
@@ -448,13 +1031,68 @@ def get_movie(
         The movie ID.
     db : Session
         Database session
+    schema : Optional[Type[BaseModel]]
+        Schema the movie is rendered with, its relationships are eager
+        loaded
 
     Returns
     -------
     Movie | None
         The movie or None if it does not exist
     """
-    return db.query(Movie).filter(Movie.id == movie_id).first()
+    return db.scalars(_select_movie(movie_id=movie_id, schema=schema)).first()
+
+
+async def get_movie_async(
+    db: AsyncSession,
+    movie_id: int,
+    schema: Optional[Type[BaseModel]] = None,
+) -> Movie | None:
+    """
+    Get movie.
+
+    Lazy loading is not available on an async session, so the schema must
+    list every relationship that is accessed.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    movie_id : int
+        The movie ID.
+    schema : Optional[Type[BaseModel]]
+        Schema the movie is rendered with, its relationships are eager
+        loaded
+
+    Returns
+    -------
+    Movie | None
+        The movie or None if it does not exist
+    """
+    return (
+        await db.scalars(_select_movie(movie_id=movie_id, schema=schema))
+    ).first()
+
+
+async def get_movie_filename_async(
+    db: AsyncSession, movie_id: int
+) -> str | None:
+    """
+    Get the filename of a movie without loading the movie.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    movie_id : int
+        The movie ID.
+
+    Returns
+    -------
+    str | None
+        The filename or None if the movie does not exist
+    """
+    return await db.scalar(select(Movie.filename).where(Movie.id == movie_id))
 
 
 def get_all_series(db: Session) -> List[Series]:
@@ -471,7 +1109,24 @@ def get_all_series(db: Session) -> List[Series]:
     List[Series]
         List of all series
     """
-    return db.query(Series).order_by(Series.name).all()
+    return list(db.scalars(_select_all_series()).all())
+
+
+async def get_all_series_async(db: AsyncSession) -> List[Series]:
+    """
+    Get all series from the database.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+
+    Returns
+    -------
+    List[Series]
+        List of all series
+    """
+    return list((await db.scalars(_select_all_series())).all())
 
 
 def get_series(db: Session, series_id: int | None) -> Series | None:
@@ -526,7 +1181,24 @@ def get_all_studios(db: Session) -> List[Studio]:
     List[Studio]
         List of all studios
     """
-    return db.query(Studio).order_by(Studio.name).all()
+    return list(db.scalars(_select_all_studios()).all())
+
+
+async def get_all_studios_async(db: AsyncSession) -> List[Studio]:
+    """
+    Get all studios from the database.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+
+    Returns
+    -------
+    List[Studio]
+        List of all studios
+    """
+    return list((await db.scalars(_select_all_studios())).all())
 
 
 def get_studio(db: Session, studio_id: int | None) -> Studio | None:
@@ -723,7 +1395,7 @@ def update_movie(db: Session, movie_id: int, data: MovieUpdateSchema) -> Movie:
     Movie
         The updated movie
     """
-    movie = get_movie(db=db, movie_id=movie_id)
+    movie = get_movie(db=db, movie_id=movie_id, schema=MovieSchema)
     if movie is None:
         raise InvalidIDException(f"Movie ID {movie_id} does not exist")
     movie.processed = True
@@ -762,6 +1434,125 @@ def update_movie(db: Session, movie_id: int, data: MovieUpdateSchema) -> Movie:
     return movie
 
 
+def _select_movies(
+    movie_ids: List[int], schema: Optional[Type[BaseModel]] = None
+) -> Select[Tuple[Movie]]:
+    return (
+        select(Movie)
+        .where(Movie.id.in_(movie_ids))
+        .options(*loader_options(model=Movie, schema=schema))
+    )
+
+
+def _get_by_ids(db: Session, model: Any, ids: List[int]) -> Dict[int, Any]:
+    rows = {
+        row.id: row
+        for row in db.scalars(select(model).where(model.id.in_(ids)))
+    }
+    missing = sorted(set(ids) - set(rows))
+    if missing:
+        raise InvalidIDException(
+            f"{model.__name__} IDs {missing} do not exist"
+        )
+    return rows
+
+
+def update_movies_batch(db: Session, data: MovieBatchSchema) -> List[Movie]:
+    """
+    Add and remove actors and categories of several movies.
+
+    All changes are applied in one transaction. The filename of every
+    movie is computed once from its final actors, and only the renames and
+    link changes that differ from the current state are done on disk.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    data : MovieBatchSchema
+        The movies and the actors and categories to add and remove
+
+    Returns
+    -------
+    List[Movie]
+        The updated movies, in the order of the request
+    """
+    movie_ids = list(dict.fromkeys(data.movies))
+    movies = {
+        movie.id: movie
+        for movie in db.scalars(
+            _select_movies(movie_ids=movie_ids, schema=MovieSchema)
+        ).unique()
+    }
+    missing = sorted(set(movie_ids) - set(movies))
+    if missing:
+        raise InvalidIDException(f"Movie IDs {missing} do not exist")
+    actors = _get_by_ids(
+        db=db, model=Actor, ids=data.add_actors + data.remove_actors
+    )
+    categories = _get_by_ids(
+        db=db,
+        model=Category,
+        ids=data.add_categories + data.remove_categories,
+    )
+    changes: List[Tuple[str, MovieLinks, str, MovieLinks]] = []
+    for movie_id in movie_ids:
+        movie = movies[movie_id]
+        filename_current = movie.filename
+        links_current = get_movie_links(movie=movie)
+        for collection, rows, add, remove in (
+            (movie.actors, actors, data.add_actors, data.remove_actors),
+            (
+                movie.categories,
+                categories,
+                data.add_categories,
+                data.remove_categories,
+            ),
+        ):
+            present = {row.id for row in collection}
+            for row_id in dict.fromkeys(add):
+                if row_id not in present:
+                    collection.append(rows[row_id])
+            for row_id in set(remove) & present:
+                collection.remove(rows[row_id])
+            collection.sort(key=lambda row: row.name)
+        links_new = get_movie_links(movie=movie)
+        movie.filename = generate_movie_filename(movie=movie)
+        if (movie.filename, links_new) != (filename_current, links_current):
+            changes.append(
+                (filename_current, links_current, movie.filename, links_new)
+            )
+    renamed = [new for current, _, new, _ in changes if current != new]
+    if len(set(renamed)) != len(renamed):
+        db.rollback()
+        raise PathException("Renaming movies results in duplicate filenames")
+    try:
+        db.flush()
+    except IntegrityError as e:
+        db.rollback()
+        raise DuplicateEntryException(
+            "Renaming movies conflicts with existing movies", repr(e)
+        ) from e
+    done: List[Tuple[str, MovieLinks, str, MovieLinks]] = []
+    try:
+        for change in changes:
+            move_movie_links(*change)
+            done.append(change)
+    except PathException:
+        db.rollback()
+        for current, links_current, new, links_new in reversed(done):
+            move_movie_links(new, links_new, current, links_current)
+        raise
+    db.commit()
+    movies = {
+        movie.id: movie
+        for movie in db.scalars(
+            _select_movies(movie_ids=movie_ids, schema=MovieSchema)
+        ).unique()
+    }
+    return [movies[movie_id] for movie_id in movie_ids]
+
+
 def delete_movie(db: Session, movie_id: int) -> str:
     """
     Delete a movie.
@@ -778,7 +1569,7 @@ def delete_movie(db: Session, movie_id: int) -> str:
     str
         The movie name
     """
-    movie = get_movie(db=db, movie_id=movie_id)
+    movie = get_movie(db=db, movie_id=movie_id, schema=MovieSchema)
     if movie is None:
         raise InvalidIDException(f"Movie ID {movie_id} does not exist")
     remove_movie(movie=movie)
@@ -811,7 +1602,7 @@ def delete_movie_category(
     Tuple[Movie, Category]
         The updated movie and category
     """
-    movie = get_movie(db=db, movie_id=movie_id)
+    movie = get_movie(db=db, movie_id=movie_id, schema=MovieSchema)
     if movie is None:
         raise InvalidIDException(f"Movie ID {movie_id} does not exist")
     category = get_category(db=db, category_id=category_id)
@@ -851,7 +1642,7 @@ def delete_movie_actor(
     Tuple[Movie, Actor]
         The updated movie and actor
     """
-    movie = get_movie(db=db, movie_id=movie_id)
+    movie = get_movie(db=db, movie_id=movie_id, schema=MovieSchema)
     if movie is None:
         raise InvalidIDException(f"Movie ID {movie_id} does not exist")
     actor = get_actor(db=db, actor_id=actor_id)
@@ -1002,56 +1793,221 @@ def delete_studio(studio_id: int, db: Session) -> str:
 
 
 # pylint: disable=too-many-locals
-def parse_file_info(
-    db: Session, filename: str
-) -> Tuple[str, Optional[int], Optional[int], Optional[int], List[Actor]]:
+async def search_async(
+    db: AsyncSession, query: str, limit: int
+) -> List[SearchResultSchema]:
     """
-    Parse a filename.
+    Search movies, actors, series and studios by name.
+
+    Every word of the query is matched as a prefix, results are ranked by
+    bm25 with movie names weighted above filenames.
+
+    Parameters
+    ----------
+    db : AsyncSession
+        Async database session
+    query : str
+        The query
+    limit : int
+        Maximum number of results
+
+    Returns
+    -------
+    List[SearchResultSchema]
+        The results, best match first
+    """
+    match = match_expression(query)
+    if not match:
+        return []
+    weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+    rows = await db.execute(
+        text(
+            f"SELECT rowid, name, filename FROM {SEARCH_TABLE}"
+            f" WHERE {SEARCH_TABLE} MATCH :match"
+            f" ORDER BY bm25({SEARCH_TABLE}, {weights}), rowid"
+            " LIMIT :limit"
+        ),
+        {"match": match, "limit": limit},
+    )
+    kinds = {code: kind for kind, code in SEARCH_KINDS.items()}
+    return [
+        SearchResultSchema(
+            kind=kinds[rowid % len(SEARCH_KINDS)],
+            id=rowid // len(SEARCH_KINDS),
+            name=name or filename,
+        )
+        for rowid, name, filename in rows
+    ]
+
+
+def _get_by_names(db: Session, model: Any, names: Set[str]) -> Dict[str, Any]:
+    rows: Dict[str, Any] = {}
+    ordered = sorted(names)
+    for offset in range(0, len(ordered), NAME_BATCH_SIZE):
+        chunk = ordered[offset : offset + NAME_BATCH_SIZE]
+        rows.update(
+            (row.name, row)
+            for row in db.scalars(select(model).where(model.name.in_(chunk)))
+        )
+    return rows
+
+
+def get_all_movie_links(db: Session) -> List[Tuple[PathType, str, str]]:
+    """
+    Get the link of every movie to its actors, categories, series and
+    studio with one query.
 
     Parameters
     ----------
     db : Session
         Database session
-    filename : str
-        The filename
 
     Returns
     -------
-    Tuple[str, Optional[int], Optional[int], Optional[int], List[Actors]]
-        Movie name, studio id, series id, series number, actors
+    List[Tuple[PathType, str, str]]
+        Path type, name of the link directory and filename per link
+    """
+    statement: CompoundSelect = union_all(
+        select(literal(PathType.ACTOR.value), Actor.name, Movie.filename)
+        .select_from(movie_actors)
+        .join(Actor, Actor.id == movie_actors.c.actor_id)
+        .join(Movie, Movie.id == movie_actors.c.movie_id),
+        select(literal(PathType.CATEGORY.value), Category.name, Movie.filename)
+        .select_from(movie_categories)
+        .join(Category, Category.id == movie_categories.c.category_id)
+        .join(Movie, Movie.id == movie_categories.c.movie_id),
+        select(
+            literal(PathType.SERIES.value), Series.name, Movie.filename
+        ).join(Series, Series.id == Movie.series_id),
+        select(
+            literal(PathType.STUDIO.value), Studio.name, Movie.filename
+        ).join(Studio, Studio.id == Movie.studio_id),
+    )
+    return [
+        (PathType(path_type), name, filename)
+        for path_type, name, filename in db.execute(statement)
+        if name is not None
+    ]
+
+
+def get_movie_ids_by_fingerprint(
+    db: Session, fingerprints: Set[str]
+) -> Dict[str, int]:
     """
-    studio_id: Optional[int] = None
-    series_id: Optional[int] = None
-    series_number: Optional[int] = None
-    actors: List[Actor] = []
+    Get the movies with content fingerprints.
 
-    series_number_str: Optional[str] = None
+    The fingerprints are looked up in their index with one IN query per
+    batch.
 
-    name, studio_name, series_name, series_number_str, actor_names = (
-        parse_filename(filename=filename)
-    )
+    Parameters
+    ----------
+    db : Session
+        Database session
+    fingerprints : Set[str]
+        The fingerprints
+
+    Returns
+    -------
+    Dict[str, int]
+        ID of the oldest movie per fingerprint that is in the library
+    """
+    ids: Dict[str, int] = {}
+    ordered = sorted(fingerprints)
+    for offset in range(0, len(ordered), NAME_BATCH_SIZE):
+        chunk = ordered[offset : offset + NAME_BATCH_SIZE]
+        ids.update(
+            (row.fingerprint, row.id)
+            for row in db.execute(
+                select(Movie.fingerprint, func.min(Movie.id).label("id"))
+                .where(Movie.fingerprint.in_(chunk))
+                .group_by(Movie.fingerprint)
+            )
+        )
+    return ids
 
-    if studio_name is not None:
-        studio = get_studio_by_name(db=db, studio_name=studio_name)
-        if studio is not None:
-            studio_id = studio.id
 
-    if series_name is not None:
-        series = get_series_by_name(db=db, series_name=series_name)
-        if series is not None:
-            series_id = series.id
+def parse_files_info(
+    db: Session, filenames: List[str]
+) -> List[
+    Tuple[str, Optional[int], Optional[int], Optional[int], List[Actor]]
+]:
+    """
+    Parse filenames.
 
-    if series_number_str is not None:
-        series_number = int(series_number_str)
+    All filenames are parsed first, then every distinct studio, series and
+    actor name is resolved with one IN query per table and batch of names.
 
-    if actor_names is not None:
-        actors = [
+    Parameters
+    ----------
+    db : Session
+        Database session
+    filenames : List[str]
+        The filenames
+
+    Returns
+    -------
+    List[Tuple[str, Optional[int], Optional[int], Optional[int], List[Actor]]]
+        Movie name, studio id, series id, series number, actors per file
+    """
+    parsed = [parse_filename(filename=filename) for filename in filenames]
+    studios = _get_by_names(
+        db=db,
+        model=Studio,
+        names={studio for _, studio, _, _, _ in parsed if studio is not None},
+    )
+    series = _get_by_names(
+        db=db,
+        model=Series,
+        names={name for _, _, name, _, _ in parsed if name is not None},
+    )
+    actors = _get_by_names(
+        db=db,
+        model=Actor,
+        names={
             actor
-            for actor in (
-                get_actor_by_name(db=db, actor_name=actor_name)
-                for actor_name in actor_names.split(", ")
+            for _, _, _, _, names in parsed
+            if names is not None
+            for actor in names.split(", ")
+        },
+    )
+    result = []
+    for name, studio_name, series_name, series_number, actor_names in parsed:
+        studio = studios.get(studio_name) if studio_name else None
+        movie_series = series.get(series_name) if series_name else None
+        result.append(
+            (
+                name,
+                studio.id if studio is not None else None,
+                movie_series.id if movie_series is not None else None,
+                int(series_number) if series_number is not None else None,
+                [
+                    actors[actor_name]
+                    for actor_name in (
+                        actor_names.split(", ") if actor_names else []
+                    )
+                    if actor_name in actors
+                ],
             )
-            if actor is not None
-        ]
+        )
+    return result
+
+
+def parse_file_info(
+    db: Session, filename: str
+) -> Tuple[str, Optional[int], Optional[int], Optional[int], List[Actor]]:
+    """
+    Parse a filename.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    filename : str
+        The filename
 
-    return (name, studio_id, series_id, series_number, actors)
+    Returns
+    -------
+    Tuple[str, Optional[int], Optional[int], Optional[int], List[Actors]]
+        Movie name, studio id, series id, series number, actors
+    """
+    return parse_files_info(db=db, filenames=[filename])[0]
@@ -9,27 +9,186 @@ Created       : Mo Sep 23 16:20:14 2024 +0200
 Last modified : Di Okt 15 17:30:44 2024 +0200
 """
 
+from contextlib import asynccontextmanager, contextmanager
 from sqlite3 import Connection as SQLite3Connection
-from typing import Generator
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Generator,
+    Iterator,
+    Optional,
+)
 
 from sqlalchemy import create_engine, event
-from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite.aiosqlite import (
+    AsyncAdapt_aiosqlite_connection,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
-from .config import get_sqlite_path
-from .models import TableBase
+from .cache import MOVIE_LIST_SNAPSHOT, PROPERTY_CACHE
+from .config import EngineProfile, get_engine_profile, get_sqlite_path
+from .migrations import migrate_db
 
 __FACTORY = None
+__READ_FACTORY = None
+__ASYNC_FACTORY = None
+# Execution option naming how a transaction of the sync engine begins
+BEGIN_MODE = "sqlite_begin"
 
 
 @event.listens_for(Engine, "connect")
 def _set_sqlite_pragma(dbapi_connection, _):
-    if isinstance(dbapi_connection, SQLite3Connection):
+    if isinstance(
+        dbapi_connection,
+        (SQLite3Connection, AsyncAdapt_aiosqlite_connection),
+    ):
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA foreign_keys=ON;")
         cursor.close()
 
 
+def _apply_profile(profile: EngineProfile, dbapi_connection) -> None:
+    if isinstance(dbapi_connection, SQLite3Connection):
+        dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    for pragma in profile.pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def _begin_transaction(connection: Connection) -> None:
+    # pysqlite begins transactions only before data changes, so the first
+    # SAVEPOINT of a session would open the transaction and its RELEASE
+    # would commit it. Transactions are begun explicitly instead. A
+    # deferred transaction that reads before it writes fails at once if
+    # another connection committed in between, busy_timeout does not retry
+    # that upgrade, so transactions take the write lock when they begin
+    # unless the engine is read-only.
+    mode = connection.get_execution_options().get(BEGIN_MODE, "IMMEDIATE")
+    connection.exec_driver_sql(f"BEGIN {mode}")
+
+
+def create_db_engine(
+    path: str, profile: Optional[EngineProfile] = None
+) -> Engine:
+    """
+    Create a database engine.
+
+    The engine begins every transaction itself with BEGIN IMMEDIATE, so
+    sessions may nest savepoints in it and a session that reads before it
+    writes waits for the write lock instead of failing.
+
+    Parameters
+    ----------
+    path : str
+        Path of the sqlite database
+    profile : Optional[EngineProfile]
+        Engine profile, read from the environment if not given
+
+    Returns
+    -------
+    Engine
+        The database engine.
+    """
+    if profile is None:
+        profile = get_engine_profile()
+    engine = create_engine(
+        f"sqlite:///{path}",
+        echo=False,
+        connect_args={"check_same_thread": False},
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+    )
+    event.listen(
+        engine,
+        "connect",
+        lambda dbapi_connection, _: _apply_profile(profile, dbapi_connection),
+    )
+    event.listen(engine, "begin", _begin_transaction)
+    return engine
+
+
+def read_only_engine(engine: Engine) -> Engine:
+    """
+    Get a variant of a sync engine whose transactions only read.
+
+    Its transactions begin deferred, so they never hold the write lock.
+    A transaction of it that writes fails if another connection wrote
+    since it began reading.
+
+    Parameters
+    ----------
+    engine : Engine
+        Database engine created by create_db_engine
+
+    Returns
+    -------
+    Engine
+        The engine, sharing the connection pool
+    """
+    return engine.execution_options(**{BEGIN_MODE: "DEFERRED"})
+
+
+def create_async_db_engine(
+    path: str, profile: Optional[EngineProfile] = None
+) -> AsyncEngine:
+    """
+    Create an async database engine.
+
+    Parameters
+    ----------
+    path : str
+        Path of the sqlite database
+    profile : Optional[EngineProfile]
+        Engine profile, read from the environment if not given
+
+    Returns
+    -------
+    AsyncEngine
+        The async database engine.
+    """
+    if profile is None:
+        profile = get_engine_profile()
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}",
+        echo=False,
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+    )
+    event.listen(
+        engine.sync_engine,
+        "connect",
+        lambda dbapi_connection, _: _apply_profile(profile, dbapi_connection),
+    )
+    return engine
+
+
+def analyze_db(engine: Engine) -> None:
+    """
+    Refresh the statistics the query planner uses to choose indexes.
+
+    Without statistics sqlite assumes every equality is selective and may
+    scan a low cardinality index such as the processed flag. The analysis
+    is limited to a sample of every index, so it stays cheap on large
+    libraries.
+
+    Parameters
+    ----------
+    engine : Engine
+        Database engine
+    """
+    with engine.begin() as connection:
+        connection.exec_driver_sql("PRAGMA analysis_limit=1000;")
+        connection.exec_driver_sql("ANALYZE;")
+
+
 def get_db_session() -> Generator[Session, None, None]:
     """
     Get database session.
@@ -45,13 +204,83 @@ def get_db_session() -> Generator[Session, None, None]:
         yield db
 
 
-def init_db() -> None:
-    """Init database."""
-    global __FACTORY
-    engine = create_engine(
-        f"sqlite:///{get_sqlite_path()}",
-        echo=False,
-        connect_args={"check_same_thread": False},
-    )
+@contextmanager
+def db_session(read_only: bool = False) -> Iterator[Session]:
+    """
+    Open a database session outside of a request dependency.
+
+    Parameters
+    ----------
+    read_only : bool
+        Whether the session only reads, so it does not hold the write lock
+
+    Yields
+    ------
+    Session
+        The database session.
+    """
+    if not read_only:
+        yield from get_db_session()
+        return
+    if __READ_FACTORY is None:
+        raise RuntimeError("Must call init_db first!")
+    with __READ_FACTORY() as db:
+        yield db
+
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get async database session.
+
+    Yields
+    ------
+    AsyncSession
+        The async database session.
+    """
+    if __ASYNC_FACTORY is None:
+        raise RuntimeError("Must call init_db first!")
+    async with __ASYNC_FACTORY() as db:
+        yield db
+
+
+@asynccontextmanager
+async def async_db_session() -> AsyncIterator[AsyncSession]:
+    """
+    Open an async database session outside of a request dependency.
+
+    Yields
+    ------
+    AsyncSession
+        The async database session.
+    """
+    async for db in get_async_db_session():
+        yield db
+
+
+def init_db(profile: Optional[EngineProfile] = None) -> None:
+    """
+    Init database.
+
+    Parameters
+    ----------
+    profile : Optional[EngineProfile]
+        Engine profile, read from the environment if not given
+    """
+    global __FACTORY, __READ_FACTORY, __ASYNC_FACTORY
+    if profile is None:
+        profile = get_engine_profile()
+    path = get_sqlite_path()
+    engine = create_db_engine(path=path, profile=profile)
+    migrate_db(engine=engine)
+    analyze_db(engine=engine)
     __FACTORY = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    TableBase.metadata.create_all(bind=engine)
+    __READ_FACTORY = sessionmaker(
+        autocommit=False, autoflush=False, bind=read_only_engine(engine)
+    )
+    __ASYNC_FACTORY = async_sessionmaker(
+        autoflush=False,
+        expire_on_commit=False,
+        bind=create_async_db_engine(path=path, profile=profile),
+    )
+    PROPERTY_CACHE.clear()
+    MOVIE_LIST_SNAPSHOT.clear()
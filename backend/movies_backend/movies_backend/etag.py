@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Entity tags for conditional requests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 20:41:17 2026 +0200
+Last modified : Sa Okt 17 20:41:17 2026 +0200
+"""
+
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+
+
+def make_etag(kind: str, versions: Tuple[int, ...]) -> str:
+    """
+    Make a weak entity tag from change counters.
+
+    The tag is weak because the same data may be sent gzipped or not.
+
+    Parameters
+    ----------
+    kind : str
+        Kind of the response, so different endpoints never share a tag
+    versions : Tuple[int, ...]
+        Change counters the response depends on
+
+    Returns
+    -------
+    str
+        The entity tag
+    """
+    return f'W/"{kind}-{"-".join(str(version) for version in versions)}"'
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """
+    Get the headers of a tagged response.
+
+    Parameters
+    ----------
+    etag : str
+        Entity tag of the response
+
+    Returns
+    -------
+    Dict[str, str]
+        The headers, which make clients revalidate every time
+    """
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def check_etag(
+    request: Request, response: Response, etag: str
+) -> Optional[Response]:
+    """
+    Tag a response and check whether the client already has it.
+
+    Parameters
+    ----------
+    request : Request
+        The request
+    response : Response
+        The response, which gets the entity tag
+    etag : str
+        Entity tag of the response
+
+    Returns
+    -------
+    Optional[Response]
+        A 304 response if the If-None-Match header matches, None otherwise
+    """
+    headers = etag_headers(etag=etag)
+    response.headers.update(headers)
+    candidates = {
+        candidate.strip().removeprefix("W/")
+        for candidate in request.headers.get("If-None-Match", "").split(",")
+    }
+    if "*" in candidates or etag.removeprefix("W/") in candidates:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    return None
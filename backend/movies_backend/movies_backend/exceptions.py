@@ -43,3 +43,17 @@ class IntegrityConstraintException(Exception):
 
     # pylint:disable=unnecessary-ellipsis
     ...
+
+
+class InvalidCursorException(Exception):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    # pylint:disable=unnecessary-ellipsis
+    ...
+
+
+class JobRunningException(Exception):
+    """Raised when a job is started while another one is running."""
+
+    # pylint:disable=unnecessary-ellipsis
+    ...
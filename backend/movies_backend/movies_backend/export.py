@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Catalog export encoders.
+
+Description   : Batches of movies are encoded one after another, so an
+                export never holds more than one batch in memory. The
+                NDJSON lines are the movie details as returned by
+                /movies/{movie_id}, the CSV rows flatten the properties to
+                their names.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 23:02:18 2026 +0200
+Last modified : Sa Okt 17 23:02:18 2026 +0200
+"""
+
+import csv
+import io
+from typing import Sequence
+
+from .models import Movie
+from .schemas import MovieSchema
+
+CSV_COLUMNS = (
+    "id",
+    "filename",
+    "name",
+    "actors",
+    "categories",
+    "series",
+    "series_number",
+    "studio",
+)
+# Joins the names of the actors and categories of a movie in one cell
+CSV_NAME_SEPARATOR = "; "
+
+
+def encode_ndjson(movies: Sequence[Movie]) -> bytes:
+    """
+    Encode movies as newline delimited JSON.
+
+    Parameters
+    ----------
+    movies : Sequence[Movie]
+        Movies with their relationships loaded
+
+    Returns
+    -------
+    bytes
+        One JSON object per movie, each terminated by a newline
+    """
+    return b"".join(
+        MovieSchema.model_validate(movie).model_dump_json().encode() + b"\n"
+        for movie in movies
+    )
+
+
+def encode_csv_header() -> bytes:
+    """
+    Encode the header row of the CSV export.
+
+    Returns
+    -------
+    bytes
+        The header row
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_COLUMNS)
+    return buffer.getvalue().encode()
+
+
+def encode_csv(movies: Sequence[Movie]) -> bytes:
+    """
+    Encode movies as CSV rows.
+
+    Parameters
+    ----------
+    movies : Sequence[Movie]
+        Movies with their relationships loaded
+
+    Returns
+    -------
+    bytes
+        One row per movie in the order of the CSV columns
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for movie in movies:
+        writer.writerow(
+            (
+                movie.id,
+                movie.filename,
+                movie.name,
+                CSV_NAME_SEPARATOR.join(actor.name for actor in movie.actors),
+                CSV_NAME_SEPARATOR.join(
+                    category.name for category in movie.categories
+                ),
+                movie.series.name if movie.series is not None else None,
+                movie.series_number,
+                movie.studio.name if movie.studio is not None else None,
+            )
+        )
+    return buffer.getvalue().encode()
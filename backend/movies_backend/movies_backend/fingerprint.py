@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Content fingerprints of movie files.
+
+Description   : A fingerprint hashes the size of a file and three sample
+                blocks at its start, middle and end, read through mmap, so
+                it costs three small reads however large the file is. Two
+                copies of a movie under different filenames share their
+                fingerprint, which the import looks up to find duplicates.
+                The full content hash reads the whole file and is filled
+                by a separate pass that may run in the background.
+
+                Invoke with `python -m movies_backend.fingerprint [--full]`
+                to fingerprint the movies added before fingerprints
+                existed, and to hash their full content.
+
+Author        : Vadim Titov
+Created       : So Okt 18 17:05:44 2026 +0200
+Last modified : So Okt 18 17:05:44 2026 +0200
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .config import (
+    get_engine_profile,
+    get_hash_workers,
+    get_logger,
+    get_sqlite_path,
+    setup_logging,
+)
+from .database import create_db_engine, read_only_engine
+from .migrations import migrate_db
+from .models import Movie
+from .util import PathType, get_movie_path
+
+logger = get_logger()
+
+# Size of every sample block, files up to three blocks are hashed whole
+SAMPLE_BYTES = 64 * 1024
+# Movies hashed per transaction of the backfill
+BACKFILL_BATCH_SIZE = 200
+
+_T = TypeVar("_T")
+
+
+def sample_fingerprint(path: str) -> Optional[str]:
+    """
+    Get the fingerprint of a file from its size and three sample blocks.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file
+
+    Returns
+    -------
+    Optional[str]
+        The fingerprint as 32 hex digits, None for an empty file
+
+    Raises
+    ------
+    OSError
+        If the file cannot be read
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return None
+        digest = hashlib.blake2b(size.to_bytes(8, "little"), digest_size=16)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if hasattr(data, "madvise"):
+                # Only the sample blocks are read, read ahead is wasted
+                data.madvise(mmap.MADV_RANDOM)
+            with memoryview(data) as view:
+                if size <= 3 * SAMPLE_BYTES:
+                    digest.update(view)
+                else:
+                    for offset in (
+                        0,
+                        (size - SAMPLE_BYTES) // 2,
+                        size - SAMPLE_BYTES,
+                    ):
+                        digest.update(view[offset : offset + SAMPLE_BYTES])
+    return digest.hexdigest()
+
+
+def content_hash(path: str) -> Optional[str]:
+    """
+    Get the SHA-256 hash of the whole content of a file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file
+
+    Returns
+    -------
+    Optional[str]
+        The hash as 64 hex digits
+
+    Raises
+    ------
+    OSError
+        If the file cannot be read
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _hash(hasher: Callable[[str], _T], path: str) -> _T | OSError:
+    try:
+        return hasher(path)
+    except OSError as e:
+        return e
+
+
+def hash_files(
+    paths: List[str],
+    hasher: Callable[[str], _T],
+    workers: Optional[int] = None,
+) -> List[_T | OSError]:
+    """
+    Hash or probe files in a thread pool.
+
+    The threads spend their time in I/O and hashing, which release the
+    GIL, so they run in parallel.
+
+    Parameters
+    ----------
+    paths : List[str]
+        Paths of the files
+    hasher : Callable[[str], _T]
+        Hashes or probes a file, raises OSError if it cannot be read
+    workers : Optional[int]
+        Number of threads, read from the environment if None
+
+    Returns
+    -------
+    List[_T | OSError]
+        The result or the error of every file, in the order of the paths
+    """
+    if len(paths) <= 1:
+        return [_hash(hasher, path) for path in paths]
+    with ThreadPoolExecutor(
+        max_workers=min(workers or get_hash_workers(), len(paths))
+    ) as pool:
+        return list(pool.map(lambda path: _hash(hasher, path), paths))
+
+
+def backfill(
+    engine: Engine,
+    full: bool = False,
+    workers: Optional[int] = None,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """
+    Hash the files of the movies that have no fingerprint yet.
+
+    Parameters
+    ----------
+    engine : Engine
+        Database engine
+    full : bool
+        Whether to hash the full content of the movies without a content
+        hash instead
+    workers : Optional[int]
+        Number of threads, read from the environment if None
+    batch_size : int
+        Number of movies hashed per transaction
+
+    Returns
+    -------
+    Tuple[int, int]
+        Number of hashed movies and of movies whose file failed
+    """
+    column = Movie.content_hash if full else Movie.fingerprint
+    hasher = content_hash if full else sample_fingerprint
+    directory = get_movie_path(PathType.MOVIE)
+    hashed = failed = last_id = 0
+    while True:
+        # Closed before the files are read, so no transaction stays open
+        with Session(read_only_engine(engine)) as db:
+            rows = db.execute(
+                select(Movie.id, Movie.filename)
+                .where(column.is_(None), Movie.id > last_id)
+                .order_by(Movie.id)
+                .limit(batch_size)
+            ).all()
+        if not rows:
+            return hashed, failed
+        last_id = rows[-1].id
+        values = []
+        for row, result in zip(
+            rows,
+            hash_files(
+                paths=[os.path.join(directory, r.filename) for r in rows],
+                hasher=hasher,
+                workers=workers,
+            ),
+        ):
+            if isinstance(result, OSError):
+                logger.warning(repr(result))
+                failed += 1
+            elif result is not None:
+                values.append({"id": row.id, column.key: result})
+        if values:
+            with Session(engine) as db:
+                db.execute(update(Movie), values)
+                db.commit()
+        hashed += len(values)
+
+
+def main() -> None:
+    """Fingerprint the movies without a fingerprint or content hash."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--full", action="store_true", help="hash the full content"
+    )
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    setup_logging()
+    engine = create_db_engine(
+        path=get_sqlite_path(), profile=get_engine_profile()
+    )
+    migrate_db(engine=engine)
+    start = time.monotonic()
+    hashed, failed = backfill(
+        engine=engine, full=args.full, workers=args.workers
+    )
+    engine.dispose()
+    logger.info(
+        "Hashed %d movies in %.1f s, %d files failed",
+        hashed,
+        time.monotonic() - start,
+        failed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Background import jobs.
+
+Description   : Importing the files of the imports directory moves and
+                adds every file, which takes longer than a request may
+                take for large drops. The import runs in a thread of its
+                own instead and records its progress in a job, which
+                requests read or follow as a stream of events. Only one
+                import runs at a time, as two imports would race for the
+                same files. Every file is fingerprinted before it is
+                added, so a copy of a movie already in the library is
+                flagged, or skipped if so configured, and probed for its
+                duration, frame size and codec.
+
+Author        : Vadim Titov
+Created       : So Okt 18 10:14:26 2026 +0200
+Last modified : So Okt 18 10:14:26 2026 +0200
+"""
+
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from threading import Condition, Lock, Thread
+from typing import Callable, List, Literal, Optional, Set, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .config import (
+    get_import_batch_size,
+    get_import_skip_duplicates,
+    get_logger,
+    get_move_workers,
+)
+from .crud import get_movie_ids_by_fingerprint, parse_files_info, stage_movie
+from .database import db_session
+from .exceptions import (
+    DuplicateEntryException,
+    JobRunningException,
+    ListFilesException,
+    PathException,
+)
+from .fingerprint import hash_files, sample_fingerprint
+from .probe import MediaInfo, probe_file
+from .util import PathType, get_movie_path, list_files, migrate_file
+
+logger = get_logger()
+
+JobState = Literal["running", "finished", "failed"]
+EventKind = Literal["imported", "skipped", "error", "finished"]
+
+# Finished jobs kept for their status requests
+MAX_FINISHED_JOBS = 20
+
+
+@dataclass(frozen=True)
+class ImportEvent:
+    """
+    Progress event of an import job.
+
+    Attributes
+    ----------
+    seq : int
+        Sequence number, starting at 1
+    kind : EventKind
+        A file was imported, skipped as a duplicate or failed, or the job
+        finished
+    filename : Optional[str]
+        The file, None for the finished event
+    movie_id : Optional[int]
+        ID of the imported movie
+    message : Optional[str]
+        Error message
+    duplicate_of : Optional[int]
+        ID of the movie with the same content as the file
+    """
+
+    seq: int
+    kind: EventKind
+    filename: Optional[str] = None
+    movie_id: Optional[int] = None
+    message: Optional[str] = None
+    duplicate_of: Optional[int] = None
+
+
+class ImportJob:
+    """
+    Progress of an import job, shared between the job thread and requests.
+
+    Attributes
+    ----------
+    id : str
+        Job ID
+    state : JobState
+        State of the job
+    total : int
+        Number of files to import
+    imported : int
+        Number of files imported
+    failed : int
+        Number of files that failed
+    skipped : int
+        Number of files skipped as duplicates
+    duplicates : int
+        Number of files whose content is already in the library
+    moved : int
+        Number of bytes of movie files moved
+    started : datetime
+        Start time
+    finished : Optional[datetime]
+        End time, None while running
+    error : Optional[str]
+        Error the job failed with
+    """
+
+    def __init__(self) -> None:
+        self.id = uuid.uuid4().hex
+        self.state: JobState = "running"
+        self.total = 0
+        self.imported = 0
+        self.failed = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.moved = 0
+        self.started = datetime.now(timezone.utc)
+        self.finished: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self._start = time.monotonic()
+        self._end: Optional[float] = None
+        self._events: List[ImportEvent] = []
+        self._condition = Condition()
+
+    @property
+    def done(self) -> bool:
+        """
+        Get whether the job has ended.
+
+        Returns
+        -------
+        bool
+            True if the job finished or failed
+        """
+        return self.state != "running"
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Get the run time of the job.
+
+        Returns
+        -------
+        float
+            Seconds since the start, or until the end if the job ended
+        """
+        end = self._end if self._end is not None else time.monotonic()
+        return end - self._start
+
+    @property
+    def files_per_second(self) -> float:
+        """
+        Get the throughput of the job.
+
+        Returns
+        -------
+        float
+            Files processed per second
+        """
+        elapsed = self.elapsed
+        processed = self.imported + self.failed + self.skipped
+        return processed / elapsed if elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """
+        Get the data throughput of the job.
+
+        Returns
+        -------
+        float
+            Bytes of movie files moved per second
+        """
+        elapsed = self.elapsed
+        return self.moved / elapsed if elapsed else 0.0
+
+    def add_moved(self, count: int) -> None:
+        """
+        Record moved bytes, called by the threads moving the files.
+
+        Parameters
+        ----------
+        count : int
+            Number of bytes moved
+        """
+        with self._condition:
+            self.moved += count
+
+    def _publish(
+        self,
+        kind: EventKind,
+        filename: Optional[str] = None,
+        movie_id: Optional[int] = None,
+        message: Optional[str] = None,
+        duplicate_of: Optional[int] = None,
+    ) -> None:
+        with self._condition:
+            self._events.append(
+                ImportEvent(
+                    seq=len(self._events) + 1,
+                    kind=kind,
+                    filename=filename,
+                    movie_id=movie_id,
+                    message=message,
+                    duplicate_of=duplicate_of,
+                )
+            )
+            self._condition.notify_all()
+
+    def start(self, total: int) -> None:
+        """
+        Record the number of files to import.
+
+        Parameters
+        ----------
+        total : int
+            Number of files
+        """
+        self.total = total
+
+    def file_imported(
+        self, filename: str, movie_id: int, duplicate_of: Optional[int] = None
+    ) -> None:
+        """
+        Record an imported file.
+
+        Parameters
+        ----------
+        filename : str
+            The file
+        movie_id : int
+            ID of the movie
+        duplicate_of : Optional[int]
+            ID of the movie with the same content, None if there is none
+        """
+        self.imported += 1
+        if duplicate_of is not None:
+            self.duplicates += 1
+        self._publish(
+            "imported",
+            filename=filename,
+            movie_id=movie_id,
+            duplicate_of=duplicate_of,
+        )
+
+    def file_skipped(self, filename: str, duplicate_of: int) -> None:
+        """
+        Record a file skipped as a duplicate, it stays in the imports
+        directory.
+
+        Parameters
+        ----------
+        filename : str
+            The file
+        duplicate_of : int
+            ID of the movie with the same content
+        """
+        self.skipped += 1
+        self.duplicates += 1
+        self._publish("skipped", filename=filename, duplicate_of=duplicate_of)
+
+    def file_failed(self, filename: str, message: str) -> None:
+        """
+        Record a file that failed to import.
+
+        Parameters
+        ----------
+        filename : str
+            The file
+        message : str
+            Error message
+        """
+        self.failed += 1
+        self._publish("error", filename=filename, message=message)
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """
+        End the job.
+
+        Parameters
+        ----------
+        error : Optional[str]
+            Error the job failed with, None if it finished
+        """
+        self._end = time.monotonic()
+        self.finished = datetime.now(timezone.utc)
+        self.error = error
+        self.state = "failed" if error is not None else "finished"
+        self._publish("finished", message=error)
+
+    def events(self, after: int = 0, timeout: float = 0) -> List[ImportEvent]:
+        """
+        Get the events after a sequence number, waiting for new ones.
+
+        Parameters
+        ----------
+        after : int
+            Sequence number of the last event already seen
+        timeout : float
+            Seconds to wait if there are no new events
+
+        Returns
+        -------
+        List[ImportEvent]
+            The new events, empty if none arrived in time
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: len(self._events) > after, timeout=timeout
+            )
+            return self._events[after:]
+
+
+def _fail(job: ImportJob, filename: str, error: Exception) -> None:
+    logger.warning(repr(error))
+    job.file_failed(filename=filename, message=repr(error))
+
+
+def _inspect(path: str) -> Tuple[Optional[str], Optional[MediaInfo]]:
+    return sample_fingerprint(path), probe_file(path)
+
+
+def _move(job: ImportJob, filename: str) -> Optional[PathException]:
+    try:
+        migrate_file(filename=filename, progress=job.add_moved)
+    except PathException as e:
+        return e
+    return None
+
+
+def _move_back(filename: str) -> None:
+    try:
+        migrate_file(filename=filename, adding=False)
+    except PathException as e:
+        logger.error(repr(e))
+
+
+# pylint: disable=too-many-locals,too-many-branches
+def _import_batch(db: Session, job: ImportJob, files: List[str]) -> List[str]:
+    directory = get_movie_path(PathType.IMPORT)
+    inspected = hash_files(
+        paths=[os.path.join(directory, file) for file in files],
+        hasher=_inspect,
+    )
+    known = get_movie_ids_by_fingerprint(
+        db=db,
+        fingerprints={
+            result[0]
+            for result in inspected
+            if not isinstance(result, OSError) and result[0] is not None
+        },
+    )
+    # Ends the read transaction, no lock is held while the files move
+    db.rollback()
+    skip_duplicates = get_import_skip_duplicates()
+    candidates: List[Tuple[str, Optional[str], Optional[MediaInfo]]] = []
+    deferred: List[str] = []
+    first_copies: Set[str] = set()
+    for file, result in zip(files, inspected):
+        if isinstance(result, OSError):
+            _fail(job=job, filename=file, error=result)
+            continue
+        fp, media = result
+        if fp is not None and skip_duplicates:
+            duplicate_of = known.get(fp)
+            if duplicate_of is not None:
+                logger.info("Skipped %s, duplicate of %d", file, duplicate_of)
+                job.file_skipped(filename=file, duplicate_of=duplicate_of)
+                continue
+            if fp in first_copies:
+                # Skipped once the first copy has an ID, or imported if
+                # the first copy fails
+                deferred.append(file)
+                continue
+            first_copies.add(fp)
+        candidates.append((file, fp, media))
+    with ThreadPoolExecutor(max_workers=get_move_workers()) as pool:
+        errors = list(
+            pool.map(
+                lambda file: _move(job=job, filename=file),
+                [file for file, _, _ in candidates],
+            )
+        )
+    moved: List[Tuple[str, Optional[str], Optional[MediaInfo]]] = []
+    for candidate, error in zip(candidates, errors):
+        if error is not None:
+            _fail(job=job, filename=candidate[0], error=error)
+        else:
+            moved.append(candidate)
+    # IDs are taken before the commit expires the movies
+    staged: List[Tuple[str, int, Optional[int]]] = []
+    rejected: List[Tuple[str, Exception]] = []
+    for (
+        (file, fp, media),
+        (name, studio_id, series_id, series_number, actors),
+    ) in zip(moved, parse_files_info(db=db, filenames=[m[0] for m in moved])):
+        duplicate_of = known.get(fp) if fp is not None else None
+        try:
+            movie = stage_movie(
+                db=db,
+                filename=file,
+                name=name,
+                studio_id=studio_id,
+                series_id=series_id,
+                series_number=series_number,
+                actors=actors,
+                fingerprint=fp,
+                media=media,
+            )
+        except DuplicateEntryException as e:
+            rejected.append((file, e))
+            continue
+        if fp is not None:
+            # Later copies in the same batch are duplicates of this one
+            known.setdefault(fp, movie.id)
+        if duplicate_of is not None:
+            logger.warning("Imported %s, duplicate of %d", file, duplicate_of)
+        staged.append((file, movie.id, duplicate_of))
+    try:
+        db.commit()
+    except SQLAlchemyError as e:
+        logger.error(repr(e))
+        db.rollback()
+        rejected.extend((file, e) for file, _, _ in staged)
+        staged = []
+    finally:
+        db.expunge_all()
+    # Moved back once the transaction ended, a copy may take long
+    for file, reason in rejected:
+        _move_back(filename=file)
+        _fail(job=job, filename=file, error=reason)
+    for file, movie_id, duplicate_of in staged:
+        job.file_imported(
+            filename=file, movie_id=movie_id, duplicate_of=duplicate_of
+        )
+        logger.debug("Imported movie %s", file)
+    return deferred
+
+
+def import_movies(
+    job: ImportJob,
+    session: Callable[[], AbstractContextManager[Session]] = db_session,
+    files: Optional[List[str]] = None,
+) -> None:
+    """
+    Import the movies of the imports directory in batches.
+
+    The files of a batch are fingerprinted and probed by a thread pool
+    first and the fingerprints are looked up in their index, a file with
+    the content of a movie in the library or earlier in the import is
+    imported and flagged as a duplicate, or skipped. The files are then
+    moved by a bounded thread pool outside of any transaction, so a slow
+    copy across filesystems never holds the write lock. The moved files
+    are added in one short transaction with a savepoint per file, a file
+    that cannot be added is moved back and reported while the others
+    continue, and all of them are moved back if the commit fails. The
+    database thus only ever holds movies whose files are in the movies
+    directory.
+
+    Parameters
+    ----------
+    job : ImportJob
+        Job recording the progress
+    session : Callable[[], AbstractContextManager[Session]]
+        Opens the database session of the import
+    files : Optional[List[str]]
+        Files of the imports directory to import, all files if None
+    """
+    if files is None:
+        try:
+            files = list_files(get_movie_path(PathType.IMPORT))
+        except ListFilesException as e:
+            logger.error(repr(e))
+            job.finish(error=repr(e))
+            return
+        files = [file for file in files if file != ".keep"]
+    job.start(total=len(files))
+    batch_size = get_import_batch_size()
+    with session() as db:
+        for start in range(0, len(files), batch_size):
+            batch = files[start : start + batch_size]
+            while batch:
+                batch = _import_batch(db=db, job=job, files=batch)
+    job.finish()
+
+
+class ImportJobs:
+    """Registry of the import jobs, running at most one at a time."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._jobs: OrderedDict[str, ImportJob] = OrderedDict()
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        """
+        Get a job.
+
+        Parameters
+        ----------
+        job_id : str
+            Job ID
+
+        Returns
+        -------
+        Optional[ImportJob]
+            The job, None if it is unknown or was dropped
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def start(self, run: Callable[[ImportJob], None]) -> ImportJob:
+        """
+        Start a job in a background thread.
+
+        Parameters
+        ----------
+        run : Callable[[ImportJob], None]
+            Runs the job, it must end the job even if it fails
+
+        Returns
+        -------
+        ImportJob
+            The started job
+
+        Raises
+        ------
+        JobRunningException
+            If another job is still running
+        """
+        with self._lock:
+            for running in self._jobs.values():
+                if not running.done:
+                    raise JobRunningException(
+                        f"Import job {running.id} is still running"
+                    )
+            job = ImportJob()
+            self._jobs[job.id] = job
+            while len(self._jobs) > MAX_FINISHED_JOBS + 1:
+                self._jobs.popitem(last=False)
+        Thread(
+            target=self._run, args=(run, job), name=f"import-{job.id}"
+        ).start()
+        return job
+
+    @staticmethod
+    def _run(run: Callable[[ImportJob], None], job: ImportJob) -> None:
+        try:
+            run(job)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.exception("Import job %s failed", job.id)
+            if not job.done:
+                job.finish(error=repr(e))
+
+
+IMPORT_JOBS = ImportJobs()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Schema migrations.
+
+Description   : The schema version is stored in the sqlite user_version
+                header field, so an up to date database is detected with a
+                single pragma. Migrations must be idempotent, a database
+                created before the migrations existed starts at version 0.
+                Migrations are append-only, a shipped migration is never
+                changed.
+
+                A new database is created from the models and stamped with
+                the current version instead of replaying every migration.
+                The triggers and tables the models do not describe are
+                created by _create_schema, which every migration adding
+                such objects extends.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 12:04:38 2026 +0200
+Last modified : Sa Okt 17 21:14:08 2026 +0200
+"""
+
+from typing import Callable, List, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+
+from .changes import (
+    count_media_revisions,
+    create_change_counters,
+    seed_movie_revisions,
+)
+from .config import get_logger
+from .models import Movie, TableBase
+from .search import create_search_index, rebuild_search_index
+
+logger = get_logger()
+
+
+def _create_tables(connection: Connection) -> None:
+    TableBase.metadata.create_all(bind=connection)
+
+
+def _create_indexes(connection: Connection, names: Tuple[str, ...]) -> None:
+    for table in TableBase.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in names:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _create_lookup_indexes(connection: Connection) -> None:
+    _create_indexes(
+        connection=connection,
+        names=(
+            "ix_movie_actors_actor_id_movie_id",
+            "ix_movie_categories_category_id_movie_id",
+            "ix_movies_series_id",
+            "ix_movies_studio_id",
+        ),
+    )
+    # Superseded by ix_movies_list_order, which the models declare instead
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_movies_processed_sort_name"
+        " ON movies (processed, sort_name)"
+    )
+
+
+def _add_column(connection: Connection, table: str, column: str) -> None:
+    name = column.split(" ", 1)[0]
+    if name not in {c["name"] for c in inspect(connection).get_columns(table)}:
+        connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column}")
+
+
+_LIST_KEYS = """
+UPDATE movies SET
+    studio_sort_name = COALESCE(
+        (SELECT sort_name FROM studios WHERE id = {0}.studio_id), ''
+    ),
+    series_sort_name = COALESCE(
+        (SELECT sort_name FROM series WHERE id = {0}.series_id), ''
+    )
+"""
+
+
+def _denormalize_list_order(connection: Connection) -> None:
+    _add_column(
+        connection,
+        "movies",
+        "studio_sort_name VARCHAR(255) NOT NULL DEFAULT ''",
+    )
+    _add_column(
+        connection,
+        "movies",
+        "series_sort_name VARCHAR(255) NOT NULL DEFAULT ''",
+    )
+    connection.exec_driver_sql(
+        "UPDATE movies SET sort_name = '' WHERE sort_name IS NULL"
+    )
+    connection.exec_driver_sql(_LIST_KEYS.format("movies"))
+    _create_list_order_triggers(connection=connection)
+    connection.exec_driver_sql(
+        "DROP INDEX IF EXISTS ix_movies_processed_sort_name"
+    )
+    _create_indexes(connection=connection, names=("ix_movies_list_order",))
+
+
+def _create_list_order_triggers(connection: Connection) -> None:
+    for name, event in (
+        ("movies_list_order_insert", "INSERT"),
+        ("movies_list_order_update", "UPDATE OF studio_id, series_id"),
+    ):
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON movies"
+            f" BEGIN {_LIST_KEYS.format('NEW')} WHERE id = NEW.id; END"
+        )
+    for table, column in (
+        ("studios", "studio"),
+        ("series", "series"),
+    ):
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_list_order_update"
+            f" AFTER UPDATE OF sort_name ON {table} BEGIN"
+            f" UPDATE movies SET {column}_sort_name = NEW.sort_name"
+            f" WHERE {column}_id = NEW.id; END"
+        )
+
+
+def _create_filter_indexes(connection: Connection) -> None:
+    _create_indexes(connection=connection, names=("ix_movies_sort_name",))
+
+
+def _create_search_index(connection: Connection) -> None:
+    create_search_index(connection=connection)
+    rebuild_search_index(connection=connection)
+
+
+def _create_change_counters(connection: Connection) -> None:
+    _add_column(connection, "movies", "revision INTEGER NOT NULL DEFAULT 0")
+    create_change_counters(connection=connection)
+
+
+def _add_fingerprints(connection: Connection) -> None:
+    _add_column(connection, "movies", "fingerprint VARCHAR(32)")
+    _add_column(connection, "movies", "content_hash VARCHAR(64)")
+    _create_indexes(connection=connection, names=("ix_movies_fingerprint",))
+
+
+def _add_media_metadata(connection: Connection) -> None:
+    for column in (
+        "duration FLOAT",
+        "width INTEGER",
+        "height INTEGER",
+        "codec VARCHAR(32)",
+        "bitrate INTEGER",
+    ):
+        _add_column(connection, "movies", column)
+
+
+def _count_media_revisions(connection: Connection) -> None:
+    count_media_revisions(connection=connection)
+
+
+def _seed_movie_revisions(connection: Connection) -> None:
+    seed_movie_revisions(connection=connection)
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("Create tables", _create_tables),
+    (
+        "Create association, foreign key and sort order indexes",
+        _create_lookup_indexes,
+    ),
+    (
+        "Denormalize the studio and series sort names for the movie list",
+        _denormalize_list_order,
+    ),
+    ("Create movie name prefix index", _create_filter_indexes),
+    ("Create full text search index", _create_search_index),
+    ("Count changes for entity tags", _create_change_counters),
+    ("Add movie content fingerprints", _add_fingerprints),
+    ("Add movie media metadata", _add_media_metadata),
+    (
+        "Count media metadata changes in movie revisions",
+        _count_media_revisions,
+    ),
+    ("Seed movie revisions from the change counter", _seed_movie_revisions),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def _create_schema(connection: Connection) -> None:
+    TableBase.metadata.create_all(bind=connection)
+    _create_list_order_triggers(connection=connection)
+    create_search_index(connection=connection)
+    create_change_counters(connection=connection)
+    count_media_revisions(connection=connection)
+    seed_movie_revisions(connection=connection)
+
+
+def get_schema_version(connection: Connection) -> int:
+    """
+    Get the schema version of a database.
+
+    Parameters
+    ----------
+    connection : Connection
+        Database connection
+
+    Returns
+    -------
+    int
+        The schema version.
+    """
+    version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+    return int(version) if version is not None else 0
+
+
+def _set_schema_version(connection: Connection, version: int) -> None:
+    connection.exec_driver_sql(f"PRAGMA user_version={int(version)}")
+
+
+def migrate_db(engine: Engine) -> int:
+    """
+    Migrate a database to the current schema version.
+
+    A database without tables is created from the models and stamped with
+    the current version instead of replaying every migration.
+
+    Parameters
+    ----------
+    engine : Engine
+        Database engine
+
+    Returns
+    -------
+    int
+        Number of applied migrations.
+    """
+    with engine.begin() as connection:
+        version = get_schema_version(connection)
+        if version == SCHEMA_VERSION:
+            return 0
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Database schema version {version} is newer than the"
+                f" supported version {SCHEMA_VERSION}"
+            )
+        if not inspect(connection).has_table(Movie.__tablename__):
+            _create_schema(connection=connection)
+            _set_schema_version(connection, SCHEMA_VERSION)
+            logger.info("Created database schema version %d", SCHEMA_VERSION)
+            return SCHEMA_VERSION
+        for number, (description, migration) in enumerate(
+            MIGRATIONS[version:], start=version + 1
+        ):
+            migration(connection)
+            _set_schema_version(connection, number)
+            logger.info(
+                "Migrated database schema to version %d: %s",
+                number,
+                description,
+            )
+    return SCHEMA_VERSION - version
@@ -11,7 +11,17 @@ Last modified : Di Okt 15 17:37:42 2024 +0200
 
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Table
+from sqlalchemy import (
+    Boolean,
+    Column,
+    FetchedValue,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -28,6 +38,7 @@ movie_actors = Table(
     TableBase.metadata,
     Column("movie_id", ForeignKey("movies.id"), primary_key=True),
     Column("actor_id", ForeignKey("actors.id"), primary_key=True),
+    Index("ix_movie_actors_actor_id_movie_id", "actor_id", "movie_id"),
 )
 
 movie_categories = Table(
@@ -35,6 +46,9 @@ movie_categories = Table(
     TableBase.metadata,
     Column("movie_id", ForeignKey("movies.id"), primary_key=True),
     Column("category_id", ForeignKey("categories.id"), primary_key=True),
+    Index(
+        "ix_movie_categories_category_id_movie_id", "category_id", "movie_id"
+    ),
 )
 
 
@@ -199,9 +213,40 @@ class Movie(TableBase):
         Studio ID
     processed : bool
         Whether the movie has been processed
+    studio_sort_name : str
+        Sort name of the studio, maintained by a trigger
+    series_sort_name : str
+        Sort name of the series, maintained by a trigger
+    revision : int
+        Number of changes of the movie, maintained by triggers and started
+        at the movies change counter
+    fingerprint : str | None
+        Hash of the size and sample blocks of the file, None if unknown
+    content_hash : str | None
+        Hash of the whole file, None until it was computed
+    duration : float | None
+        Duration in seconds, None if unknown
+    width : int | None
+        Frame width in pixels
+    height : int | None
+        Frame height in pixels
+    codec : str | None
+        Video codec
+    bitrate : int | None
+        Average bitrate in bits per second
     """
 
     __tablename__ = "movies"
+    __table_args__ = (
+        Index(
+            "ix_movies_list_order",
+            "processed",
+            "studio_sort_name",
+            "series_sort_name",
+            "sort_name",
+            "id",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     filename: Mapped[str] = mapped_column(
@@ -209,20 +254,49 @@ class Movie(TableBase):
     )
     name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     sort_name: Mapped[Optional[str]] = mapped_column(
-        String(255), nullable=True
+        String(255), nullable=True, index=True
     )
     series_id: Mapped[Optional[int]] = mapped_column(
-        Integer, ForeignKey("series.id"), nullable=True
+        Integer, ForeignKey("series.id"), nullable=True, index=True
     )
     series_number: Mapped[Optional[int]] = mapped_column(
         Integer, nullable=True
     )
     studio_id: Mapped[Optional[int]] = mapped_column(
-        Integer, ForeignKey("studios.id"), nullable=True
+        Integer, ForeignKey("studios.id"), nullable=True, index=True
     )
     processed: Mapped[bool] = mapped_column(
         Boolean, default=False, nullable=False
     )
+    studio_sort_name: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        server_default="",
+        server_onupdate=FetchedValue(),
+    )
+    series_sort_name: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        server_default="",
+        server_onupdate=FetchedValue(),
+    )
+    revision: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default="0",
+        server_onupdate=FetchedValue(),
+    )
+    fingerprint: Mapped[Optional[str]] = mapped_column(
+        String(32), nullable=True, index=True
+    )
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True
+    )
+    duration: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    width: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    height: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    codec: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    bitrate: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     actors = relationship(
         "Actor",
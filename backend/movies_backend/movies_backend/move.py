@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Moves of movie files within and across filesystems.
+
+Description   : A file is renamed if source and destination are on the
+                same filesystem. Otherwise it is copied in large chunks by
+                the kernel, with copy_file_range or sendfile, so the data
+                never passes through user space. The copy is written to a
+                hidden temporary file next to the destination, synced,
+                checked against the size of the source and only then
+                renamed to the destination, so a partial copy never shows
+                up under the final name. The source is removed last, if
+                that fails the copy is removed again.
+
+Author        : Vadim Titov
+Created       : So Okt 18 14:07:45 2026 +0200
+Last modified : So Okt 18 14:07:45 2026 +0200
+"""
+
+import errno
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .config import get_logger, get_move_chunk_bytes
+
+logger = get_logger()
+
+Progress = Callable[[int], None]
+
+
+@dataclass(frozen=True)
+class MoveStats:
+    """
+    Outcome of a move.
+
+    Attributes
+    ----------
+    size : int
+        Size of the file in bytes
+    seconds : float
+        Duration of the move
+    copied : bool
+        Whether the file was copied across filesystems
+    """
+
+    size: int
+    seconds: float
+    copied: bool
+
+    @property
+    def bytes_per_second(self) -> float:
+        """
+        Get the throughput of the move.
+
+        Returns
+        -------
+        float
+            Bytes moved per second
+        """
+        return self.size / self.seconds if self.seconds else 0.0
+
+
+def _copy_range(source: int, target: int, size: int, chunk: int) -> int:
+    return os.copy_file_range(source, target, min(chunk, size))
+
+
+def _send(source: int, target: int, size: int, chunk: int) -> int:
+    return os.sendfile(target, source, None, min(chunk, size))
+
+
+def _read_write(source: int, target: int, size: int, chunk: int) -> int:
+    data = os.read(source, min(chunk, size))
+    view = memoryview(data)
+    while view:
+        view = view[os.write(target, view) :]
+    return len(data)
+
+
+# Tried in order, a method the kernel does not support for the pair of
+# filesystems fails before any data was copied
+_COPY_METHODS = (
+    ("copy_file_range", _copy_range),
+    ("sendfile", _send),
+    ("read", _read_write),
+)
+_UNSUPPORTED = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP)
+
+
+def _copy_data(
+    source: int, target: int, size: int, chunk: int, progress: Progress
+) -> None:
+    copied = 0
+    methods = [
+        method
+        for name, method in _COPY_METHODS
+        if name == "read" or hasattr(os, name)
+    ]
+    while copied < size:
+        try:
+            count = methods[0](source, target, size - copied, chunk)
+        except OSError as e:
+            if copied or e.errno not in _UNSUPPORTED or len(methods) == 1:
+                raise
+            methods.pop(0)
+            continue
+        if count == 0:
+            break
+        copied += count
+        progress(count)
+
+
+def _sync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _copy_file(src: str, dst: str, chunk: int, progress: Progress) -> int:
+    directory, name = os.path.split(dst)
+    temporary = os.path.join(directory, f".{name}.part")
+    size = os.stat(src).st_size
+    with open(src, "rb") as source:
+        target = os.open(
+            temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644
+        )
+        try:
+            _copy_data(source.fileno(), target, size, chunk, progress)
+            os.fsync(target)
+            copied = os.fstat(target).st_size
+        except BaseException:
+            os.close(target)
+            os.unlink(temporary)
+            raise
+        os.close(target)
+    if copied != size:
+        os.unlink(temporary)
+        raise OSError(
+            errno.EIO, f"Copied {copied} of {size} bytes of {src}", dst
+        )
+    shutil.copystat(src, temporary)
+    os.replace(temporary, dst)
+    _sync_dir(directory or ".")
+    try:
+        os.unlink(src)
+    except OSError:
+        # The source stays, so the copy must not be left as a second file
+        os.unlink(dst)
+        raise
+    return size
+
+
+def move_file(
+    src: str,
+    dst: str,
+    progress: Optional[Progress] = None,
+    chunk: Optional[int] = None,
+) -> MoveStats:
+    """
+    Move a file, copying it if it moves to another filesystem.
+
+    Parameters
+    ----------
+    src : str
+        Path of the file
+    dst : str
+        Path to move the file to, it must not exist
+    progress : Optional[Progress]
+        Called with the number of bytes moved after every chunk
+    chunk : Optional[int]
+        Bytes copied per system call, read from the environment if None
+
+    Returns
+    -------
+    MoveStats
+        Size and duration of the move
+
+    Raises
+    ------
+    OSError
+        If the file cannot be moved, the source is left in place
+    """
+    start = time.monotonic()
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    else:
+        size = os.stat(dst).st_size
+        if progress is not None:
+            progress(size)
+        return MoveStats(
+            size=size, seconds=time.monotonic() - start, copied=False
+        )
+    size = _copy_file(
+        src=src,
+        dst=dst,
+        chunk=chunk or get_move_chunk_bytes(),
+        progress=progress or (lambda _: None),
+    )
+    stats = MoveStats(size=size, seconds=time.monotonic() - start, copied=True)
+    logger.debug(
+        "Copied %s to %s, %d bytes at %.1f MiB/s",
+        src,
+        dst,
+        stats.size,
+        stats.bytes_per_second / 1024 / 1024,
+    )
+    return stats
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Keyset pagination cursors.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 14:02:17 2026 +0200
+Last modified : Sa Okt 17 14:02:17 2026 +0200
+"""
+
+import base64
+import binascii
+import json
+from typing import NamedTuple, Optional, Protocol, Tuple
+
+from .exceptions import InvalidCursorException
+
+
+class MovieKey(Protocol):
+    """A movie or a projected row holding the list order columns."""
+
+    @property
+    def processed(self) -> bool:
+        """Whether the movie has been processed."""
+
+    @property
+    def studio_sort_name(self) -> str:
+        """Sort name of the studio."""
+
+    @property
+    def series_sort_name(self) -> str:
+        """Sort name of the series."""
+
+    @property
+    def sort_name(self) -> Optional[str]:
+        """Sort name of the movie."""
+
+    @property
+    def id(self) -> int:
+        """Movie ID."""
+
+
+class MovieCursor(NamedTuple):
+    """
+    Position in the movie list.
+
+    The key follows the list order: processed, studio sort name, series
+    sort name, movie sort name and ID.
+
+    Attributes
+    ----------
+    processed : bool
+        Whether the movie has been processed
+    studio_sort_name : str
+        Sort name of the studio
+    series_sort_name : str
+        Sort name of the series
+    sort_name : str
+        Sort name of the movie
+    id : int
+        Movie ID
+    backward : bool
+        Whether the page ends before instead of starting after the key
+    """
+
+    processed: bool
+    studio_sort_name: str
+    series_sort_name: str
+    sort_name: str
+    id: int
+    backward: bool = False
+
+    @property
+    def key(self) -> Tuple[bool, str, str, str, int]:
+        """
+        Get the sort key.
+
+        Returns
+        -------
+        Tuple[bool, str, str, str, int]
+            The sort key.
+        """
+        return (
+            self.processed,
+            self.studio_sort_name,
+            self.series_sort_name,
+            self.sort_name,
+            self.id,
+        )
+
+    @classmethod
+    def from_movie(
+        cls, movie: MovieKey, backward: bool = False
+    ) -> "MovieCursor":
+        """
+        Get the cursor of a movie.
+
+        Parameters
+        ----------
+        movie : MovieKey
+            The movie or a projected row of it
+        backward : bool
+            Whether the page ends before the movie
+
+        Returns
+        -------
+        MovieCursor
+            The cursor.
+        """
+        return cls(
+            processed=movie.processed,
+            studio_sort_name=movie.studio_sort_name,
+            series_sort_name=movie.series_sort_name,
+            sort_name=movie.sort_name or "",
+            id=movie.id,
+            backward=backward,
+        )
+
+    def encode(self) -> str:
+        """
+        Encode the cursor as an opaque URL safe token.
+
+        Returns
+        -------
+        str
+            The token.
+        """
+        data = json.dumps(list(self), separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "MovieCursor":
+        """
+        Decode a cursor token.
+
+        Parameters
+        ----------
+        token : str
+            The token
+
+        Returns
+        -------
+        MovieCursor
+            The cursor.
+        """
+        try:
+            data = json.loads(
+                base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            )
+            processed, studio, series, name, movie_id, backward = data
+            if not (
+                isinstance(processed, bool)
+                and isinstance(studio, str)
+                and isinstance(series, str)
+                and isinstance(name, str)
+                and isinstance(movie_id, int)
+                and isinstance(backward, bool)
+            ):
+                raise ValueError("Invalid cursor field types")
+        except (binascii.Error, TypeError, ValueError) as e:
+            raise InvalidCursorException(f"Invalid cursor {token}") from e
+        return cls(processed, studio, series, name, movie_id, backward)
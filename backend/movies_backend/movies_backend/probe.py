@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Media metadata of MP4 and Matroska movie files.
+
+Description   : The container headers are walked with seeked reads of the
+                box and element headers, so the sample tables, clusters
+                and codec private data are skipped and only the few boxes
+                or elements holding the duration, frame size and codec are
+                read. Probing a file costs a few KB of I/O wherever its
+                headers are, and read ahead is disabled, so it stays cheap
+                on spinning disks.
+
+                Invoke with `python -m movies_backend.probe` to probe the
+                movies added before media metadata existed.
+
+Author        : Vadim Titov
+Created       : So Okt 18 18:24:09 2026 +0200
+Last modified : So Okt 18 18:24:09 2026 +0200
+"""
+
+import argparse
+import os
+import struct
+import time
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .config import (
+    get_engine_profile,
+    get_logger,
+    get_sqlite_path,
+    setup_logging,
+)
+from .database import create_db_engine, read_only_engine
+from .fingerprint import BACKFILL_BATCH_SIZE, hash_files
+from .migrations import migrate_db
+from .models import Movie
+from .util import PathType, get_movie_path
+
+logger = get_logger()
+
+# Sample entry types of MP4 video tracks
+MP4_CODECS = {
+    "avc1": "h264",
+    "avc3": "h264",
+    "hvc1": "hevc",
+    "hev1": "hevc",
+    "av01": "av1",
+    "vp09": "vp9",
+    "mp4v": "mpeg4",
+}
+# Codec IDs of Matroska video tracks
+MKV_CODECS = {
+    "V_MPEG4/ISO/AVC": "h264",
+    "V_MPEGH/ISO/HEVC": "hevc",
+    "V_AV1": "av1",
+    "V_VP9": "vp9",
+    "V_VP8": "vp8",
+    "V_MPEG4/ISO/ASP": "mpeg4",
+    "V_MPEG2": "mpeg2",
+}
+# Boxes that only hold other boxes
+_MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+_MP4_TOP_LEVEL = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide"}
+
+# Matroska element IDs
+_EBML = 0x1A45DFA3
+_SEGMENT = 0x18538067
+_SEEK_HEAD = 0x114D9B74
+_SEEK = 0x4DBB
+_SEEK_ID = 0x53AB
+_SEEK_POSITION = 0x53AC
+_INFO = 0x1549A966
+_TIMESTAMP_SCALE = 0x2AD7B1
+_DURATION = 0x4489
+_TRACKS = 0x1654AE6B
+_TRACK_ENTRY = 0xAE
+_TRACK_TYPE = 0x83
+_CODEC_ID = 0x86
+_VIDEO = 0xE0
+_PIXEL_WIDTH = 0xB0
+_PIXEL_HEIGHT = 0xBA
+_CLUSTER = 0x1F43B675
+_VIDEO_TRACK = 1
+# Elements larger than this are never read whole
+_MAX_ELEMENT_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    Media metadata of a movie file.
+
+    Attributes
+    ----------
+    duration : Optional[float]
+        Duration in seconds
+    width : Optional[int]
+        Frame width of the video track in pixels
+    height : Optional[int]
+        Frame height of the video track in pixels
+    codec : Optional[str]
+        Codec of the video track
+    bitrate : Optional[int]
+        Average bitrate of the file in bits per second
+    """
+
+    duration: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    codec: Optional[str] = None
+    bitrate: Optional[int] = None
+
+
+@dataclass
+class _Probe:
+    duration: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    codec: Optional[str] = None
+
+
+def _read(f: BinaryIO, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError(f"Truncated file at offset {offset}")
+    return data
+
+
+def _mp4_boxes(
+    f: BinaryIO, start: int, end: int
+) -> Iterator[Tuple[bytes, int, int]]:
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack(">I4s", _read(f, offset, 8))
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", _read(f, offset + 8, 8))
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            raise ValueError(f"Invalid box size {size} at offset {offset}")
+        yield kind, offset + header, min(offset + size, end)
+        offset += size
+
+
+def _mp4_payload(f: BinaryIO, start: int, end: int, size: int) -> bytes:
+    return _read(f, start, min(size, end - start))
+
+
+def _mp4_track(f: BinaryIO, start: int, end: int, probe: _Probe) -> None:
+    video = False
+    width = height = 0
+    codec = None
+    pending = [(start, end)]
+    while pending:
+        for kind, box_start, box_end in _mp4_boxes(f, *pending.pop()):
+            if kind in _MP4_CONTAINERS:
+                pending.append((box_start, box_end))
+            elif kind == b"tkhd":
+                data = _mp4_payload(f, box_start, box_end, 96)
+                at = 88 if data[0] == 1 else 76
+                width, height = (
+                    value >> 16
+                    for value in struct.unpack_from(">II", data, at)
+                )
+            elif kind == b"hdlr":
+                data = _mp4_payload(f, box_start, box_end, 12)
+                video = data[8:12] == b"vide"
+            elif kind == b"stsd":
+                data = _mp4_payload(f, box_start, box_end, 44)
+                entry = data[12:16].decode("latin-1")
+                codec = MP4_CODECS.get(entry, entry)
+                if not width:
+                    width, height = struct.unpack_from(">HH", data, 40)
+    if video and probe.codec is None:
+        probe.codec = codec
+        probe.width = width or None
+        probe.height = height or None
+
+
+def _probe_mp4(f: BinaryIO, size: int) -> Optional[_Probe]:
+    probe = _Probe()
+    for kind, start, end in _mp4_boxes(f, 0, size):
+        if kind != b"moov":
+            continue
+        for child, child_start, child_end in _mp4_boxes(f, start, end):
+            if child == b"mvhd":
+                data = _mp4_payload(f, child_start, child_end, 32)
+                if data[0] == 1:
+                    timescale, duration = struct.unpack_from(">IQ", data, 20)
+                else:
+                    timescale, duration = struct.unpack_from(">II", data, 12)
+                if timescale:
+                    probe.duration = duration / timescale
+            elif child == b"trak":
+                _mp4_track(f, child_start, child_end, probe)
+        return probe
+    return None
+
+
+def _ebml_number(data: bytes, at: int, mask: bool) -> Tuple[int, int]:
+    first = data[at]
+    length = 8 - first.bit_length() + 1
+    if first == 0 or at + length > len(data):
+        raise ValueError(f"Invalid EBML number at {at}")
+    value = first & (0xFF >> length) if mask else first
+    for byte in data[at + 1 : at + length]:
+        value = value << 8 | byte
+    if mask and value == (1 << (7 * length)) - 1:
+        # All ones is an unknown size
+        value = -1
+    return value, at + length
+
+
+def _ebml_elements(
+    f: BinaryIO, start: int, end: int
+) -> Iterator[Tuple[int, int, int]]:
+    offset = start
+    while offset < end:
+        f.seek(offset)
+        header = f.read(min(12, end - offset))
+        if len(header) < 2:
+            return
+        element, at = _ebml_number(header, 0, mask=False)
+        size, at = _ebml_number(header, at, mask=True)
+        data_start = offset + at
+        data_end = end if size < 0 else min(data_start + size, end)
+        yield element, data_start, data_end
+        offset = data_end
+
+
+def _ebml_value(f: BinaryIO, start: int, end: int) -> bytes:
+    if end - start > _MAX_ELEMENT_BYTES:
+        raise ValueError(f"Element at {start} is too large")
+    return _read(f, start, end - start)
+
+
+def _ebml_uint(f: BinaryIO, start: int, end: int) -> int:
+    return int.from_bytes(_ebml_value(f, start, end), "big")
+
+
+def _mkv_info(f: BinaryIO, start: int, end: int, probe: _Probe) -> None:
+    scale = 1000000
+    duration = None
+    for element, data_start, data_end in _ebml_elements(f, start, end):
+        if element == _TIMESTAMP_SCALE:
+            scale = _ebml_uint(f, data_start, data_end)
+        elif element == _DURATION:
+            data = _ebml_value(f, data_start, data_end)
+            (duration,) = struct.unpack(">f" if len(data) == 4 else ">d", data)
+    if duration is not None:
+        probe.duration = duration * scale / 1e9
+
+
+def _mkv_tracks(f: BinaryIO, start: int, end: int, probe: _Probe) -> None:
+    for entry, entry_start, entry_end in _ebml_elements(f, start, end):
+        if entry != _TRACK_ENTRY:
+            continue
+        values: Dict[int, int | str] = {}
+        for element, data_start, data_end in _ebml_elements(
+            f, entry_start, entry_end
+        ):
+            if element == _TRACK_TYPE:
+                values[element] = _ebml_uint(f, data_start, data_end)
+            elif element == _CODEC_ID:
+                values[element] = (
+                    _ebml_value(f, data_start, data_end)
+                    .rstrip(b"\0")
+                    .decode("ascii", "replace")
+                )
+            elif element == _VIDEO:
+                for child, child_start, child_end in _ebml_elements(
+                    f, data_start, data_end
+                ):
+                    if child in (_PIXEL_WIDTH, _PIXEL_HEIGHT):
+                        values[child] = _ebml_uint(f, child_start, child_end)
+        if values.get(_TRACK_TYPE) == _VIDEO_TRACK:
+            codec = str(values.get(_CODEC_ID, ""))
+            probe.codec = MKV_CODECS.get(codec, codec or None)
+            probe.width = int(values.get(_PIXEL_WIDTH, 0)) or None
+            probe.height = int(values.get(_PIXEL_HEIGHT, 0)) or None
+            return
+
+
+def _mkv_seek_head(f: BinaryIO, start: int, end: int) -> Dict[int, int]:
+    positions = {}
+    for seek, seek_start, seek_end in _ebml_elements(f, start, end):
+        if seek != _SEEK:
+            continue
+        target = position = None
+        for element, data_start, data_end in _ebml_elements(
+            f, seek_start, seek_end
+        ):
+            if element == _SEEK_ID:
+                target = _ebml_uint(f, data_start, data_end)
+            elif element == _SEEK_POSITION:
+                position = _ebml_uint(f, data_start, data_end)
+        if target is not None and position is not None:
+            positions[target] = position
+    return positions
+
+
+def _probe_mkv(f: BinaryIO, size: int) -> Optional[_Probe]:
+    elements = _ebml_elements(f, 0, size)
+    header = next(elements, None)
+    if header is None or header[0] != _EBML:
+        return None
+    segment = next(elements, None)
+    if segment is None or segment[0] != _SEGMENT:
+        return None
+    _, segment_start, segment_end = segment
+    probe = _Probe()
+    sections = {_INFO: _mkv_info, _TRACKS: _mkv_tracks}
+    positions: Dict[int, int] = {}
+    for element, start, end in _ebml_elements(f, segment_start, segment_end):
+        if element == _SEEK_HEAD and not positions:
+            positions = _mkv_seek_head(f, start, end)
+        elif element in sections:
+            sections.pop(element)(f, start, end, probe)
+        elif element == _CLUSTER:
+            # The media data follows, the seek head locates the rest
+            break
+        if not sections:
+            return probe
+    for element, parse in sections.items():
+        if element not in positions:
+            continue
+        found = next(
+            _ebml_elements(f, segment_start + positions[element], segment_end),
+            None,
+        )
+        if found is not None and found[0] == element:
+            parse(f, found[1], found[2], probe)
+    return probe
+
+
+def probe_media(f: BinaryIO, size: int) -> Optional[MediaInfo]:
+    """
+    Get the media metadata of an MP4 or Matroska file.
+
+    Parameters
+    ----------
+    f : BinaryIO
+        The file, opened for reading in binary mode
+    size : int
+        Size of the file in bytes
+
+    Returns
+    -------
+    Optional[MediaInfo]
+        The media metadata, None if the file is no MP4 or Matroska file or
+        its headers are broken
+    """
+    try:
+        head = _read(f, 0, 8) if size >= 8 else b""
+        if head[:4] == _EBML.to_bytes(4, "big"):
+            probe = _probe_mkv(f, size)
+        elif head[4:8] in _MP4_TOP_LEVEL:
+            probe = _probe_mp4(f, size)
+        else:
+            return None
+    except (ValueError, struct.error, IndexError, UnicodeDecodeError) as e:
+        logger.debug("Invalid media headers: %r", e)
+        return None
+    if probe is None:
+        return None
+    bitrate = None
+    if probe.duration:
+        bitrate = round(size * 8 / probe.duration)
+    return MediaInfo(
+        duration=probe.duration,
+        width=probe.width,
+        height=probe.height,
+        codec=probe.codec,
+        bitrate=bitrate,
+    )
+
+
+def probe_file(path: str) -> Optional[MediaInfo]:
+    """
+    Get the media metadata of a movie file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file
+
+    Returns
+    -------
+    Optional[MediaInfo]
+        The media metadata, None if the format is not supported
+
+    Raises
+    ------
+    OSError
+        If the file cannot be read
+    """
+    # Unbuffered, so every read only fetches the bytes it needs
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_RANDOM)
+        return probe_media(f, os.fstat(f.fileno()).st_size)
+
+
+def backfill(
+    engine: Engine,
+    workers: Optional[int] = None,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """
+    Probe the files of the movies without media metadata.
+
+    Parameters
+    ----------
+    engine : Engine
+        Database engine
+    workers : Optional[int]
+        Number of threads, read from the environment if None
+    batch_size : int
+        Number of movies probed per transaction
+
+    Returns
+    -------
+    Tuple[int, int]
+        Number of probed movies and of movies whose file failed
+    """
+    directory = get_movie_path(PathType.MOVIE)
+    probed = failed = last_id = 0
+    while True:
+        # Closed before the files are read, so no transaction stays open
+        with Session(read_only_engine(engine)) as db:
+            rows = db.execute(
+                select(Movie.id, Movie.filename)
+                .where(Movie.duration.is_(None), Movie.id > last_id)
+                .order_by(Movie.id)
+                .limit(batch_size)
+            ).all()
+        if not rows:
+            return probed, failed
+        last_id = rows[-1].id
+        values = []
+        for row, result in zip(
+            rows,
+            hash_files(
+                paths=[os.path.join(directory, r.filename) for r in rows],
+                hasher=probe_file,
+                workers=workers,
+            ),
+        ):
+            if isinstance(result, OSError):
+                logger.warning(repr(result))
+                failed += 1
+            elif result is not None:
+                values.append({"id": row.id, **asdict(result)})
+        if values:
+            with Session(engine) as db:
+                db.execute(update(Movie), values)
+                db.commit()
+        probed += len(values)
+
+
+def main() -> None:
+    """Probe the movies without media metadata."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    setup_logging()
+    engine = create_db_engine(
+        path=get_sqlite_path(), profile=get_engine_profile()
+    )
+    migrate_db(engine=engine)
+    start = time.monotonic()
+    probed, failed = backfill(engine=engine, workers=args.workers)
+    engine.dispose()
+    logger.info(
+        "Probed %d movies in %.1f s, %d files failed",
+        probed,
+        time.monotonic() - start,
+        failed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Rebuild the full text search index.
+
+Description   : Invoke with `python -m movies_backend.reindex`
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 16:10:36 2026 +0200
+Last modified : Sa Okt 17 16:10:36 2026 +0200
+"""
+
+from .config import (
+    get_engine_profile,
+    get_logger,
+    get_sqlite_path,
+    setup_logging,
+)
+from .database import create_db_engine
+from .migrations import migrate_db
+from .search import rebuild_search_index
+
+
+def reindex() -> int:
+    """
+    Migrate the database and rebuild its search index.
+
+    Returns
+    -------
+    int
+        Number of indexed entries.
+    """
+    engine = create_db_engine(
+        path=get_sqlite_path(), profile=get_engine_profile()
+    )
+    migrate_db(engine=engine)
+    with engine.begin() as connection:
+        count = rebuild_search_index(connection=connection)
+    engine.dispose()
+    return count
+
+
+def main() -> None:
+    """Rebuild the full text search index."""
+    setup_logging()
+    logger = get_logger()
+    count = reindex()
+    logger.info("Indexed %d movies, actors, series and studios", count)
+
+
+if __name__ == "__main__":
+    main()
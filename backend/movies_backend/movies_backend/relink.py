@@ -4,54 +4,344 @@
 """
 Summary       : Relink property files.
 
-Description   : Invoke with `python -m moviemanager.relink`
+Description   : Invoke with `python -m movies_backend.relink [--dry-run]`
+
+                The link directories are reconciled with the database.
+                The links present are listed with one scandir per
+                directory, the links wanted are read with one query, and
+                only the difference is applied: missing links are
+                created, stale links are removed and link directories
+                left empty are removed. Files that are no symbolic links
+                are never touched.
 
 Author        : Vadim Titov
 Created       : Mo Okt 14 19:17:21 2024 +0200
-Last modified : Di Okt 15 18:35:47 2024 +0200
+Last modified : So Okt 18 20:12:40 2026 +0200
 """
 
-from movies_backend.database import get_db_session, init_db
+import argparse
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy.orm import Session
 
 from .config import get_logger, setup_logging
-from .crud import get_all_movies
-from .models import Actor, Category
-from .util import (
-    update_actor_link,
-    update_category_link,
-    update_series_link,
-    update_studio_link,
+from .crud import get_all_movie_links
+from .database import db_session, init_db
+from .util import PathType, get_movie_path
+
+logger = get_logger()
+
+LINK_TYPES = (
+    PathType.ACTOR,
+    PathType.CATEGORY,
+    PathType.SERIES,
+    PathType.STUDIO,
 )
 
+# Path type and name of a link directory
+LinkDir = Tuple[PathType, str]
+# Link directory and filename of a link
+Link = Tuple[LinkDir, str]
 
-def relink_property_files() -> None:
-    """Recreates property link files from database."""
-    setup_logging()
-    logger = get_logger()
-    init_db()
-    db = next(get_db_session())
-    movies = get_all_movies(db)
-    for movie in movies:
-        logger.info("Processing %s", movie.filename)
-        actor: Actor
-        for actor in movie.actors:
-            logger.info("Adding %s actor link", actor.name)
-            update_actor_link(movie.filename, actor.name, True)
-        category: Category
-        for category in movie.categories:
-            logger.info("Adding %s category link", category.name)
-            update_category_link(movie.filename, category.name, True)
-        if movie.series is not None:
-            logger.info("Adding %s series link", movie.series.name)
-            update_series_link(movie.filename, movie.series.name, True)
-        if movie.studio is not None:
-            logger.info("Adding %s studio link", movie.studio.name)
-            update_studio_link(movie.filename, movie.studio.name, True)
+
+@dataclass
+class LinkTree:
+    """
+    Snapshot of the link directories.
+
+    Attributes
+    ----------
+    links : Dict[Link, str]
+        Target of every symbolic link
+    directories : Set[LinkDir]
+        Every link directory
+    occupied : Set[LinkDir]
+        Link directories that hold other entries than symbolic links
+    """
+
+    links: Dict[Link, str] = field(default_factory=dict)
+    directories: Set[LinkDir] = field(default_factory=set)
+    occupied: Set[LinkDir] = field(default_factory=set)
+
+
+@dataclass
+class RelinkPlan:
+    """
+    Changes that reconcile the link directories with the database.
+
+    Attributes
+    ----------
+    create_dirs : List[LinkDir]
+        Link directories to create
+    create : List[Link]
+        Links to create
+    delete : List[Link]
+        Links to remove, including links with a wrong target
+    delete_dirs : List[LinkDir]
+        Link directories to remove, they are empty afterwards
+    """
+
+    create_dirs: List[LinkDir] = field(default_factory=list)
+    create: List[Link] = field(default_factory=list)
+    delete: List[Link] = field(default_factory=list)
+    delete_dirs: List[LinkDir] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class RelinkStats:
+    """
+    Outcome of a reconciliation.
+
+    Attributes
+    ----------
+    links : int
+        Number of links wanted
+    created : int
+        Number of links created
+    deleted : int
+        Number of links removed
+    dirs_created : int
+        Number of link directories created
+    dirs_deleted : int
+        Number of link directories removed
+    failed : int
+        Number of changes that failed
+    scan_seconds : float
+        Duration of the snapshot of the link directories
+    query_seconds : float
+        Duration of the query of the wanted links
+    apply_seconds : float
+        Duration of applying the changes
+    """
+
+    links: int
+    created: int
+    deleted: int
+    dirs_created: int
+    dirs_deleted: int
+    failed: int
+    scan_seconds: float
+    query_seconds: float
+    apply_seconds: float
+
+
+def _link_dir_path(link_dir: LinkDir) -> str:
+    path_type, name = link_dir
+    return os.path.join(get_movie_path(path_type), name)
+
+
+def _dir_key(link_dir: LinkDir) -> Tuple[str, str]:
+    return link_dir[0].value, link_dir[1]
+
+
+def _link_key(link: Link) -> Tuple[str, str, str]:
+    return *_dir_key(link[0]), link[1]
+
+
+def _link_target(filename: str) -> str:
+    return f"{get_movie_path(PathType.MOVIE, False)}/{filename}"
+
+
+def scan_link_tree() -> LinkTree:
+    """
+    Take a snapshot of the link directories.
+
+    Returns
+    -------
+    LinkTree
+        The links and link directories present
+    """
+    tree = LinkTree()
+    for path_type in LINK_TYPES:
+        try:
+            with os.scandir(get_movie_path(path_type)) as entries:
+                names = [
+                    entry.name
+                    for entry in entries
+                    if entry.is_dir(follow_symlinks=False)
+                ]
+        except FileNotFoundError:
+            continue
+        for name in names:
+            link_dir = (path_type, name)
+            tree.directories.add(link_dir)
+            with os.scandir(_link_dir_path(link_dir)) as entries:
+                for entry in entries:
+                    if entry.is_symlink():
+                        tree.links[(link_dir, entry.name)] = os.readlink(
+                            entry.path
+                        )
+                    else:
+                        tree.occupied.add(link_dir)
+    return tree
+
+
+def plan_relink(tree: LinkTree, wanted: Set[Link]) -> RelinkPlan:
+    """
+    Plan the changes that turn the links present into the wanted links.
+
+    Parameters
+    ----------
+    tree : LinkTree
+        The links present
+    wanted : Set[Link]
+        The wanted links
+
+    Returns
+    -------
+    RelinkPlan
+        The changes
+    """
+    plan = RelinkPlan()
+    kept: Set[LinkDir] = set()
+    for link, target in tree.links.items():
+        if link in wanted and target == _link_target(link[1]):
+            kept.add(link[0])
+        else:
+            plan.delete.append(link)
+    plan.create = [
+        link
+        for link in wanted
+        if tree.links.get(link) != _link_target(link[1])
+    ]
+    created = {link_dir for link_dir, _ in plan.create}
+    plan.create_dirs = sorted(created - tree.directories, key=_dir_key)
+    plan.delete_dirs = sorted(
+        tree.directories - kept - created - tree.occupied, key=_dir_key
+    )
+    plan.create.sort(key=_link_key)
+    plan.delete.sort(key=_link_key)
+    return plan
+
+
+def apply_relink(plan: RelinkPlan) -> int:
+    """
+    Apply the changes, a change that fails is logged and skipped.
+
+    Parameters
+    ----------
+    plan : RelinkPlan
+        The changes
+
+    Returns
+    -------
+    int
+        Number of changes that failed
+    """
+    failed = 0
+    for link_dir in plan.create_dirs:
+        try:
+            os.makedirs(_link_dir_path(link_dir), exist_ok=True)
+        except OSError as e:
+            logger.error(repr(e))
+            failed += 1
+    # Links with a wrong target are removed before they are recreated
+    for link_dir, filename in plan.delete:
+        try:
+            os.remove(os.path.join(_link_dir_path(link_dir), filename))
+        except OSError as e:
+            logger.error(repr(e))
+            failed += 1
+    for link_dir, filename in plan.create:
+        try:
+            os.symlink(
+                _link_target(filename),
+                os.path.join(_link_dir_path(link_dir), filename),
+            )
+        except OSError as e:
+            logger.error(repr(e))
+            failed += 1
+    for link_dir in plan.delete_dirs:
+        try:
+            os.rmdir(_link_dir_path(link_dir))
+        except OSError as e:
+            logger.error(repr(e))
+            failed += 1
+    return failed
+
+
+def relink_property_files(db: Session, dry_run: bool = False) -> RelinkStats:
+    """
+    Reconcile the property link files with the database.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    dry_run : bool
+        Whether to only log the changes instead of applying them
+
+    Returns
+    -------
+    RelinkStats
+        Number of changes and durations of the steps
+    """
+    start = time.monotonic()
+    tree = scan_link_tree()
+    scanned = time.monotonic()
+    wanted = {
+        ((path_type, name), filename)
+        for path_type, name, filename in get_all_movie_links(db=db)
+    }
+    queried = time.monotonic()
+    plan = plan_relink(tree=tree, wanted=wanted)
+    if dry_run:
+        for link_dir in plan.create_dirs:
+            logger.info("Would create directory %s", _link_dir_path(link_dir))
+        for link_dir, filename in plan.delete:
+            logger.info(
+                "Would remove link %s/%s", _link_dir_path(link_dir), filename
+            )
+        for link_dir, filename in plan.create:
+            logger.info(
+                "Would create link %s/%s", _link_dir_path(link_dir), filename
+            )
+        for link_dir in plan.delete_dirs:
+            logger.info("Would remove directory %s", _link_dir_path(link_dir))
+        failed = 0
+    else:
+        failed = apply_relink(plan=plan)
+    return RelinkStats(
+        links=len(wanted),
+        created=len(plan.create),
+        deleted=len(plan.delete),
+        dirs_created=len(plan.create_dirs),
+        dirs_deleted=len(plan.delete_dirs),
+        failed=failed,
+        scan_seconds=scanned - start,
+        query_seconds=queried - scanned,
+        apply_seconds=time.monotonic() - queried,
+    )
 
 
 def main() -> None:
-    """Recreate property link files from database."""
-    relink_property_files()
+    """Reconcile the property link files with the database."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only log the changes"
+    )
+    args = parser.parse_args()
+    setup_logging()
+    init_db()
+    with db_session(read_only=True) as db:
+        stats = relink_property_files(db=db, dry_run=args.dry_run)
+    logger.info(
+        "%s %d links: %d created, %d removed, %d directories created,"
+        " %d removed, %d failed; scan %.3f s, query %.3f s, apply %.3f s",
+        "Planned" if args.dry_run else "Reconciled",
+        stats.links,
+        stats.created,
+        stats.deleted,
+        stats.dirs_created,
+        stats.dirs_deleted,
+        stats.failed,
+        stats.scan_seconds,
+        stats.query_seconds,
+        stats.apply_seconds,
+    )
 
 
 if __name__ == "__main__":
@@ -12,7 +12,10 @@ Last modified : Di Okt 15 18:24:07 2024 +0200
 # flake8: noqa: F401
 from . import (
     actors,
+    cache,
     categories,
+    export,
+    jobs,
     movie_actor,
     movie_category,
     movies,
@@ -9,21 +9,26 @@ Created       : Di Okt 15 17:54:39 2024 +0200
 Last modified : Di Okt 15 18:06:58 2024 +0200
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.exceptions import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..config import get_logger
+from ..cache import PROPERTY_CACHE
+from ..cascade import cascade_rename
+from ..changes import get_change_counters_async
+from ..config import get_fast_json, get_logger
 from ..crud import (
     add_actor,
     delete_actor,
     get_actor,
-    get_all_actors,
-    update_actor,
+    get_all_actors_async,
+    get_all_property_rows_async,
 )
-from ..database import get_db_session
+from ..database import async_db_session, get_db_session
+from ..etag import check_etag, etag_headers, make_etag
 from ..exceptions import (
     DuplicateEntryException,
     IntegrityConstraintException,
@@ -37,7 +42,7 @@ from ..schemas import (
     MessageSchema,
     MoviePropertySchema,
 )
-from ..util import rename_movie_file
+from ..serialization import encode_rows, json_response
 
 logger = get_logger()
 router = APIRouter(prefix="/actors")
@@ -138,6 +143,18 @@ def actors_delete(
     return {"message": f"Actor with ID {actor_id} deleted"}
 
 
+async def _load_actors(db: AsyncSession) -> List[ActorSchema] | bytes:
+    if get_fast_json():
+        rows = await get_all_property_rows_async(
+            db=db, model=Actor, schema=ActorSchema
+        )
+        return encode_rows(schema=ActorSchema, rows=rows)
+    return [
+        ActorSchema.model_validate(actor)
+        for actor in await get_all_actors_async(db=db)
+    ]
+
+
 @router.get(
     "",
     response_model=List[ActorSchema],
@@ -145,21 +162,44 @@ def actors_delete(
     summary="Get all actors",
     tags=["actors"],
 )
-def actors_get_all(db: Session = Depends(get_db_session)) -> List[Actor]:
+async def actors_get_all(
+    request: Request, response: Response
+) -> List[ActorSchema] | Response:
     """
     Get all actors.
 
+    The list is cached until an actor is added, renamed or deleted. Its
+    entity tag is derived from the change counter of the table, which is
+    read on every request, so changes by other workers are seen at once.
+
     Parameters
     ----------
-    db : Session
-        Database session
+    request : Request
+        The request
+    response : Response
+        The response
 
     Returns
     -------
-    List[Actor]
+    List[ActorSchema] | Response
         List of all actors
     """
-    return get_all_actors(db=db)
+    async with async_db_session() as db:
+        versions = await get_change_counters_async(
+            db=db, tables=(Actor.__tablename__,)
+        )
+        etag = make_etag(kind="actors", versions=versions)
+        not_modified = check_etag(
+            request=request, response=response, etag=etag
+        )
+        if not_modified is not None:
+            return not_modified
+        items = await PROPERTY_CACHE.get_or_load(
+            Actor.__tablename__, versions, lambda: _load_actors(db=db)
+        )
+    if isinstance(items, bytes):
+        return json_response(body=items, headers=etag_headers(etag=etag))
+    return items
 
 
 @router.put(
@@ -206,18 +246,17 @@ def actors_update(
         The updated actor
     """
     try:
-        actor: Optional[Actor] = get_actor(db=db, actor_id=actor_id)
-        if actor is not None:
-            actor_name = actor.name
-        else:
-            actor_name = ""
+        actor = get_actor(db=db, actor_id=actor_id)
+        if actor is None:
+            raise InvalidIDException(f"Actor ID {actor_id} does not exist")
+        actor_name = actor.name
         new_actor_name = body.name.strip()
-        actor = update_actor(
-            db=db, actor_id=actor_id, actor_name=new_actor_name
-        )
-        for movie in actor.movies:
-            rename_movie_file(movie=movie, actor_current=actor_name)
-            db.commit()
+        report = cascade_rename(db=db, entity=actor, name=new_actor_name)
+        if report.failed:
+            raise PathException(
+                f"Renaming {len(report.failed)} movie files failed",
+                report.failed,
+            )
         logger.debug("Renamed actor %s -> %s", actor_name, new_actor_name)
     except DuplicateEntryException as e:
         logger.warning(repr(e))
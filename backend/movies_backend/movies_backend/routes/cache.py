@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Cache endpoint.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 19:31:08 2026 +0200
+Last modified : Sa Okt 17 19:31:08 2026 +0200
+"""
+
+from fastapi import APIRouter
+
+from ..cache import MOVIE_LIST_SNAPSHOT, PROPERTY_CACHE
+from ..schemas import CacheStatsSchema, SnapshotStatsSchema
+
+router = APIRouter(prefix="/cache")
+
+
+@router.get(
+    "",
+    response_model=CacheStatsSchema,
+    response_description="Hits and misses of the caches",
+    summary="Get cache statistics",
+    tags=["cache"],
+)
+def cache_stats() -> CacheStatsSchema:
+    """
+    Get the statistics of the property list cache and movie list snapshot.
+
+    Returns
+    -------
+    CacheStatsSchema
+        Hits and misses since the database was initialized
+    """
+    stats = PROPERTY_CACHE.stats()
+    movies = MOVIE_LIST_SNAPSHOT.stats()
+    return CacheStatsSchema(
+        hits=stats.hits,
+        misses=stats.misses,
+        movies=SnapshotStatsSchema(
+            hits=movies.hits, misses=movies.misses, size=movies.size
+        ),
+    )
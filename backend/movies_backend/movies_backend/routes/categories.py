@@ -11,38 +11,56 @@ Last modified : Di Okt 15 18:12:22 2024 +0200
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.exceptions import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..config import get_logger
+from ..cache import PROPERTY_CACHE
+from ..changes import get_change_counters_async
+from ..config import get_fast_json, get_logger
 from ..crud import (
     add_category,
     delete_category,
-    get_all_categories,
+    get_all_categories_async,
+    get_all_property_rows_async,
     get_category,
     update_category,
 )
-from ..database import get_db_session
+from ..database import async_db_session, get_db_session
+from ..etag import check_etag, etag_headers, make_etag
 from ..exceptions import (
     DuplicateEntryException,
     IntegrityConstraintException,
     InvalidIDException,
     PathException,
 )
-from ..models import Category, Movie
+from ..models import Category
 from ..schemas import (
     CategorySchema,
     HTTPExceptionSchema,
     MessageSchema,
     MoviePropertySchema,
 )
-from ..util import update_category_link
+from ..serialization import encode_rows, json_response
+from ..util import PathType, rename_link_dir
 
 logger = get_logger()
 router = APIRouter(prefix="/categories")
 
 
+async def _load_categories(db: AsyncSession) -> List[CategorySchema] | bytes:
+    if get_fast_json():
+        rows = await get_all_property_rows_async(
+            db=db, model=Category, schema=CategorySchema
+        )
+        return encode_rows(schema=CategorySchema, rows=rows)
+    return [
+        CategorySchema.model_validate(category)
+        for category in await get_all_categories_async(db=db)
+    ]
+
+
 @router.get(
     "",
     response_model=List[CategorySchema],
@@ -50,23 +68,44 @@ router = APIRouter(prefix="/categories")
     summary="Get all categories",
     tags=["categories"],
 )
-def categories_get_all(
-    db: Session = Depends(get_db_session),
-) -> List[Category]:
+async def categories_get_all(
+    request: Request, response: Response
+) -> List[CategorySchema] | Response:
     """
     Get all categories.
 
+    The list is cached until a category is added, renamed or deleted. Its
+    entity tag is derived from the change counter of the table, which is
+    read on every request, so changes by other workers are seen at once.
+
     Parameters
     ----------
-    db : Session
-        Database session
+    request : Request
+        The request
+    response : Response
+        The response
 
     Returns
     -------
-    List[Category]
+    List[CategorySchema] | Response
         List of all categories
     """
-    return get_all_categories(db=db)
+    async with async_db_session() as db:
+        versions = await get_change_counters_async(
+            db=db, tables=(Category.__tablename__,)
+        )
+        etag = make_etag(kind="categories", versions=versions)
+        not_modified = check_etag(
+            request=request, response=response, etag=etag
+        )
+        if not_modified is not None:
+            return not_modified
+        items = await PROPERTY_CACHE.get_or_load(
+            Category.__tablename__, versions, lambda: _load_categories(db=db)
+        )
+    if isinstance(items, bytes):
+        return json_response(body=items, headers=etag_headers(etag=etag))
+    return items
 
 
 @router.post(
@@ -167,18 +206,11 @@ def categories_update(
         category = update_category(
             db=db, category_id=category_id, category_name=new_category_name
         )
-        movie: Movie
-        for movie in category.movies:
-            update_category_link(
-                filename=movie.filename,
-                category_name=category_name,
-                selected=False,
-            )
-            update_category_link(
-                filename=movie.filename,
-                category_name=new_category_name,
-                selected=True,
-            )
+        rename_link_dir(
+            path_type=PathType.CATEGORY,
+            name_current=category_name,
+            name_new=new_category_name,
+        )
         logger.debug(
             "Renamed category %s -> %s", category_name, new_category_name
         )
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Catalog export endpoints.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 23:10:47 2026 +0200
+Last modified : Sa Okt 17 23:10:47 2026 +0200
+"""
+
+from typing import AsyncIterator, Callable, Dict, Sequence
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from ..config import get_export_batch_size, get_logger
+from ..crud import stream_movies_async
+from ..database import async_db_session
+from ..export import encode_csv, encode_csv_header, encode_ndjson
+from ..models import Movie
+
+logger = get_logger()
+router = APIRouter(prefix="/export")
+
+
+async def _stream_movies(
+    encode: Callable[[Sequence[Movie]], bytes], header: bytes = b""
+) -> AsyncIterator[bytes]:
+    # The session is opened by the stream itself, as the response body is
+    # sent after the request dependencies may have been closed.
+    if header:
+        yield header
+    count = 0
+    async with async_db_session() as db:
+        async for batch in stream_movies_async(
+            db=db, batch_size=get_export_batch_size()
+        ):
+            count += len(batch)
+            yield encode(batch)
+    logger.debug("Exported %d movies", count)
+
+
+def _attachment(filename: str) -> Dict[str, str]:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+@router.get(
+    "/movies.ndjson",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One movie per line",
+        }
+    },
+    summary="Export movies as NDJSON",
+    tags=["export"],
+)
+def export_movies_ndjson() -> StreamingResponse:
+    """
+    Stream all movies with their properties as newline delimited JSON.
+
+    Returns
+    -------
+    StreamingResponse
+        One movie per line, in list order
+    """
+    return StreamingResponse(
+        _stream_movies(encode=encode_ndjson),
+        media_type="application/x-ndjson",
+        headers=_attachment("movies.ndjson"),
+    )
+
+
+@router.get(
+    "/movies.csv",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/csv": {}},
+            "description": "A header row and one movie per row",
+        }
+    },
+    summary="Export movies as CSV",
+    tags=["export"],
+)
+def export_movies_csv() -> StreamingResponse:
+    """
+    Stream all movies with the names of their properties as CSV.
+
+    Returns
+    -------
+    StreamingResponse
+        A header row and one movie per row, in list order
+    """
+    return StreamingResponse(
+        _stream_movies(encode=encode_csv, header=encode_csv_header()),
+        media_type="text/csv",
+        headers=_attachment("movies.csv"),
+    )
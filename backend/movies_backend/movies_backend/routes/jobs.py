@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Import job endpoints.
+
+Author        : Vadim Titov
+Created       : So Okt 18 10:52:09 2026 +0200
+Last modified : So Okt 18 10:52:09 2026 +0200
+"""
+
+from typing import AsyncIterator, Optional
+
+from anyio import to_thread
+from fastapi import APIRouter, Header, status
+from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..config import get_logger
+from ..importer import IMPORT_JOBS, ImportJob
+from ..schemas import HTTPExceptionSchema, ImportEventSchema, ImportJobSchema
+
+logger = get_logger()
+router = APIRouter(prefix="/jobs")
+
+# Seconds between keep-alive comments while a job has no new events
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def _get_job(job_id: str) -> ImportJob:
+    job = IMPORT_JOBS.get(job_id)
+    if job is None:
+        message = f"Job {job_id} not found"
+        logger.warning(message)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": message},
+        )
+    return job
+
+
+@router.get(
+    "/{job_id}",
+    response_model=ImportJobSchema,
+    responses={
+        404: {
+            "model": HTTPExceptionSchema,
+            "description": "Invalid ID",
+        },
+    },
+    summary="Get import job",
+    tags=["jobs"],
+)
+def jobs_get(job_id: str) -> ImportJob:
+    """
+    Get the progress of an import job.
+
+    Parameters
+    ----------
+    job_id : str
+        The job ID
+
+    Returns
+    -------
+    ImportJob
+        The counts and throughput of the job
+    """
+    return _get_job(job_id=job_id)
+
+
+async def _stream_events(job: ImportJob, after: int) -> AsyncIterator[bytes]:
+    while True:
+        events = await to_thread.run_sync(
+            job.events, after, SSE_KEEPALIVE_SECONDS
+        )
+        if not events:
+            yield b": keep-alive\n\n"
+            continue
+        for event in events:
+            data = ImportEventSchema.model_validate(event).model_dump_json()
+            yield (
+                f"id: {event.seq}\nevent: {event.kind}\ndata: {data}\n\n"
+            ).encode()
+            if event.kind == "finished":
+                return
+        after = events[-1].seq
+
+
+@router.get(
+    "/{job_id}/events",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "Server-sent events of the job",
+        },
+        404: {
+            "model": HTTPExceptionSchema,
+            "description": "Invalid ID",
+        },
+    },
+    summary="Follow import job",
+    tags=["jobs"],
+)
+def jobs_events(
+    job_id: str, last_event_id: Optional[int] = Header(None)
+) -> StreamingResponse:
+    """
+    Stream the events of an import job as server-sent events.
+
+    Every imported or failed file is one event, the stream ends with the
+    finished event of the job. Reconnecting clients resume after the last
+    event they received.
+
+    Parameters
+    ----------
+    job_id : str
+        The job ID
+    last_event_id : Optional[int]
+        Sequence number of the last event received, from the Last-Event-ID
+        header
+
+    Returns
+    -------
+    StreamingResponse
+        The events, from the first one unless resumed
+    """
+    job = _get_job(job_id=job_id)
+    return StreamingResponse(
+        _stream_events(job=job, after=last_event_id or 0),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -9,64 +9,264 @@ Created       : Di Okt 15 17:56:25 2024 +0200
 Last modified : Di Okt 15 17:56:22 2024 +0200
 """
 
-from typing import Dict, List
+import mimetypes
+import os
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
 
-from fastapi import APIRouter, Depends, status
+import anyio
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from fastapi.exceptions import HTTPException
+from fastapi.responses import FileResponse
+from pydantic import TypeAdapter
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..config import get_logger
+from ..cache import MOVIE_LIST_SNAPSHOT
+from ..changes import get_change_counters_async, get_movie_revision_async
+from ..config import (
+    get_fast_json,
+    get_logger,
+    get_max_page_size,
+    get_page_size,
+    get_snapshot_gzip,
+    get_snapshot_max_bytes,
+    get_stream_chunk_bytes,
+)
 from ..crud import (
-    add_movie,
     delete_movie,
-    get_all_movies,
-    get_movie,
-    parse_file_info,
+    get_all_movie_rows_async,
+    get_movie_async,
+    get_movie_filename_async,
+    get_movie_rows_page_async,
     update_movie,
+    update_movies_batch,
 )
-from ..database import get_db_session
+from ..database import get_async_db_session, get_db_session
+from ..etag import check_etag, etag_headers, make_etag
 from ..exceptions import (
     DuplicateEntryException,
+    InvalidCursorException,
     InvalidIDException,
-    ListFilesException,
+    JobRunningException,
     PathException,
 )
+from ..importer import IMPORT_JOBS, ImportJob, import_movies
 from ..models import Movie
+from ..pagination import MovieCursor
 from ..schemas import (
     HTTPExceptionSchema,
+    ImportJobSchema,
     MessageSchema,
+    MovieBatchSchema,
     MovieFileSchema,
+    MovieFilterSchema,
     MovieSchema,
     MovieUpdateSchema,
 )
-from ..util import PathType, get_movie_path, list_files, migrate_file
+from ..serialization import encode_rows, json_response
+from ..util import PathType, get_movie_path
 
 logger = get_logger()
 router = APIRouter(prefix="/movies")
+movie_list_adapter = TypeAdapter(List[MovieFileSchema])
+
+# Tables the movie list and a movie's detail depend on
+MOVIE_LIST_TABLES = (
+    "movies",
+    "movie_actors",
+    "movie_categories",
+    "series",
+    "studios",
+)
+MOVIE_DETAIL_TABLES = ("actors", "categories", "series", "studios")
+# Media types mimetypes does not know or gets wrong for movie files
+MOVIE_MEDIA_TYPES = {
+    ".m4v": "video/mp4",
+    ".mkv": "video/x-matroska",
+    ".ts": "video/mp2t",
+    ".webm": "video/webm",
+}
+
+
+def get_movie_filters(
+    actor: List[int] = Query([]),
+    actor_match: Literal["any", "all"] = Query("any"),
+    category: List[int] = Query([]),
+    category_match: Literal["any", "all"] = Query("any"),
+    studio: Optional[int] = Query(None),
+    series: Optional[int] = Query(None),
+    processed: Optional[bool] = Query(None),
+    name: Optional[str] = Query(None),
+) -> MovieFilterSchema:
+    """
+    Get the movie list filters from the query parameters.
+
+    Parameters
+    ----------
+    actor : List[int]
+        Actor IDs
+    actor_match : Literal["any", "all"]
+        Whether a movie needs any or all of the actors
+    category : List[int]
+        Category IDs
+    category_match : Literal["any", "all"]
+        Whether a movie needs any or all of the categories
+    studio : Optional[int]
+        Studio ID
+    series : Optional[int]
+        Series ID
+    processed : Optional[bool]
+        Processed state
+    name : Optional[str]
+        Prefix of the movie name
+
+    Returns
+    -------
+    MovieFilterSchema
+        The filters
+    """
+    return MovieFilterSchema(
+        actor=actor,
+        actor_match=actor_match,
+        category=category,
+        category_match=category_match,
+        studio=studio,
+        series=series,
+        processed=processed,
+        name=name,
+    )
+
+
+def _encode_movie_list(rows: Sequence[Row[Any]]) -> bytes:
+    if get_fast_json():
+        return encode_rows(schema=MovieFileSchema, rows=rows)
+    return movie_list_adapter.dump_json(
+        movie_list_adapter.validate_python(rows, from_attributes=True)
+    )
+
+
+async def _movies_snapshot(
+    request: Request,
+    db: AsyncSession,
+    versions: Tuple[int, ...],
+    etag: str,
+) -> Response:
+    async def build() -> bytes:
+        rows = await get_all_movie_rows_async(db=db, schema=MovieFileSchema)
+        return await anyio.to_thread.run_sync(_encode_movie_list, rows)
+
+    snapshot = await MOVIE_LIST_SNAPSHOT.get_or_build(
+        versions=versions,
+        build=build,
+        etag=etag,
+        max_size=get_snapshot_max_bytes(),
+        compress=get_snapshot_gzip(),
+    )
+    headers = etag_headers(etag=snapshot.etag)
+    headers["Vary"] = "Accept-Encoding"
+    if snapshot.body_gzip is not None and "gzip" in request.headers.get(
+        "Accept-Encoding", ""
+    ):
+        headers["Content-Encoding"] = "gzip"
+        return json_response(body=snapshot.body_gzip, headers=headers)
+    return json_response(body=snapshot.body, headers=headers)
 
 
 @router.get(
     "",
     response_model=List[MovieFileSchema],
     response_description="A list of movie IDs and filenames",
+    responses={
+        400: {
+            "model": HTTPExceptionSchema,
+            "description": "Invalid cursor",
+        }
+    },
     summary="Get all movies",
     tags=["movies"],
 )
-def movies_get_all(db: Session = Depends(get_db_session)) -> List[Movie]:
+async def movies_get_all(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None),
+    filters: MovieFilterSchema = Depends(get_movie_filters),
+    db: AsyncSession = Depends(get_async_db_session),
+) -> Sequence[Row[Any]] | Response:
     """
     Get all movies.
 
+    Without a limit or cursor all matching movies are returned. Otherwise
+    one page is returned and the cursors of the neighbouring pages are sent
+    in the X-Prev-Cursor and X-Next-Cursor headers. A cursor is only valid
+    with the filters of the page it was returned for.
+
+    The unfiltered list is served from a pre-encoded snapshot, gzipped if
+    the client accepts it. Every list is tagged with the change counters of
+    the tables it depends on, which are read on every request, and a
+    matching If-None-Match header is answered with 304. The snapshot is
+    rebuilt when it was built under other counters.
+
     Parameters
     ----------
-    db : Session
-        Database session
+    request : Request
+        The request
+    response : Response
+        The response
+    limit : Optional[int]
+        Maximum number of movies on the page
+    cursor : Optional[str]
+        Cursor of the page
+    filters : MovieFilterSchema
+        Filters the movies must match
+    db : AsyncSession
+        Async database session
 
     Returns
     -------
-    List[Movie]
-        List of all movies
+    Sequence[Row[Any]] | Response
+        List of movies
     """
-    return get_all_movies(db=db)
+    versions = await get_change_counters_async(db=db, tables=MOVIE_LIST_TABLES)
+    etag = make_etag(kind="movies", versions=versions)
+    not_modified = check_etag(request=request, response=response, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    if limit is None and cursor is None and filters == MovieFilterSchema():
+        return await _movies_snapshot(
+            request=request, db=db, versions=versions, etag=etag
+        )
+    if limit is None and cursor is None:
+        rows = await get_all_movie_rows_async(
+            db=db, schema=MovieFileSchema, filters=filters
+        )
+        if not get_fast_json():
+            return rows
+        return json_response(
+            body=encode_rows(schema=MovieFileSchema, rows=rows),
+            headers=etag_headers(etag=etag),
+        )
+    try:
+        position = None if cursor is None else MovieCursor.decode(cursor)
+    except InvalidCursorException as e:
+        logger.warning(repr(e))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": repr(e)},
+        ) from e
+    rows, prev_cursor, next_cursor = await get_movie_rows_page_async(
+        db=db,
+        limit=min(limit or get_page_size(), get_max_page_size()),
+        cursor=position,
+        schema=MovieFileSchema,
+        filters=filters,
+    )
+    if prev_cursor is not None:
+        response.headers["X-Prev-Cursor"] = prev_cursor.encode()
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor.encode()
+    return rows
 
 
 @router.get(
@@ -82,25 +282,49 @@ def movies_get_all(db: Session = Depends(get_db_session)) -> List[Movie]:
     summary="Get movie by ID",
     tags=["movies"],
 )
-def movies_get_one(
-    movie_id: int, db: Session = Depends(get_db_session)
-) -> Movie:
+async def movies_get_one(
+    movie_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> Movie | Response:
     """
     Get movie by ID.
 
+    The movie is tagged with its revision and the change counters of the
+    actors, categories, series and studios, whose names it contains. A
+    movie with a reused ID starts at a higher revision, so its tag differs
+    from the deleted movie's. A matching If-None-Match header is answered
+    with 304.
+
     Parameters
     ----------
     movie_id : int
         The movie ID.
-    db : Session
-        Database session
+    request : Request
+        The request
+    response : Response
+        The response
+    db : AsyncSession
+        Async database session
 
     Returns
     -------
-    Movie
+    Movie | Response
         The movie
     """
-    movie = get_movie(db=db, movie_id=movie_id)
+    versions = await get_movie_revision_async(
+        db=db, movie_id=movie_id, tables=MOVIE_DETAIL_TABLES
+    )
+    if versions is not None:
+        not_modified = check_etag(
+            request=request,
+            response=response,
+            etag=make_etag(kind=f"movie-{movie_id}", versions=versions),
+        )
+        if not_modified is not None:
+            return not_modified
+    movie = await get_movie_async(db=db, movie_id=movie_id, schema=MovieSchema)
     if movie is None:
         message = f"Movie with ID {movie_id} not found."
         logger.warning(message)
@@ -111,11 +335,142 @@ def movies_get_one(
     return movie
 
 
+def get_movie_media_type(filename: str) -> str:
+    """
+    Get the media type of a movie file.
+
+    Parameters
+    ----------
+    filename : str
+        The filename
+
+    Returns
+    -------
+    str
+        The media type, application/octet-stream if it is unknown
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in MOVIE_MEDIA_TYPES:
+        return MOVIE_MEDIA_TYPES[extension]
+    media_type, _ = mimetypes.guess_type(filename)
+    return media_type or "application/octet-stream"
+
+
+@router.api_route(
+    "/{movie_id}/stream",
+    methods=["GET", "HEAD"],
+    response_class=FileResponse,
+    response_description="The movie file, or the requested ranges of it",
+    responses={
+        206: {"description": "The requested ranges of the movie file"},
+        404: {
+            "model": HTTPExceptionSchema,
+            "description": "Invalid ID or missing file",
+        },
+        416: {"description": "Range not satisfiable"},
+    },
+    summary="Stream movie file",
+    tags=["movies"],
+)
+async def movies_stream(
+    movie_id: int,
+    db: AsyncSession = Depends(get_async_db_session, scope="function"),
+) -> FileResponse:
+    """
+    Stream the file of a movie.
+
+    Single and multiple byte ranges are answered with 206, the latter as
+    multipart/byteranges, and If-Range falls back to the whole file if the
+    file changed. The file is sent by the server with the pathsend
+    extension where it offers it, otherwise it is read in large chunks.
+    The database session is closed before the file is sent.
+
+    Parameters
+    ----------
+    movie_id : int
+        The movie ID.
+    db : AsyncSession
+        Async database session
+
+    Returns
+    -------
+    FileResponse
+        The movie file
+    """
+    filename = await get_movie_filename_async(db=db, movie_id=movie_id)
+    if filename is None:
+        message = f"Movie with ID {movie_id} not found."
+        logger.warning(message)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": message},
+        )
+    path = os.path.join(get_movie_path(PathType.MOVIE), filename)
+    try:
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    except OSError as e:
+        logger.warning(repr(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": repr(e)},
+        ) from e
+    response = FileResponse(
+        path=path,
+        media_type=get_movie_media_type(filename),
+        filename=filename,
+        stat_result=stat_result,
+        content_disposition_type="inline",
+    )
+    response.chunk_size = get_stream_chunk_bytes()
+    return response
+
+
 @router.post(
     "",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ImportJobSchema,
+    response_description="The started import job",
+    responses={
+        409: {
+            "model": HTTPExceptionSchema,
+            "description": "Import already running",
+        },
+    },
+    summary="Import movies from imports directory",
+    tags=["movies"],
+)
+def movies_import() -> ImportJob:
+    """
+    Start importing the movies of the imports directory in the background.
+
+    The progress is reported by /jobs/{job_id} and its events.
+
+    Returns
+    -------
+    ImportJob
+        The started import job
+    """
+    try:
+        job = IMPORT_JOBS.start(run=import_movies)
+    except JobRunningException as e:
+        logger.warning(repr(e))
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": repr(e)},
+        ) from e
+    logger.debug("Started import job %s", job.id)
+    return job
+
+
+@router.post(
+    "/batch",
     response_model=List[MovieSchema],
-    response_description="List of imported movie filenames and IDs",
+    response_description="The updated movies",
     responses={
+        404: {
+            "model": HTTPExceptionSchema,
+            "description": "Invalid ID",
+        },
         409: {
             "model": HTTPExceptionSchema,
             "description": "Duplicate entry",
@@ -125,63 +480,48 @@ def movies_get_one(
             "description": "Path error",
         },
     },
-    summary="Import movies from imports directory",
+    summary="Add and remove actors and categories of several movies",
     tags=["movies"],
 )
-def movies_import(db: Session = Depends(get_db_session)) -> List[Movie]:
+def movies_update_batch(
+    body: MovieBatchSchema, db: Session = Depends(get_db_session)
+) -> List[Movie]:
     """
-    Import movies from the given directory.
+    Add and remove actors and categories of several movies.
 
     Parameters
     ----------
+    body : MovieBatchSchema
+        The movies and the actors and categories to add and remove
     db : Session
         Database session
 
     Returns
     -------
     List[Movie]
-        The list of imported movies.
+        The updated movies
     """
     try:
-        files = list_files(get_movie_path(PathType.IMPORT))
-    except ListFilesException as e:
+        movies = update_movies_batch(db=db, data=body)
+        logger.debug("Updated %d movies", len(movies))
+    except InvalidIDException as e:
+        logger.warning(repr(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": repr(e)},
+        ) from e
+    except DuplicateEntryException as e:
+        logger.warning(repr(e))
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": repr(e)},
+        ) from e
+    except PathException as e:
         logger.error(repr(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"message": repr(e)},
         ) from e
-    movies = []
-    for file in files:
-        if file == ".keep":
-            continue
-        name, studio_id, series_id, series_number, actors = parse_file_info(
-            db=db, filename=file
-        )
-        try:
-            migrate_file(filename=file)
-            movie = add_movie(
-                db=db,
-                filename=file,
-                name=name,
-                studio_id=studio_id,
-                series_id=series_id,
-                series_number=series_number,
-                actors=actors,
-            )
-            movies.append(movie)
-            logger.debug("Imported movie %s", movie.filename)
-        except DuplicateEntryException as e:
-            logger.warning(repr(e))
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail={"message": repr(e)},
-            ) from e
-        except PathException as e:
-            logger.error(repr(e))
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail={"message": repr(e)},
-            ) from e
     return movies
 
 
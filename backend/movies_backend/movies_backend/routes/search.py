@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Search endpoint.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 16:02:51 2026 +0200
+Last modified : Sa Okt 17 16:02:51 2026 +0200
+"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_max_page_size
+from ..crud import search_async
+from ..database import get_async_db_session
+from ..schemas import SearchResultSchema
+
+router = APIRouter(prefix="/search")
+
+
+@router.get(
+    "",
+    response_model=List[SearchResultSchema],
+    response_description="Movies, actors, series and studios, best first",
+    summary="Search by name",
+    tags=["search"],
+)
+async def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1),
+    db: AsyncSession = Depends(get_async_db_session),
+) -> List[SearchResultSchema]:
+    """
+    Search movies, actors, series and studios by name.
+
+    Parameters
+    ----------
+    q : str
+        The query, every word is matched as a prefix
+    limit : int
+        Maximum number of results
+    db : AsyncSession
+        Async database session
+
+    Returns
+    -------
+    List[SearchResultSchema]
+        The results, best match first
+    """
+    return await search_async(
+        db=db, query=q, limit=min(limit, get_max_page_size())
+    )
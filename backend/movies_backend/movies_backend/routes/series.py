@@ -11,19 +11,24 @@ Last modified : Di Okt 15 18:20:05 2024 +0200
 
 from typing import Dict, List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.exceptions import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..config import get_logger
+from ..cache import PROPERTY_CACHE
+from ..cascade import cascade_rename
+from ..changes import get_change_counters_async
+from ..config import get_fast_json, get_logger
 from ..crud import (
     add_series,
     delete_series,
-    get_all_series,
+    get_all_property_rows_async,
+    get_all_series_async,
     get_series,
-    update_series,
 )
-from ..database import get_db_session
+from ..database import async_db_session, get_db_session
+from ..etag import check_etag, etag_headers, make_etag
 from ..exceptions import (
     DuplicateEntryException,
     IntegrityConstraintException,
@@ -37,12 +42,24 @@ from ..schemas import (
     MoviePropertySchema,
     SeriesSchema,
 )
-from ..util import rename_movie_file
+from ..serialization import encode_rows, json_response
 
 logger = get_logger()
 router = APIRouter(prefix="/series")
 
 
+async def _load_series(db: AsyncSession) -> List[SeriesSchema] | bytes:
+    if get_fast_json():
+        rows = await get_all_property_rows_async(
+            db=db, model=Series, schema=SeriesSchema
+        )
+        return encode_rows(schema=SeriesSchema, rows=rows)
+    return [
+        SeriesSchema.model_validate(item)
+        for item in await get_all_series_async(db=db)
+    ]
+
+
 @router.get(
     "",
     response_model=List[SeriesSchema],
@@ -50,21 +67,44 @@ router = APIRouter(prefix="/series")
     summary="Get all series",
     tags=["series"],
 )
-def series_get_all(db: Session = Depends(get_db_session)) -> List[Series]:
+async def series_get_all(
+    request: Request, response: Response
+) -> List[SeriesSchema] | Response:
     """
     Get all series.
 
+    The list is cached until a series is added, renamed or deleted. Its
+    entity tag is derived from the change counter of the table, which is
+    read on every request, so changes by other workers are seen at once.
+
     Parameters
     ----------
-    db : Session
-        Database session
+    request : Request
+        The request
+    response : Response
+        The response
 
     Returns
     -------
-    List[Series]
+    List[SeriesSchema] | Response
         List of all series
     """
-    return get_all_series(db=db)
+    async with async_db_session() as db:
+        versions = await get_change_counters_async(
+            db=db, tables=(Series.__tablename__,)
+        )
+        etag = make_etag(kind="series", versions=versions)
+        not_modified = check_etag(
+            request=request, response=response, etag=etag
+        )
+        if not_modified is not None:
+            return not_modified
+        items = await PROPERTY_CACHE.get_or_load(
+            Series.__tablename__, versions, lambda: _load_series(db=db)
+        )
+    if isinstance(items, bytes):
+        return json_response(body=items, headers=etag_headers(etag=etag))
+    return items
 
 
 @router.post(
@@ -156,17 +196,16 @@ def series_update(
     """
     try:
         series = get_series(db=db, series_id=series_id)
-        if series is not None:
-            series_name = series.name
-        else:
-            series_name = ""
+        if series is None:
+            raise InvalidIDException(f"Series ID {series_id} does not exist")
+        series_name = series.name
         new_series_name = body.name.strip()
-        series = update_series(
-            db=db, series_id=series_id, series_name=new_series_name
-        )
-        for movie in series.movies:
-            rename_movie_file(movie=movie, series_current=series_name)
-            db.commit()
+        report = cascade_rename(db=db, entity=series, name=new_series_name)
+        if report.failed:
+            raise PathException(
+                f"Renaming {len(report.failed)} movie files failed",
+                report.failed,
+            )
         logger.debug("Updated series %s -> %s", series_name, new_series_name)
     except DuplicateEntryException as e:
         logger.warning(repr(e))
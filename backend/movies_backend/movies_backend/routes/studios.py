@@ -11,19 +11,24 @@ Last modified : Di Okt 15 18:22:16 2024 +0200
 
 from typing import Dict, List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.exceptions import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..config import get_logger
+from ..cache import PROPERTY_CACHE
+from ..cascade import cascade_rename
+from ..changes import get_change_counters_async
+from ..config import get_fast_json, get_logger
 from ..crud import (
     add_studio,
     delete_studio,
-    get_all_studios,
+    get_all_property_rows_async,
+    get_all_studios_async,
     get_studio,
-    update_studio,
 )
-from ..database import get_db_session
+from ..database import async_db_session, get_db_session
+from ..etag import check_etag, etag_headers, make_etag
 from ..exceptions import (
     DuplicateEntryException,
     IntegrityConstraintException,
@@ -32,12 +37,24 @@ from ..exceptions import (
 )
 from ..models import Studio
 from ..schemas import HTTPExceptionSchema, MoviePropertySchema, StudioSchema
-from ..util import rename_movie_file
+from ..serialization import encode_rows, json_response
 
 logger = get_logger()
 router = APIRouter(prefix="/studios")
 
 
+async def _load_studios(db: AsyncSession) -> List[StudioSchema] | bytes:
+    if get_fast_json():
+        rows = await get_all_property_rows_async(
+            db=db, model=Studio, schema=StudioSchema
+        )
+        return encode_rows(schema=StudioSchema, rows=rows)
+    return [
+        StudioSchema.model_validate(studio)
+        for studio in await get_all_studios_async(db=db)
+    ]
+
+
 @router.get(
     "",
     response_model=List[StudioSchema],
@@ -45,21 +62,44 @@ router = APIRouter(prefix="/studios")
     summary="Get all studios",
     tags=["studios"],
 )
-def studios_get_all(db: Session = Depends(get_db_session)) -> List[Studio]:
+async def studios_get_all(
+    request: Request, response: Response
+) -> List[StudioSchema] | Response:
     """
     Get all studios.
 
+    The list is cached until a studio is added, renamed or deleted. Its
+    entity tag is derived from the change counter of the table, which is
+    read on every request, so changes by other workers are seen at once.
+
     Parameters
     ----------
-    db : Session
-        Database session
+    request : Request
+        The request
+    response : Response
+        The response
 
     Returns
     -------
-    List[Studio]
+    List[StudioSchema] | Response
         List of all studios
     """
-    return get_all_studios(db=db)
+    async with async_db_session() as db:
+        versions = await get_change_counters_async(
+            db=db, tables=(Studio.__tablename__,)
+        )
+        etag = make_etag(kind="studios", versions=versions)
+        not_modified = check_etag(
+            request=request, response=response, etag=etag
+        )
+        if not_modified is not None:
+            return not_modified
+        items = await PROPERTY_CACHE.get_or_load(
+            Studio.__tablename__, versions, lambda: _load_studios(db=db)
+        )
+    if isinstance(items, bytes):
+        return json_response(body=items, headers=etag_headers(etag=etag))
+    return items
 
 
 @router.post(
@@ -150,17 +190,16 @@ def studios_update(
     """
     try:
         studio = get_studio(db=db, studio_id=studio_id)
-        if studio is not None:
-            studio_name = studio.name
-        else:
-            studio_name = ""
+        if studio is None:
+            raise InvalidIDException(f"Studio ID {studio_id} does not exist")
+        studio_name = studio.name
         new_studio_name = body.name.strip()
-        studio = update_studio(
-            db=db, studio_id=studio_id, studio_name=new_studio_name
-        )
-        for movie in studio.movies:
-            rename_movie_file(movie=movie, studio_current=studio_name)
-            db.commit()
+        report = cascade_rename(db=db, entity=studio, name=new_studio_name)
+        if report.failed:
+            raise PathException(
+                f"Renaming {len(report.failed)} movie files failed",
+                report.failed,
+            )
         logger.debug("Updated studio %s -> %s", studio_name, new_studio_name)
     except DuplicateEntryException as e:
         logger.warning(repr(e))
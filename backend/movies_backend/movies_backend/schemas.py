@@ -9,9 +9,12 @@ Created       : Mo Sep 23 17:50:06 2024 +0200
 Last modified : Mi Okt 16 17:02:17 2024 +0200
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, model_validator
+
+from .search import SearchKind
 
 
 class BaseMovieSchema(BaseModel):
@@ -87,6 +90,86 @@ class MovieUpdateSchema(BaseModel):
     studio_id: Optional[int] = None
 
 
+class MovieFilterSchema(BaseModel):
+    """
+    Schema for filtering the movie list.
+
+    Attributes
+    ----------
+    actor : List[int]
+        Actor IDs
+    actor_match : Literal["any", "all"]
+        Whether a movie needs any or all of the actors
+    category : List[int]
+        Category IDs
+    category_match : Literal["any", "all"]
+        Whether a movie needs any or all of the categories
+    studio : Optional[int]
+        Studio ID
+    series : Optional[int]
+        Series ID
+    processed : Optional[bool]
+        Processed state
+    name : Optional[str]
+        Prefix of the movie name, matched against its sort name, matches
+        nothing if its sort name is empty
+    """
+
+    actor: List[int] = []
+    actor_match: Literal["any", "all"] = "any"
+    category: List[int] = []
+    category_match: Literal["any", "all"] = "any"
+    studio: Optional[int] = None
+    series: Optional[int] = None
+    processed: Optional[bool] = None
+    name: Optional[str] = None
+
+
+class MovieBatchSchema(BaseModel):
+    """
+    Schema for adding and removing actors and categories of movies.
+
+    Every addition and removal is applied to every movie. Adding an actor
+    or category a movie already has and removing one it does not have are
+    no-ops.
+
+    Attributes
+    ----------
+    movies : List[int]
+        Movie IDs
+    add_actors : List[int]
+        IDs of the actors to add
+    remove_actors : List[int]
+        IDs of the actors to remove
+    add_categories : List[int]
+        IDs of the categories to add
+    remove_categories : List[int]
+        IDs of the categories to remove
+    """
+
+    movies: List[int]
+    add_actors: List[int] = []
+    remove_actors: List[int] = []
+    add_categories: List[int] = []
+    remove_categories: List[int] = []
+
+    @model_validator(mode="after")
+    def check_disjoint(self) -> "MovieBatchSchema":
+        """
+        Check that nothing is both added and removed.
+
+        Returns
+        -------
+        MovieBatchSchema
+            The batch
+        """
+        if set(self.add_actors) & set(self.remove_actors):
+            raise ValueError("Actors cannot be both added and removed")
+        if set(self.add_categories) & set(self.remove_categories):
+            raise ValueError("Categories cannot be both added and removed")
+        return self
+
+
 class MoviePropertySchema(BaseModel):
     """
     Movie property schema.
@@ -198,6 +281,16 @@ class MovieSchema(BaseMovieSchema):
         Series number
     studio : Optional[Studio] defaults to None
         Studio
+    duration : Optional[float] defaults to None
+        Duration in seconds
+    width : Optional[int] defaults to None
+        Frame width in pixels
+    height : Optional[int] defaults to None
+        Frame height in pixels
+    codec : Optional[str] defaults to None
+        Video codec
+    bitrate : Optional[int] defaults to None
+        Average bitrate in bits per second
     """
 
     name: Optional[str] = None
@@ -206,6 +299,151 @@ class MovieSchema(BaseMovieSchema):
     series: Optional[SeriesSchema] = None
     series_number: Optional[int] = None
     studio: Optional[StudioSchema] = None
+    duration: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    codec: Optional[str] = None
+    bitrate: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SearchResultSchema(BaseModel):
+    """
+    Search result schema.
+
+    Attributes
+    ----------
+    kind : SearchKind
+        Kind of the result
+    id : int
+        ID
+    name : str
+        Name, the filename of movies without a name
+    """
+
+    kind: SearchKind
+    id: int
+    name: str
+
+
+class SnapshotStatsSchema(BaseModel):
+    """
+    Snapshot statistics schema.
+
+    Attributes
+    ----------
+    hits : int
+        Number of responses served from the snapshot
+    misses : int
+        Number of responses that were encoded again
+    size : int
+        Memory held by the snapshot in bytes
+    """
+
+    hits: int
+    misses: int
+    size: int
+
+
+class CacheStatsSchema(BaseModel):
+    """
+    Cache statistics schema.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups served from the cache
+    misses : int
+        Number of lookups that loaded from the database
+    movies : SnapshotStatsSchema
+        Statistics of the movie list snapshot
+    """
+
+    hits: int
+    misses: int
+    movies: SnapshotStatsSchema
+
+
+class ImportJobSchema(BaseModel):
+    """
+    Import job schema.
+
+    Attributes
+    ----------
+    id : str
+        Job ID
+    state : Literal["running", "finished", "failed"]
+        State of the job
+    total : int
+        Number of files to import
+    imported : int
+        Number of files imported
+    failed : int
+        Number of files that failed
+    skipped : int
+        Number of files skipped as duplicates
+    duplicates : int
+        Number of files whose content is already in the library
+    moved : int
+        Number of bytes of movie files moved
+    started : datetime
+        Start time
+    finished : Optional[datetime]
+        End time, None while running
+    elapsed : float
+        Run time in seconds
+    files_per_second : float
+        Files processed per second
+    bytes_per_second : float
+        Bytes of movie files moved per second
+    error : Optional[str]
+        Error the job failed with
+    """
+
+    id: str
+    state: Literal["running", "finished", "failed"]
+    total: int
+    imported: int
+    failed: int
+    skipped: int
+    duplicates: int
+    moved: int
+    started: datetime
+    finished: Optional[datetime] = None
+    elapsed: float
+    files_per_second: float
+    bytes_per_second: float
+    error: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ImportEventSchema(BaseModel):
+    """
+    Import job event schema.
+
+    Attributes
+    ----------
+    seq : int
+        Sequence number, starting at 1
+    kind : Literal["imported", "skipped", "error", "finished"]
+        A file was imported, skipped as a duplicate or failed, or the job
+        finished
+    filename : Optional[str]
+        The file, None for the finished event
+    movie_id : Optional[int]
+        ID of the imported movie
+    message : Optional[str]
+        Error message
+    duplicate_of : Optional[int]
+        ID of the movie with the same content as the file
+    """
+
+    seq: int
+    kind: Literal["imported", "skipped", "error", "finished"]
+    filename: Optional[str] = None
+    movie_id: Optional[int] = None
+    message: Optional[str] = None
+    duplicate_of: Optional[int] = None
     model_config = ConfigDict(from_attributes=True)
 
 
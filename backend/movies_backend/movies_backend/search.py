@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Full text search index.
+
+Description   : Movies, actors, series and studios share one FTS5 table.
+                The rowid of an entry encodes the kind of the entry in its
+                low two bits and the ID of the entry in the others, so the
+                triggers keeping the index in sync update it by rowid.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 15:48:20 2026 +0200
+Last modified : Sa Okt 17 15:48:20 2026 +0200
+"""
+
+import re
+from typing import Dict, Literal, Tuple
+
+from sqlalchemy.engine import Connection
+
+SearchKind = Literal["movie", "actor", "series", "studio"]
+
+SEARCH_TABLE = "search_index"
+SEARCH_KINDS: Dict[SearchKind, int] = {
+    "movie": 0,
+    "actor": 1,
+    "series": 2,
+    "studio": 3,
+}
+SEARCH_WEIGHTS = (10.0, 1.0)
+
+# Table, kind, expression of the name and of the filename column
+_SOURCES: Tuple[Tuple[str, SearchKind, str, str], ...] = (
+    ("movies", "movie", "COALESCE({0}.name, '')", "{0}.filename"),
+    ("actors", "actor", "{0}.name", "''"),
+    ("series", "series", "{0}.name", "''"),
+    ("studios", "studio", "{0}.name", "''"),
+)
+
+
+def _rowid(kind: SearchKind, row: str) -> str:
+    return f"{row}.id * {len(SEARCH_KINDS)} + {SEARCH_KINDS[kind]}"
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Create the search index and the triggers keeping it in sync.
+
+    Parameters
+    ----------
+    connection : Connection
+        Database connection
+    """
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "name, filename, prefix='2 3',"
+        " tokenize='unicode61 remove_diacritics 2')"
+    )
+    for table, kind, name, filename in _SOURCES:
+        columns = "name" if filename == "''" else "name, filename"
+        values = f"{name.format('NEW')}, {filename.format('NEW')}"
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert"
+            f" AFTER INSERT ON {table} BEGIN"
+            f" INSERT INTO {SEARCH_TABLE} (rowid, name, filename)"
+            f" VALUES ({_rowid(kind, 'NEW')}, {values}); END"
+        )
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update"
+            f" AFTER UPDATE OF {columns} ON {table} BEGIN"
+            f" UPDATE {SEARCH_TABLE} SET name = {name.format('NEW')},"
+            f" filename = {filename.format('NEW')}"
+            f" WHERE rowid = {_rowid(kind, 'NEW')}; END"
+        )
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete"
+            f" AFTER DELETE ON {table} BEGIN"
+            f" DELETE FROM {SEARCH_TABLE}"
+            f" WHERE rowid = {_rowid(kind, 'OLD')}; END"
+        )
+
+
+def rebuild_search_index(connection: Connection) -> int:
+    """
+    Rebuild the search index from the indexed tables.
+
+    Parameters
+    ----------
+    connection : Connection
+        Database connection
+
+    Returns
+    -------
+    int
+        Number of indexed entries.
+    """
+    connection.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+    for table, kind, name, filename in _SOURCES:
+        connection.exec_driver_sql(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, filename)"
+            f" SELECT {_rowid(kind, table)}, {name.format(table)},"
+            f" {filename.format(table)} FROM {table}"
+        )
+    connection.exec_driver_sql(
+        f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"
+    )
+    count = connection.exec_driver_sql(
+        f"SELECT count(*) FROM {SEARCH_TABLE}"
+    ).scalar()
+    return int(count) if count is not None else 0
+
+
+def match_expression(query: str) -> str:
+    """
+    Convert a user query into an FTS5 match expression.
+
+    Every word of the query is quoted, so FTS5 operators in the query are
+    matched literally, and matched as a prefix. All words must match.
+
+    Parameters
+    ----------
+    query : str
+        The user query
+
+    Returns
+    -------
+    str
+        The match expression, empty if the query has no words.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
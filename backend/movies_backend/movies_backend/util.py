@@ -13,11 +13,12 @@ import os
 import re
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import List, Optional, Set, Tuple
 
 from .config import get_db_path
 from .exceptions import ListFilesException, PathException
 from .models import Actor, Category, Movie
+from .move import MoveStats, Progress, move_file
 
 
 # pylint: disable=too-few-public-methods
@@ -49,6 +50,9 @@ class PathType(Enum):
     STUDIO = "studios"
 
 
+MovieLinks = Set[Tuple[PathType, str]]
+
+
 def generate_movie_filename(movie: Movie) -> str:
     """
     Generate a filename for a movie.
@@ -201,7 +205,7 @@ def rename_movie_file(
                 f"Renaming {movie.filename} -> {filename_new} conflicts with"
                 " existing"
             )
-        os.rename(src=path_current, dst=path_new)
+        move_file(src=path_current, dst=path_new)
         movie.filename = filename_new
 
         actor: Actor
@@ -263,6 +267,97 @@ def rename_movie_file(
             )
 
 
+def get_movie_links(movie: Movie) -> MovieLinks:
+    """
+    Get the link directories a movie is linked from.
+
+    Parameters
+    ----------
+    movie : Movie
+        The movie
+
+    Returns
+    -------
+    MovieLinks
+        Path type and name of every link directory
+    """
+    links: MovieLinks = {
+        (PathType.ACTOR, actor.name) for actor in movie.actors
+    }
+    links |= {
+        (PathType.CATEGORY, category.name) for category in movie.categories
+    }
+    if movie.series is not None and movie.series.name is not None:
+        links.add((PathType.SERIES, movie.series.name))
+    if movie.studio is not None and movie.studio.name is not None:
+        links.add((PathType.STUDIO, movie.studio.name))
+    return links
+
+
+def move_movie_links(
+    filename_current: str,
+    links_current: MovieLinks,
+    filename_new: str,
+    links_new: MovieLinks,
+) -> None:
+    """
+    Rename a movie file and update its links with the fewest changes.
+
+    The file is only renamed if its name changed, and links are only
+    created and removed where they differ.
+
+    Parameters
+    ----------
+    filename_current : str
+        Current filename of the movie
+    links_current : MovieLinks
+        Current link directories of the movie
+    filename_new : str
+        New filename of the movie
+    links_new : MovieLinks
+        New link directories of the movie
+    """
+    removed = links_current - links_new
+    added = links_new - links_current
+    if filename_current != filename_new:
+        path_base = get_movie_path(PathType.MOVIE)
+        path_new = f"{path_base}/{filename_new}"
+        if os.path.exists(path_new):
+            raise PathException(
+                f"Renaming {filename_current} -> {filename_new} conflicts"
+                " with existing"
+            )
+        try:
+            os.rename(src=f"{path_base}/{filename_current}", dst=path_new)
+        except OSError as e:
+            raise PathException(
+                f"Renaming {filename_current} -> {filename_new} failed",
+                repr(e),
+            ) from e
+        removed = links_current
+        added = links_new
+    # New links are created first, so a link directory shared with other
+    # movies moved concurrently never becomes empty and gets removed.
+    for path_type, name in sorted(added, key=_link_key):
+        update_link(
+            filename=filename_new,
+            path_link_base=get_movie_path(path_type),
+            name=name,
+            selected=True,
+        )
+    for path_type, name in sorted(removed, key=_link_key):
+        update_link(
+            filename=filename_current,
+            path_link_base=get_movie_path(path_type),
+            name=name,
+            selected=False,
+        )
+
+
+def _link_key(link: Tuple[PathType, str]) -> Tuple[str, str]:
+    return link[0].value, link[1]
+
+
 def remove_movie(movie: Movie) -> None:
     """
     Remove a movie.
@@ -297,16 +392,28 @@ def remove_movie(movie: Movie) -> None:
         )
 
 
-def migrate_file(filename: str, adding: bool = True) -> None:
+def migrate_file(
+    filename: str, adding: bool = True, progress: Optional[Progress] = None
+) -> MoveStats:
     """
     Migrate a movie file.
 
+    The imports and movies directories may be on different filesystems,
+    the file is copied across then.
+
     Parameters
     ----------
     filename : str
         The movie to migrate.
     adding : bool
         Whether to add or remove the movie from the database.
+    progress : Optional[Progress]
+        Called with the number of bytes moved after every chunk.
+
+    Returns
+    -------
+    MoveStats
+        Size and duration of the move.
     """
     imports = get_movie_path(PathType.IMPORT)
     movies = get_movie_path(PathType.MOVIE)
@@ -322,7 +429,7 @@ def migrate_file(filename: str, adding: bool = True) -> None:
             f"Moving {filename} to {base_new} conflicts with existing"
         )
     try:
-        os.rename(path_current, path_new)
+        return move_file(src=path_current, dst=path_new, progress=progress)
     except FileNotFoundError as e:
         raise PathException(
             f"File {filename} not found in {base_current}", repr(e)
@@ -336,7 +443,8 @@ def migrate_file(filename: str, adding: bool = True) -> None:
     except OSError as e:
         raise PathException(
             f"An OS error occurred while moving {filename} from"
-            f" {base_current} to {base_new}"
+            f" {base_current} to {base_new}",
+            repr(e),
         ) from e
 
 
@@ -444,6 +552,52 @@ def update_link(
                 )
 
 
+def rename_link_dir(
+    path_type: PathType, name_current: str, name_new: str
+) -> None:
+    """
+    Rename a link directory.
+
+    The links are relative to a sibling directory, so they stay valid
+    when their directory is renamed. The directory is moved with a single
+    atomic rename unless the target exists, in which case the links are
+    merged into the target one by one.
+
+    Parameters
+    ----------
+    path_type : PathType
+        The type of the link directory
+    name_current : str
+        Current name
+    name_new : str
+        New name
+    """
+    path_base = get_movie_path(path_type)
+    path_current = f"{path_base}/{name_current}"
+    path_new = f"{path_base}/{name_new}"
+    if name_current == name_new or not os.path.isdir(path_current):
+        return
+    try:
+        if not os.path.lexists(path_new) or os.path.samefile(
+            path_current, path_new
+        ):
+            os.rename(path_current, path_new)
+            return
+        for filename in os.listdir(path_current):
+            path_link = f"{path_current}/{filename}"
+            if os.path.lexists(f"{path_new}/{filename}"):
+                os.remove(path_link)
+            else:
+                os.rename(path_link, f"{path_new}/{filename}")
+        os.rmdir(path_current)
+    except OSError as e:
+        raise PathException(
+            f"Link directory {path_current} could not be renamed to"
+            f" {path_new}",
+            repr(e),
+        ) from e
+
+
 def update_category_link(
     filename: str, category_name: str, selected: bool
 ) -> None:
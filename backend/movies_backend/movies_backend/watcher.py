@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Automatic import of new files of the imports directory.
+
+Description   : The watcher follows the imports directory with Linux
+                inotify, so it learns about new files without listing the
+                directory. Where inotify is not available it lists the
+                directory at every interval instead. A new file is only
+                imported once its size stayed the same for the settle
+                time, so files still being copied are left alone. The
+                files that settled together are imported by one import
+                job, a running job delays them to the next interval. A
+                file the importer rejected is moved back unchanged, so a
+                file is not imported again until its size or modification
+                time changed.
+
+Author        : Vadim Titov
+Created       : So Okt 18 12:36:52 2026 +0200
+Last modified : So Okt 18 12:36:52 2026 +0200
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from functools import partial
+from threading import Event, Thread
+from typing import Callable, Dict, List, Optional, Protocol, Set, Tuple
+
+from .config import (
+    get_logger,
+    get_watch_poll_seconds,
+    get_watch_settle_seconds,
+)
+from .exceptions import JobRunningException
+from .importer import IMPORT_JOBS, import_movies
+from .util import PathType, get_movie_path
+
+logger = get_logger()
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+# Growing files are found by their size, so writes are not watched
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+# Files handed to an import that are remembered, the oldest are forgotten
+MAX_STARTED_FILES = 10000
+
+
+def _is_candidate(name: str) -> bool:
+    # Hidden files are placeholders or temporary files of copy tools
+    return not name.startswith(".")
+
+
+class ChangeSource(Protocol):
+    """Source of the names of changed files of a directory."""
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """
+        Wait for changes.
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait at most
+
+        Returns
+        -------
+        Optional[Set[str]]
+            Names of the changed files, None if changes were lost and the
+            directory must be listed
+        """
+
+    def close(self) -> None:
+        """Release the resources of the source."""
+
+
+class InotifySource:
+    """
+    Changes reported by inotify.
+
+    Parameters
+    ----------
+    path : str
+        The directory
+
+    Raises
+    ------
+    OSError
+        If inotify is not available or the directory cannot be watched
+    """
+
+    def __init__(self, path: str) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        if (
+            libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+            < 0
+        ):
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, os.strerror(errno), path)
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """
+        Wait for inotify events.
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait at most
+
+        Returns
+        -------
+        Optional[Set[str]]
+            Names of the changed files, None if the event queue overflowed
+        """
+        names: Set[str] = set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        while readable:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self) -> None:
+        """Close the inotify file descriptor."""
+        os.close(self._fd)
+
+
+class PollingSource:
+    """
+    Changes found by listing the directory at every interval.
+
+    Parameters
+    ----------
+    path : str
+        The directory
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._seen: Dict[str, float] = self._list()
+
+    def _list(self) -> Dict[str, float]:
+        try:
+            with os.scandir(self._path) as entries:
+                return {
+                    entry.name: entry.stat().st_mtime
+                    for entry in entries
+                    if entry.is_file()
+                }
+        except OSError as e:
+            logger.warning(repr(e))
+            return {}
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """
+        Wait for the interval and list the directory.
+
+        Parameters
+        ----------
+        timeout : float
+            The interval in seconds
+
+        Returns
+        -------
+        Optional[Set[str]]
+            Names of the new and modified files
+        """
+        time.sleep(timeout)
+        seen = self._list()
+        changed = {
+            name
+            for name, mtime in seen.items()
+            if self._seen.get(name) != mtime
+        }
+        self._seen = seen
+        return changed
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def open_change_source(path: str) -> ChangeSource:
+    """
+    Open the change source of a directory, inotify if available.
+
+    Parameters
+    ----------
+    path : str
+        The directory
+
+    Returns
+    -------
+    ChangeSource
+        The change source
+    """
+    try:
+        return InotifySource(path)
+    except OSError as e:
+        logger.warning("Polling %s, inotify failed: %r", path, e)
+        return PollingSource(path)
+
+
+@dataclass
+class _Pending:
+    size: int
+    since: float
+
+
+# pylint: disable=too-many-instance-attributes
+class ImportWatcher:
+    """
+    Watcher importing the files that settled in a directory.
+
+    Parameters
+    ----------
+    path : str
+        The directory
+    start_import : Callable[[List[str]], None]
+        Starts importing files, raises JobRunningException to be retried
+    settle : float
+        Seconds a file must keep its size before it is imported
+    interval : float
+        Seconds between checks of the pending files
+    source : Optional[Callable[[str], ChangeSource]]
+        Opens the change source, inotify with a polling fallback if None
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        path: str,
+        start_import: Callable[[List[str]], None],
+        settle: float,
+        interval: float,
+        source: Optional[Callable[[str], ChangeSource]] = None,
+    ) -> None:
+        self._path = path
+        self._start_import = start_import
+        self._settle = settle
+        self._interval = interval
+        self._open_source = source or open_change_source
+        self._stop = Event()
+        self._pending: Dict[str, _Pending] = {}
+        # Size and modification time of the files handed to an import
+        self._started: Dict[str, Tuple[int, float]] = {}
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        """Start watching in a background thread."""
+        self._stop.clear()
+        self._thread = Thread(
+            target=self._run, name="import-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and wait for the thread to end."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _list(self) -> Set[str]:
+        try:
+            return set(os.listdir(self._path))
+        except OSError as e:
+            logger.warning(repr(e))
+            return set()
+
+    def _run(self) -> None:
+        source = self._open_source(self._path)
+        try:
+            # The files present before the watcher started are listed once
+            self._add(self._list())
+            while not self._stop.is_set():
+                try:
+                    names = source.wait(timeout=self._interval)
+                    self._add(self._list() if names is None else names)
+                    self._check()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    # An error must not end the thread, watching would stop
+                    logger.exception("Checking the imports directory failed")
+                    self._stop.wait(timeout=self._interval)
+        finally:
+            source.close()
+
+    def _add(self, names: Set[str]) -> None:
+        now = time.monotonic()
+        for name in names:
+            if _is_candidate(name):
+                self._pending[name] = _Pending(size=-1, since=now)
+
+    def _check(self) -> None:
+        now = time.monotonic()
+        ready: Dict[str, Tuple[int, float]] = {}
+        for name, pending in list(self._pending.items()):
+            try:
+                info = os.stat(os.path.join(self._path, name))
+            except FileNotFoundError:
+                del self._pending[name]
+                continue
+            except OSError as e:
+                logger.warning(repr(e))
+                del self._pending[name]
+                continue
+            if not stat.S_ISREG(info.st_mode):
+                del self._pending[name]
+                continue
+            if info.st_size != pending.size:
+                self._pending[name] = _Pending(size=info.st_size, since=now)
+            elif now - pending.since >= self._settle:
+                state = (info.st_size, info.st_mtime)
+                if self._started.get(name) == state:
+                    logger.debug("Skipping %s, it did not change", name)
+                    del self._pending[name]
+                else:
+                    ready[name] = state
+        if not ready:
+            return
+        try:
+            self._start_import(sorted(ready))
+        except JobRunningException as e:
+            logger.debug("Delaying import of %d files: %r", len(ready), e)
+            return
+        for name, state in ready.items():
+            del self._pending[name]
+            self._started.pop(name, None)
+            self._started[name] = state
+        for name in list(self._started)[:-MAX_STARTED_FILES]:
+            del self._started[name]
+        logger.info("Importing %d new files", len(ready))
+
+
+def _start_import_job(files: List[str]) -> None:
+    IMPORT_JOBS.start(run=partial(import_movies, files=files))
+
+
+def create_import_watcher() -> ImportWatcher:
+    """
+    Create the watcher of the imports directory, configured from the
+    environment.
+
+    Returns
+    -------
+    ImportWatcher
+        The watcher, not started yet
+    """
+    return ImportWatcher(
+        path=get_movie_path(PathType.IMPORT),
+        start_import=_start_import_job,
+        settle=get_watch_settle_seconds(),
+        interval=get_watch_poll_seconds(),
+    )
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Synthetic MP4 and Matroska files for tests.
+
+Author        : Vadim Titov
+Created       : So Okt 18 19:02:51 2026 +0200
+Last modified : So Okt 18 19:02:51 2026 +0200
+"""
+
+import struct
+from typing import List, Tuple
+
+
+def _box(kind: bytes, *children: bytes) -> bytes:
+    payload = b"".join(children)
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def _mp4_track(handler: bytes, entry: bytes, width: int, height: int) -> bytes:
+    tkhd = bytes(76) + struct.pack(">II", width << 16, height << 16)
+    sample_entry = _box(
+        entry, bytes(24) + struct.pack(">HH", width, height) + bytes(50)
+    )
+    return _box(
+        b"trak",
+        _box(b"tkhd", tkhd),
+        _box(
+            b"mdia",
+            _box(b"mdhd", bytes(24)),
+            _box(b"hdlr", bytes(8) + handler + bytes(13)),
+            _box(
+                b"minf",
+                _box(
+                    b"stbl",
+                    _box(b"stsd", struct.pack(">II", 0, 1), sample_entry),
+                    # Sample tables are large and never read
+                    _box(b"stsz", bytes(64 * 1024)),
+                ),
+            ),
+        ),
+    )
+
+
+def make_mp4(
+    seconds: float,
+    width: int,
+    height: int,
+    entry: bytes = b"avc1",
+    media_bytes: int = 1024 * 1024,
+) -> bytes:
+    """
+    Build an MP4 file with an audio and a video track, the movie box after
+    the media data.
+
+    Parameters
+    ----------
+    seconds : float
+        Duration
+    width : int
+        Frame width
+    height : int
+        Frame height
+    entry : bytes
+        Sample entry type of the video track
+    media_bytes : int
+        Size of the media data
+
+    Returns
+    -------
+    bytes
+        The file content
+    """
+    timescale = 1000
+    mvhd = struct.pack(">IIIII", 0, 0, 0, timescale, int(seconds * timescale))
+    return b"".join(
+        (
+            _box(b"ftyp", b"isom", bytes(4), b"isomavc1"),
+            _box(b"mdat", bytes(media_bytes)),
+            _box(
+                b"moov",
+                _box(b"mvhd", mvhd + bytes(80)),
+                _box(b"udta", bytes(4096)),
+                _mp4_track(b"soun", b"mp4a", 0, 0),
+                _mp4_track(b"vide", entry, width, height),
+            ),
+        )
+    )
+
+
+def _element(element: int, *children: bytes) -> bytes:
+    payload = b"".join(children)
+    size = (1 << 56 | len(payload)).to_bytes(8, "big")
+    return element.to_bytes((element.bit_length() + 7) // 8, "big") + (
+        size + payload
+    )
+
+
+def _uint(element: int, value: int, length: int = 4) -> bytes:
+    return _element(element, value.to_bytes(length, "big"))
+
+
+def _mkv_tracks(codec: str, width: int, height: int) -> bytes:
+    return _element(
+        0x1654AE6B,
+        _element(0xAE, _uint(0x83, 2, 1), _element(0x86, b"A_AAC")),
+        _element(
+            0xAE,
+            _uint(0x83, 1, 1),
+            _element(0x86, codec.encode()),
+            # Codec private data is large and never read
+            _element(0x63A2, bytes(128 * 1024)),
+            _element(0xE0, _uint(0xB0, width, 2), _uint(0xBA, height, 2)),
+        ),
+    )
+
+
+def make_mkv(
+    seconds: float,
+    width: int,
+    height: int,
+    codec: str = "V_MPEGH/ISO/HEVC",
+    tracks_last: bool = False,
+    media_bytes: int = 1024 * 1024,
+) -> bytes:
+    """
+    Build a Matroska file of unknown segment size with an audio and a
+    video track.
+
+    Parameters
+    ----------
+    seconds : float
+        Duration
+    width : int
+        Frame width
+    height : int
+        Frame height
+    codec : str
+        Codec ID of the video track
+    tracks_last : bool
+        Whether the tracks follow the cluster, found through the seek head
+    media_bytes : int
+        Size of the cluster
+
+    Returns
+    -------
+    bytes
+        The file content
+    """
+    info = _element(
+        0x1549A966,
+        _uint(0x2AD7B1, 1000000, 3),
+        _element(0x4489, struct.pack(">d", seconds * 1000)),
+    )
+    cluster = _element(0x1F43B675, bytes(media_bytes))
+    tracks = _mkv_tracks(codec=codec, width=width, height=height)
+    children: List[Tuple[int, bytes]] = [
+        (0x1549A966, info),
+        (0x1F43B675, cluster) if tracks_last else (0x1654AE6B, tracks),
+        (0x1654AE6B, tracks) if tracks_last else (0x1F43B675, cluster),
+    ]
+
+    def seek_head(positions: List[int]) -> bytes:
+        return _element(
+            0x114D9B74,
+            *(
+                _element(
+                    0x4DBB,
+                    _element(0x53AB, element.to_bytes(4, "big")),
+                    _uint(0x53AC, position, 8),
+                )
+                for (element, _), position in zip(children, positions)
+            ),
+        )
+
+    offset = len(seek_head([0] * len(children)))
+    positions = []
+    for _, data in children:
+        positions.append(offset)
+        offset += len(data)
+    segment = seek_head(positions) + b"".join(data for _, data in children)
+    return (
+        _element(0x1A45DFA3, _element(0x4282, b"matroska"))
+        + bytes.fromhex("18538067")
+        + b"\x01\xff\xff\xff\xff\xff\xff\xff"
+        + segment
+    )
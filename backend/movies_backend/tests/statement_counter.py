@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : SQL statement counting for tests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 13:12:20 2026 +0200
+Last modified : Sa Okt 17 13:12:20 2026 +0200
+"""
+
+from contextlib import contextmanager
+from typing import Generator, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def count_statements() -> Generator[List[str], None, None]:
+    """
+    Record the SQL statements executed by any engine.
+
+    Covers the sync engines and the sync side of the async engines. The
+    BEGIN of a transaction is not a query and is not recorded.
+
+    Yields
+    ------
+    List[str]
+        The executed statements, filled while the context is active.
+    """
+    statements: List[str] = []
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def _record(_conn, _cursor, statement, _parameters, _context, _many):
+        if not statement.startswith("BEGIN"):
+            statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", _record)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Property list cache tests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 19:40:26 2026 +0200
+Last modified : Sa Okt 17 19:40:26 2026 +0200
+"""
+
+from typing import List
+
+import pytest
+
+from movies_backend.cache import (
+    CacheStats,
+    PropertyCache,
+    ResponseSnapshot,
+    SnapshotStats,
+)
+
+
+@pytest.fixture(name="anyio_backend")
+def anyio_backend_fixture() -> str:
+    """
+    Run the async tests with asyncio.
+
+    Returns
+    -------
+    str
+        The anyio backend
+    """
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_get_or_load() -> None:
+    """Test that a list is loaded once per change counter."""
+    cache = PropertyCache()
+    loads: List[str] = []
+
+    async def load() -> List[str]:
+        loads.append("actors")
+        return ["Al Pacino", "Joe Pesci"]
+
+    assert await cache.get_or_load("actors", (0,), load) == [
+        "Al Pacino",
+        "Joe Pesci",
+    ]
+    assert await cache.get_or_load("actors", (0,), load) == [
+        "Al Pacino",
+        "Joe Pesci",
+    ]
+    assert len(loads) == 1
+    assert cache.stats() == CacheStats(hits=1, misses=1)
+    # Another worker changed the table
+    await cache.get_or_load("actors", (1,), load)
+    await cache.get_or_load("studios", (1,), load)
+    assert len(loads) == 3
+    assert cache.stats() == CacheStats(hits=1, misses=3)
+    cache.clear()
+    await cache.get_or_load("actors", (1,), load)
+    assert len(loads) == 4
+    assert cache.stats() == CacheStats(hits=0, misses=1)
+
+
+@pytest.mark.anyio
+async def test_get_or_load_cleared() -> None:
+    """Test that a list loaded while the cache was cleared is not stored."""
+    cache = PropertyCache()
+    loads: List[str] = []
+
+    async def load() -> List[str]:
+        if not loads:
+            cache.clear()
+        loads.append("actors")
+        return ["Al Pacino"]
+
+    assert await cache.get_or_load("actors", (0,), load) == ["Al Pacino"]
+    assert await cache.get_or_load("actors", (0,), load) == ["Al Pacino"]
+    assert await cache.get_or_load("actors", (0,), load) == ["Al Pacino"]
+    assert len(loads) == 2
+
+
+@pytest.mark.anyio
+async def test_response_snapshot() -> None:
+    """Test that a snapshot is rebuilt after its tables changed."""
+    snapshot = ResponseSnapshot()
+    builds: List[int] = []
+
+    async def build() -> bytes:
+        builds.append(len(builds))
+        return b"[]"
+
+    first = await snapshot.get_or_build(
+        (0, 0), build, etag="v0", max_size=100, compress=True
+    )
+    assert first.body_gzip is not None
+    assert (
+        await snapshot.get_or_build(
+            (0, 0), build, etag="v0", max_size=100, compress=True
+        )
+        is first
+    )
+    assert builds == [0]
+    second = await snapshot.get_or_build(
+        (0, 1), build, etag="v1", max_size=100, compress=True
+    )
+    assert builds == [0, 1]
+    assert second.etag == "v1"
+    assert snapshot.stats() == SnapshotStats(
+        hits=1, misses=2, size=second.size
+    )
+
+
+@pytest.mark.anyio
+async def test_response_snapshot_bounded() -> None:
+    """Test that a snapshot above the maximum size is not kept."""
+    snapshot = ResponseSnapshot()
+
+    async def build() -> bytes:
+        return b"[" + b"0," * 50 + b"0]"
+
+    result = await snapshot.get_or_build(
+        (0,), build, etag="v0", max_size=64, compress=True
+    )
+    # A body that is not kept is not gzipped either
+    assert result.body_gzip is None
+    await snapshot.get_or_build(
+        (0,), build, etag="v0", max_size=0, compress=True
+    )
+    assert snapshot.stats() == SnapshotStats(hits=0, misses=2, size=0)
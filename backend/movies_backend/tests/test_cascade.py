@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Cascade rename tests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 18:40:12 2026 +0200
+Last modified : Sa Okt 17 18:40:12 2026 +0200
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Generator
+
+import pytest
+from pytest import FixtureRequest
+from pytest_mock import MockerFixture
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from movies_backend.cascade import cascade_rename
+from movies_backend.database import create_db_engine
+from movies_backend.exceptions import DuplicateEntryException, PathException
+from movies_backend.migrations import migrate_db
+from movies_backend.models import Actor, Movie, Studio
+
+GOODFELLAS = (
+    "[Warner Bros.] Goodfellas (Joe Pesci, Ray Liotta, Robert De Niro).mp4"
+)
+HEAT = "[Warner Bros.] Heat (Al Pacino, Robert De Niro).mp4"
+
+
+@pytest.fixture(name="db")
+def db_fixture(
+    tmp_path: Path, request: FixtureRequest, mocker: MockerFixture
+) -> Generator[Session, None, None]:
+    """
+    Get a session of a test database with movie files on disk.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    request : FixtureRequest
+        Fixture request
+    mocker : MockerFixture
+        Mocker
+
+    Yields
+    ------
+    Session
+        The database session.
+    """
+    path = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(path.as_posix())
+    filename = Path(request.path).parent / "data" / "init.sql"
+    with open(filename, "r", encoding="utf-8") as f:
+        connection.executescript(f.read())
+    connection.close()
+    engine = create_db_engine(path=path.as_posix())
+    migrate_db(engine=engine)
+    mocker.patch(
+        "movies_backend.util.get_db_path", return_value=tmp_path.as_posix()
+    )
+    (tmp_path / "movies").mkdir()
+    for link in ("studios/Warner Bros.", "actors/Robert De Niro"):
+        (tmp_path / link).mkdir(parents=True)
+    for filename in (GOODFELLAS, HEAT):
+        (tmp_path / "movies" / filename).touch()
+        for link in ("studios/Warner Bros.", "actors/Robert De Niro"):
+            (tmp_path / link / filename).symlink_to(f"../../movies/{filename}")
+    # Like the sessions of the app, which do not autoflush
+    with Session(engine, autoflush=False) as db:
+        yield db
+    engine.dispose()
+
+
+def _filenames(db: Session) -> list[str]:
+    return list(
+        db.scalars(
+            select(Movie.filename)
+            .where(Movie.id.in_([2, 3]))
+            .order_by(Movie.id)
+        )
+    )
+
+
+def test_cascade_rename(db: Session, tmp_path: Path) -> None:
+    """
+    Test renaming a studio and its movie files.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    tmp_path : Path
+        Temporary path
+    """
+    studio = db.get(Studio, 4)
+    assert studio is not None
+    report = cascade_rename(db=db, entity=studio, name="Warner Brothers")
+    renamed = [
+        filename.replace("Warner Bros.", "Warner Brothers")
+        for filename in (GOODFELLAS, HEAT)
+    ]
+    assert sorted(new for _, new, _ in report.renamed) == renamed
+    assert not report.failed
+    assert _filenames(db) == renamed
+    assert studio.sort_name == "warner brothers"
+    assert (
+        db.scalar(select(Movie.studio_sort_name).where(Movie.id == 2))
+        == "warner brothers"
+    )
+    assert sorted(os.listdir(tmp_path / "movies")) == renamed
+    assert not (tmp_path / "studios" / "Warner Bros.").exists()
+    for link in ("studios/Warner Brothers", "actors/Robert De Niro"):
+        assert sorted(os.listdir(tmp_path / link)) == renamed
+        assert all(
+            (tmp_path / link / filename).exists() for filename in renamed
+        )
+
+
+def test_cascade_rename_collision(db: Session, tmp_path: Path) -> None:
+    """
+    Test that a rename colliding with an existing file changes nothing.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    tmp_path : Path
+        Temporary path
+    """
+    (tmp_path / "movies" / HEAT.replace("Pacino", "Paccino")).touch()
+    actor = db.get(Actor, 13)
+    assert actor is not None
+    with pytest.raises(PathException, match="conflicts with existing"):
+        cascade_rename(db=db, entity=actor, name="Al Paccino")
+    assert db.get(Actor, 13).name == "Al Pacino"  # type: ignore[union-attr]
+    assert _filenames(db) == [GOODFELLAS, HEAT]
+
+
+def test_cascade_rename_duplicate(db: Session) -> None:
+    """
+    Test that renaming to the name of another actor changes nothing.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    """
+    actor = db.get(Actor, 13)
+    assert actor is not None
+    with pytest.raises(DuplicateEntryException, match="conflicts"):
+        cascade_rename(db=db, entity=actor, name="Robert De Niro")
+    assert db.get(Actor, 13).name == "Al Pacino"  # type: ignore[union-attr]
+    assert _filenames(db) == [GOODFELLAS, HEAT]
+
+
+def test_cascade_rename_failure(db: Session, mocker: MockerFixture) -> None:
+    """
+    Test that files failing to move keep their filename in the database.
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    mocker : MockerFixture
+        Mocker
+    """
+
+    def move_movie_links(filename_current: str, *_) -> None:
+        if filename_current == HEAT:
+            raise PathException("Disk full")
+
+    mocker.patch(
+        "movies_backend.cascade.move_movie_links", side_effect=move_movie_links
+    )
+    actor = db.get(Actor, 8)
+    assert actor is not None
+    report = cascade_rename(db=db, entity=actor, name="Bob De Niro", workers=2)
+    assert [filename for filename, _ in report.failed] == [HEAT]
+    assert len(report.renamed) == 3
+    assert _filenames(db) == [
+        "[Warner Bros.] Goodfellas (Bob De Niro, Joe Pesci, Ray Liotta).mp4",
+        HEAT,
+    ]
+    assert actor.name == "Bob De Niro"
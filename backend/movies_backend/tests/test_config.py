@@ -13,9 +13,26 @@ import pytest
 
 from movies_backend.config import (
     DEFAULT_DB_PATH,
+    EngineProfile,
+    get_cascade_workers,
     get_db_path,
+    get_engine_profile,
+    get_export_batch_size,
+    get_fast_json,
+    get_hash_workers,
+    get_import_batch_size,
+    get_import_skip_duplicates,
     get_log_config,
+    get_move_chunk_bytes,
+    get_move_workers,
+    get_snapshot_gzip,
+    get_snapshot_max_bytes,
     get_sqlite_path,
+    get_stream_chunk_bytes,
+    get_watch_imports,
+    get_watch_poll_seconds,
+    get_watch_settle_seconds,
+    getenv_bool,
 )
 
 
@@ -46,3 +63,134 @@ def test_get_log_config():
     with pytest.MonkeyPatch.context() as monkeypatch:
         monkeypatch.setenv("MM_LOG_CONFIG_PATH", "/custom/log/config/path")
         assert get_log_config() == "/custom/log/config/path"
+
+
+def test_getenv_bool():
+    """Test getenv_bool."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.delenv("MM_TEST_FLAG", raising=False)
+        assert getenv_bool("MM_TEST_FLAG", True) is True
+        assert getenv_bool("MM_TEST_FLAG", False) is False
+        for value in ("0", "false", "No", "off"):
+            monkeypatch.setenv("MM_TEST_FLAG", value)
+            assert getenv_bool("MM_TEST_FLAG", True) is False
+        monkeypatch.setenv("MM_TEST_FLAG", "1")
+        assert getenv_bool("MM_TEST_FLAG", False) is True
+
+
+def test_get_engine_profile():
+    """Test get_engine_profile."""
+    assert get_engine_profile() == EngineProfile()
+    assert "PRAGMA journal_mode=WAL;" in EngineProfile().pragmas()
+    assert not EngineProfile(tuned=False).pragmas()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_SQLITE_TUNED", "0")
+        monkeypatch.setenv("MM_SQLITE_BUSY_TIMEOUT", "250")
+        monkeypatch.setenv("MM_DB_POOL_SIZE", "2")
+        profile = get_engine_profile()
+        assert not profile.tuned
+        assert profile.busy_timeout == 250
+        assert profile.pool_size == 2
+
+
+def test_get_cascade_workers():
+    """Test get_cascade_workers."""
+    assert get_cascade_workers() == 4
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_CASCADE_WORKERS", "0")
+        assert get_cascade_workers() == 1
+        monkeypatch.setenv("MM_CASCADE_WORKERS", "16")
+        assert get_cascade_workers() == 16
+
+
+def test_get_snapshot_settings():
+    """Test get_snapshot_max_bytes and get_snapshot_gzip."""
+    assert get_snapshot_max_bytes() == 64 * 1024 * 1024
+    assert get_snapshot_gzip()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_SNAPSHOT_MAX_BYTES", "-1")
+        monkeypatch.setenv("MM_SNAPSHOT_GZIP", "off")
+        assert get_snapshot_max_bytes() == 0
+        assert not get_snapshot_gzip()
+
+
+def test_get_fast_json():
+    """Test get_fast_json."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.delenv("MM_FAST_JSON", raising=False)
+        assert not get_fast_json()
+        monkeypatch.setenv("MM_FAST_JSON", "1")
+        assert get_fast_json()
+
+
+def test_get_export_batch_size():
+    """Test get_export_batch_size."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.delenv("MM_EXPORT_BATCH_SIZE", raising=False)
+        assert get_export_batch_size() == 500
+        monkeypatch.setenv("MM_EXPORT_BATCH_SIZE", "0")
+        assert get_export_batch_size() == 1
+
+
+def test_get_import_batch_size():
+    """Test get_import_batch_size."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.delenv("MM_IMPORT_BATCH_SIZE", raising=False)
+        assert get_import_batch_size() == 100
+        monkeypatch.setenv("MM_IMPORT_BATCH_SIZE", "-5")
+        assert get_import_batch_size() == 1
+
+
+def test_get_watch_settings():
+    """Test the settings of the imports directory watcher."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for name in (
+            "MM_WATCH_IMPORTS",
+            "MM_WATCH_SETTLE_SECONDS",
+            "MM_WATCH_POLL_SECONDS",
+        ):
+            monkeypatch.delenv(name, raising=False)
+        assert not get_watch_imports()
+        assert get_watch_settle_seconds() == 5.0
+        assert get_watch_poll_seconds() == 2.0
+        monkeypatch.setenv("MM_WATCH_IMPORTS", "yes")
+        monkeypatch.setenv("MM_WATCH_SETTLE_SECONDS", "-1")
+        monkeypatch.setenv("MM_WATCH_POLL_SECONDS", "0")
+        assert get_watch_imports()
+        assert get_watch_settle_seconds() == 0.0
+        assert get_watch_poll_seconds() == 0.01
+
+
+def test_get_move_settings():
+    """Test get_move_chunk_bytes and get_move_workers."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.delenv("MM_MOVE_CHUNK_BYTES", raising=False)
+        monkeypatch.delenv("MM_MOVE_WORKERS", raising=False)
+        assert get_move_chunk_bytes() == 64 * 1024 * 1024
+        assert get_move_workers() == 2
+        monkeypatch.setenv("MM_MOVE_CHUNK_BYTES", "1")
+        monkeypatch.setenv("MM_MOVE_WORKERS", "0")
+        assert get_move_chunk_bytes() == 4096
+        assert get_move_workers() == 1
+
+
+def test_get_stream_chunk_bytes():
+    """Test get_stream_chunk_bytes."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.delenv("MM_STREAM_CHUNK_BYTES", raising=False)
+        assert get_stream_chunk_bytes() == 1024 * 1024
+        monkeypatch.setenv("MM_STREAM_CHUNK_BYTES", "0")
+        assert get_stream_chunk_bytes() == 4096
+
+
+def test_get_fingerprint_settings():
+    """Test get_hash_workers and get_import_skip_duplicates."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.delenv("MM_HASH_WORKERS", raising=False)
+        monkeypatch.delenv("MM_IMPORT_SKIP_DUPLICATES", raising=False)
+        assert get_hash_workers() == 4
+        assert not get_import_skip_duplicates()
+        monkeypatch.setenv("MM_HASH_WORKERS", "0")
+        monkeypatch.setenv("MM_IMPORT_SKIP_DUPLICATES", "on")
+        assert get_hash_workers() == 1
+        assert get_import_skip_duplicates()
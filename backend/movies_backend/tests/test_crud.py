@@ -9,13 +9,15 @@ Created       : Mi Okt 16 16:44:51 2024 +0200
 Last modified : Mi Okt 29 13:11:16 2024 +0200
 """
 
+import os
 import sqlite3
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 import pytest
 from pytest import FixtureRequest, TempPathFactory
 from pytest_mock import MockerFixture
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from movies_backend.crud import (
@@ -31,29 +33,50 @@ from movies_backend.crud import (
     get_actor,
     get_actor_by_name,
     get_all_actors,
+    get_all_actors_async,
     get_all_categories,
+    get_all_movie_rows_async,
     get_all_movies,
+    get_all_movies_async,
     get_all_series,
     get_all_studios,
     get_category,
     get_category_by_name,
     get_movie,
+    get_movie_async,
+    get_movie_rows_page_async,
     get_series,
     get_series_by_name,
     get_studio,
     get_studio_by_name,
+    loader_options,
     parse_file_info,
+    parse_files_info,
     update_actor,
     update_category,
+    update_movies_batch,
     update_series,
     update_studio,
 )
-from movies_backend.database import get_db_session, init_db
+from movies_backend.database import (
+    get_async_db_session,
+    get_db_session,
+    init_db,
+)
 from movies_backend.exceptions import (
     DuplicateEntryException,
     IntegrityConstraintException,
     InvalidIDException,
 )
+from movies_backend.models import Movie
+from movies_backend.schemas import (
+    MovieBatchSchema,
+    MovieFileSchema,
+    MovieFilterSchema,
+    MovieSchema,
+)
+
+from .statement_counter import count_statements
 
 
 @pytest.fixture(scope="module", autouse=True)
@@ -98,6 +121,33 @@ def db_fixture() -> Generator[Session, None, None]:
     yield from get_db_session()
 
 
+@pytest.fixture(name="anyio_backend")
+def anyio_backend_fixture() -> str:
+    """
+    Run async tests on asyncio.
+
+    Returns
+    -------
+    str
+        The anyio backend
+    """
+    return "asyncio"
+
+
+@pytest.fixture(name="async_db")
+async def async_db_fixture() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get async database session.
+
+    Yields
+    ------
+    AsyncSession
+        The async database session.
+    """
+    async for db in get_async_db_session():
+        yield db
+
+
 def test_add_actor(db: Session) -> None:
     """
     Test add_actor
@@ -186,6 +236,22 @@ def test_get_all_actors(db: Session) -> None:
     assert len(actors) == 20
 
 
+@pytest.mark.anyio
+async def test_get_all_actors_async(async_db: AsyncSession) -> None:
+    """
+    Test get_all_actors_async
+
+    Parameters
+    ----------
+    async_db : AsyncSession
+        Async database session
+    """
+    actors = await get_all_actors_async(db=async_db)
+    names = [actor.name for actor in actors]
+    assert len(actors) == 20
+    assert names == sorted(names)
+
+
 def test_update_actor(db: Session) -> None:
     """
     Test update_actor
@@ -714,6 +780,243 @@ def test_get_all_movies(db: Session) -> None:
     assert len(movies) == 13
 
 
+@pytest.mark.parametrize(
+    "filters, ids",
+    [
+        (MovieFilterSchema(actor=[8]), {1, 2, 3, 10}),
+        (MovieFilterSchema(actor=[8, 13], actor_match="all"), {3, 10}),
+        (MovieFilterSchema(category=[2, 4]), {4, 6, 7, 8, 9}),
+        (MovieFilterSchema(category=[1, 4], category_match="all"), {4, 9}),
+        (MovieFilterSchema(studio=2, series=1), {6, 7, 8}),
+        (MovieFilterSchema(name="The Godfather Part"), {10, 11}),
+        (MovieFilterSchema(processed=False), {13}),
+        (MovieFilterSchema(actor=[8], studio=4, name="heat"), {3}),
+        (MovieFilterSchema(name="The "), set()),
+        (MovieFilterSchema(name="é"), set()),
+    ],
+)
+def test_get_all_movies_filtered(
+    db: Session, filters: MovieFilterSchema, ids: set
+) -> None:
+    """
+    Test get_all_movies with filters
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    filters : MovieFilterSchema
+        Filters
+    ids : set
+        Expected movie IDs
+    """
+    movies = get_all_movies(db=db, filters=filters)
+    assert {movie.id for movie in movies} == ids
+
+
+def test_update_movies_batch(
+    db: Session, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """
+    Test update_movies_batch
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    tmp_path : Path
+        Temporary path
+    mocker : MockerFixture
+        Mocker
+    """
+    mocker.patch(
+        "movies_backend.util.get_db_path", return_value=tmp_path.as_posix()
+    )
+    goodfellas = (
+        "[Warner Bros.] Goodfellas (Joe Pesci, Ray Liotta, Robert De Niro).mp4"
+    )
+    heat = "[Warner Bros.] Heat (Al Pacino, Robert De Niro).mp4"
+    heat_new = "[Warner Bros.] Heat (Joe Pesci, Robert De Niro).mp4"
+    (tmp_path / "movies").mkdir()
+    (tmp_path / "movies" / goodfellas).touch()
+    (tmp_path / "movies" / heat).touch()
+    (tmp_path / "actors" / "Al Pacino").mkdir(parents=True)
+    (tmp_path / "actors" / "Al Pacino" / heat).symlink_to(
+        f"../../movies/{heat}"
+    )
+
+    with count_statements() as statements:
+        movies = update_movies_batch(
+            db=db,
+            data=MovieBatchSchema(
+                movies=[3, 2],
+                add_actors=[10],
+                remove_actors=[13],
+                add_categories=[4],
+            ),
+        )
+    assert len(statements) == 12
+    assert [movie.id for movie in movies] == [3, 2]
+    assert [movie.filename for movie in movies] == [heat_new, goodfellas]
+    assert [actor.id for actor in movies[0].actors] == [10, 8]
+    assert sorted(os.listdir(tmp_path / "movies")) == [goodfellas, heat_new]
+    assert not (tmp_path / "actors" / "Al Pacino").exists()
+    assert os.listdir(tmp_path / "actors" / "Joe Pesci") == [heat_new]
+    assert sorted(os.listdir(tmp_path / "categories" / "Comedy")) == [
+        goodfellas,
+        heat_new,
+    ]
+    assert (tmp_path / "actors" / "Robert De Niro" / heat_new).exists()
+
+    movies = update_movies_batch(
+        db=db,
+        data=MovieBatchSchema(
+            movies=[3, 2], add_actors=[13], remove_categories=[4]
+        ),
+    )
+    assert [movie.filename for movie in movies] == [
+        "[Warner Bros.] Heat (Al Pacino, Joe Pesci, Robert De Niro).mp4",
+        (
+            "[Warner Bros.] Goodfellas (Al Pacino, Joe Pesci, Ray Liotta,"
+            " Robert De Niro).mp4"
+        ),
+    ]
+    update_movies_batch(
+        db=db,
+        data=MovieBatchSchema(movies=[3, 2], remove_actors=[13]),
+    )
+    movies = update_movies_batch(
+        db=db,
+        data=MovieBatchSchema(movies=[3], add_actors=[13], remove_actors=[10]),
+    )
+    assert movies[0].filename == heat
+    assert sorted(os.listdir(tmp_path / "movies")) == [goodfellas, heat]
+    assert not (tmp_path / "categories" / "Comedy").exists()
+
+
+def test_update_movies_batch_invalid(db: Session) -> None:
+    """
+    Test update_movies_batch with invalid IDs
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    """
+    with pytest.raises(InvalidIDException, match=r"Movie IDs \[0\]"):
+        update_movies_batch(db=db, data=MovieBatchSchema(movies=[1, 0]))
+    with pytest.raises(InvalidIDException, match=r"Actor IDs \[0\]"):
+        update_movies_batch(
+            db=db, data=MovieBatchSchema(movies=[1], add_actors=[0])
+        )
+    with pytest.raises(ValueError, match="both added and removed"):
+        MovieBatchSchema(movies=[1], add_categories=[1], remove_categories=[1])
+
+
+def test_loader_options() -> None:
+    """Test loader_options"""
+    assert not loader_options(model=Movie, schema=None)
+    assert not loader_options(model=Movie, schema=MovieFileSchema)
+    assert len(loader_options(model=Movie, schema=MovieSchema)) == 4
+
+
+def test_get_movie_eager(db: Session) -> None:
+    """
+    Test that rendering a movie with its schema does not lazy load
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    """
+    with count_statements() as statements:
+        movie = get_movie(db=db, movie_id=1, schema=MovieSchema)
+        MovieSchema.model_validate(movie)
+    assert len(statements) == 3
+    with count_statements() as statements:
+        for movie in get_all_movies(db=db, schema=MovieSchema):
+            MovieSchema.model_validate(movie)
+    assert len(statements) == 3
+
+
+@pytest.mark.anyio
+async def test_get_all_movies_async(
+    db: Session, async_db: AsyncSession
+) -> None:
+    """
+    Test get_all_movies_async
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    async_db : AsyncSession
+        Async database session
+    """
+    movies = await get_all_movies_async(db=async_db)
+    assert [movie.id for movie in movies] == [
+        movie.id for movie in get_all_movies(db=db)
+    ]
+
+
+@pytest.mark.anyio
+async def test_get_movie_rows_async(async_db: AsyncSession) -> None:
+    """
+    Test that the projections match the movies without loading them.
+
+    Parameters
+    ----------
+    async_db : AsyncSession
+        Async database session
+    """
+    rows = await get_all_movie_rows_async(db=async_db, schema=MovieFileSchema)
+    assert not async_db.identity_map
+    movies = await get_all_movies_async(db=async_db)
+    assert [(row.id, row.filename) for row in rows] == [
+        (movie.id, movie.filename) for movie in movies
+    ]
+    pages = []
+    page, _, cursor = await get_movie_rows_page_async(
+        db=async_db, limit=5, schema=MovieFileSchema
+    )
+    pages.append(page)
+    while cursor is not None:
+        page, prev_cursor, cursor = await get_movie_rows_page_async(
+            db=async_db, limit=5, schema=MovieFileSchema, cursor=cursor
+        )
+        pages.append(page)
+    assert [(row.id, row.filename) for page in pages for row in page] == [
+        (row.id, row.filename) for row in rows
+    ]
+    assert prev_cursor is not None
+    page, _, _ = await get_movie_rows_page_async(
+        db=async_db, limit=5, schema=MovieFileSchema, cursor=prev_cursor
+    )
+    assert page == pages[-2]
+
+
+@pytest.mark.anyio
+async def test_get_movie_async(async_db: AsyncSession) -> None:
+    """
+    Test get_movie_async
+
+    Parameters
+    ----------
+    async_db : AsyncSession
+        Async database session
+    """
+    movie = await get_movie_async(db=async_db, movie_id=1, schema=MovieSchema)
+    assert movie is not None
+    assert movie.name == "Casino"
+    assert movie.studio.name == "Universal Pictures"
+    assert [actor.name for actor in movie.actors] == [
+        "Joe Pesci",
+        "Robert De Niro",
+        "Sharon Stone",
+    ]
+    assert await get_movie_async(db=async_db, movie_id=0) is None
+
+
 def test_parse_file_info(db: Session) -> None:
     """
     Test parse_file_info
@@ -739,3 +1042,35 @@ def test_parse_file_info(db: Session) -> None:
     assert series.id == series_id
     assert series_number == 2
     assert len(actors) == 4
+
+
+def test_parse_files_info(db: Session) -> None:
+    """
+    Test parse_files_info
+
+    Parameters
+    ----------
+    db : Session
+        Database session
+    """
+    filenames = [
+        (
+            "[Paramount Pictures] {The Godfather 2} The Godfather Part II (Al"
+            " Pacino, Diane Keaton, Robert De Niro, Robert Duvall).mp4"
+        ),
+        "[Unknown Studio] {Unknown Series} Unknown (Al Pacino, Nobody).mp4",
+        "plain.mp4",
+    ]
+    with count_statements() as statements:
+        parsed = parse_files_info(db=db, filenames=filenames)
+    assert len(statements) == 3
+    assert parsed[0] == parse_file_info(db=db, filename=filenames[0])
+    name, studio_id, series_id, series_number, actors = parsed[1]
+    assert (name, studio_id, series_id, series_number) == (
+        "Unknown",
+        None,
+        None,
+        None,
+    )
+    assert [actor.name for actor in actors] == ["Al Pacino"]
+    assert parsed[2] == ("plain", None, None, None, [])
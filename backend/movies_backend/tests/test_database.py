@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Database tests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 10:31:44 2026 +0200
+Last modified : Sa Okt 17 10:31:44 2026 +0200
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from movies_backend.config import EngineProfile
+from movies_backend.database import (
+    analyze_db,
+    create_db_engine,
+    read_only_engine,
+)
+from movies_backend.migrations import migrate_db
+
+
+def test_create_db_engine_tuned(tmp_path: Path) -> None:
+    """
+    Test that the tuned profile is applied to every connection.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    profile = EngineProfile(busy_timeout=1234, pool_size=2, max_overflow=1)
+    engine = create_db_engine(
+        path=(tmp_path / "db.sqlite3").as_posix(), profile=profile
+    )
+    assert engine.pool.size() == 2  # type: ignore[attr-defined]
+    with engine.connect() as connection:
+        assert connection.scalar(text("PRAGMA journal_mode")) == "wal"
+        assert connection.scalar(text("PRAGMA synchronous")) == 1
+        assert connection.scalar(text("PRAGMA busy_timeout")) == 1234
+        assert connection.scalar(text("PRAGMA temp_store")) == 2
+        assert connection.scalar(text("PRAGMA foreign_keys")) == 1
+    engine.dispose()
+
+
+def test_create_db_engine_default(tmp_path: Path) -> None:
+    """
+    Test that an untuned profile leaves the sqlite defaults in place.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    engine = create_db_engine(
+        path=(tmp_path / "db.sqlite3").as_posix(),
+        profile=EngineProfile(tuned=False),
+    )
+    with engine.connect() as connection:
+        assert connection.scalar(text("PRAGMA journal_mode")) == "delete"
+        assert connection.scalar(text("PRAGMA foreign_keys")) == 1
+    engine.dispose()
+
+
+def test_analyze_db(tmp_path: Path) -> None:
+    """
+    Test that the query planner statistics are collected.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    engine = create_db_engine(path=(tmp_path / "db.sqlite3").as_posix())
+    migrate_db(engine=engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO movies (filename, sort_name, processed)"
+                " VALUES ('a', 'a', 0)"
+            )
+        )
+    analyze_db(engine=engine)
+    with engine.connect() as connection:
+        indexes = connection.scalars(text("SELECT idx FROM sqlite_stat1"))
+        assert "ix_movies_list_order" in set(indexes)
+    engine.dispose()
+
+
+def _insert_movie(path: str, filename: str, timeout: float) -> None:
+    with sqlite3.connect(path, timeout=timeout) as connection:
+        connection.execute(
+            "INSERT INTO movies (filename, sort_name, processed)"
+            " VALUES (?, ?, 0)",
+            (filename, filename),
+        )
+    connection.close()
+
+
+def test_read_then_write(tmp_path: Path) -> None:
+    """
+    Test that a session reading before it writes waits for other writers.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    path = (tmp_path / "db.sqlite3").as_posix()
+    engine = create_db_engine(path=path)
+    migrate_db(engine=engine)
+    writer = threading.Thread(target=_insert_movie, args=(path, "b", 5.0))
+    with Session(engine) as db:
+        assert db.scalar(text("SELECT count(*) FROM movies")) == 0
+        # Commits in between if the session did not take the write lock
+        writer.start()
+        time.sleep(0.2)
+        db.execute(
+            text(
+                "INSERT INTO movies (filename, sort_name, processed)"
+                " VALUES ('a', 'a', 0)"
+            )
+        )
+        db.commit()
+    writer.join()
+    with engine.connect() as connection:
+        assert connection.scalar(text("SELECT count(*) FROM movies")) == 2
+    engine.dispose()
+
+
+def test_read_only_engine(tmp_path: Path) -> None:
+    """
+    Test that a read-only session does not hold the write lock.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    path = (tmp_path / "db.sqlite3").as_posix()
+    engine = create_db_engine(path=path)
+    migrate_db(engine=engine)
+    with Session(read_only_engine(engine)) as db:
+        assert db.scalar(text("SELECT count(*) FROM movies")) == 0
+        _insert_movie(path=path, filename="a", timeout=0)
+        # The transaction keeps reading its snapshot
+        assert db.scalar(text("SELECT count(*) FROM movies")) == 0
+    engine.dispose()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Content fingerprint tests.
+
+Author        : Vadim Titov
+Created       : So Okt 18 17:48:02 2026 +0200
+Last modified : So Okt 18 17:48:02 2026 +0200
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import List
+
+import pytest
+from pytest import FixtureRequest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from movies_backend import fingerprint
+from movies_backend.database import create_db_engine
+from movies_backend.fingerprint import (
+    SAMPLE_BYTES,
+    backfill,
+    content_hash,
+    hash_files,
+    sample_fingerprint,
+)
+from movies_backend.migrations import migrate_db
+from movies_backend.models import Movie
+
+LARGE = bytes(range(256)) * (SAMPLE_BYTES // 64)
+
+
+def test_sample_fingerprint(tmp_path: Path) -> None:
+    """
+    Test that the fingerprint depends on the size and the sample blocks.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    path = tmp_path / "a.mp4"
+    path.write_bytes(b"")
+    assert sample_fingerprint(path.as_posix()) is None
+    path.write_bytes(b"small")
+    small = sample_fingerprint(path.as_posix())
+    path.write_bytes(b"smalL")
+    assert sample_fingerprint(path.as_posix()) != small
+    path.write_bytes(LARGE)
+    large = sample_fingerprint(path.as_posix())
+    assert large is not None and len(large) == 32
+    # Bytes between the sample blocks are not read
+    changed = bytearray(LARGE)
+    changed[SAMPLE_BYTES + 1] ^= 0xFF
+    path.write_bytes(changed)
+    assert sample_fingerprint(path.as_posix()) == large
+    for offset in (0, len(LARGE) // 2, len(LARGE) - 1):
+        changed = bytearray(LARGE)
+        changed[offset] ^= 0xFF
+        path.write_bytes(changed)
+        assert sample_fingerprint(path.as_posix()) != large
+    path.write_bytes(LARGE + b"x")
+    assert sample_fingerprint(path.as_posix()) != large
+
+
+def test_hash_files(tmp_path: Path) -> None:
+    """
+    Test that files are hashed in order and errors are returned.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    paths = []
+    for index in range(8):
+        path = tmp_path / f"{index}.mp4"
+        path.write_bytes(LARGE[index:])
+        paths.append(path.as_posix())
+    paths.insert(3, (tmp_path / "missing.mp4").as_posix())
+    results = hash_files(paths=paths, hasher=content_hash, workers=4)
+    assert isinstance(results[3], FileNotFoundError)
+    for name, result in zip(paths[:3] + paths[4:], results[:3] + results[4:]):
+        assert result == hashlib.sha256(Path(name).read_bytes()).hexdigest()
+
+
+@pytest.mark.parametrize("batch_size", [1, 200])
+def test_backfill(
+    tmp_path: Path, request: FixtureRequest, batch_size: int
+) -> None:
+    """
+    Test that the movies with a file get fingerprints and content hashes.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    request : FixtureRequest
+        Fixture request
+    batch_size : int
+        Number of movies hashed per transaction
+    """
+    path = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(path.as_posix())
+    script = Path(request.path).parent / "data" / "init.sql"
+    with open(script, "r", encoding="utf-8") as f:
+        connection.executescript(f.read())
+    connection.close()
+    engine = create_db_engine(path=path.as_posix())
+    migrate_db(engine=engine)
+    (tmp_path / "movies").mkdir()
+    with Session(engine) as db:
+        filenames = db.scalars(select(Movie.filename).limit(3)).all()
+    for index, name in enumerate(filenames):
+        (tmp_path / "movies" / name).write_bytes(LARGE[index:])
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+        assert backfill(engine=engine, batch_size=batch_size) == (3, 9)
+        assert backfill(engine=engine, full=True, batch_size=batch_size) == (
+            3,
+            9,
+        )
+    with Session(engine) as db:
+        movies = db.scalars(
+            select(Movie).where(Movie.filename.in_(filenames))
+        ).all()
+        for movie in movies:
+            data = (tmp_path / "movies" / movie.filename).read_bytes()
+            assert movie.content_hash == hashlib.sha256(data).hexdigest()
+            assert movie.fingerprint == sample_fingerprint(
+                (tmp_path / "movies" / movie.filename).as_posix()
+            )
+    engine.dispose()
+
+
+def test_backfill_unlocked(tmp_path: Path, request: FixtureRequest) -> None:
+    """
+    Test that files are hashed while other connections may write.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    request : FixtureRequest
+        Fixture request
+    """
+    path = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(path.as_posix())
+    script = Path(request.path).parent / "data" / "init.sql"
+    with open(script, "r", encoding="utf-8") as f:
+        connection.executescript(f.read())
+    connection.close()
+    engine = create_db_engine(path=path.as_posix())
+    migrate_db(engine=engine)
+    (tmp_path / "movies").mkdir()
+    with Session(engine) as db:
+        for name in db.scalars(select(Movie.filename)):
+            (tmp_path / "movies" / name).write_bytes(LARGE)
+    locked: List[str] = []
+
+    def hasher(file: str) -> str:
+        connection = sqlite3.connect(
+            path.as_posix(), timeout=0, isolation_level=None
+        )
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("ROLLBACK")
+        except sqlite3.OperationalError:
+            locked.append(file)
+        finally:
+            connection.close()
+        return content_hash(file)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+        monkeypatch.setattr(fingerprint, "content_hash", hasher)
+        assert backfill(engine=engine, full=True, batch_size=5) == (12, 0)
+    assert not locked
+    engine.dispose()
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Import job tests.
+
+Author        : Vadim Titov
+Created       : So Okt 18 11:20:37 2026 +0200
+Last modified : So Okt 18 11:20:37 2026 +0200
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Generator, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from pytest import FixtureRequest
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from movies_backend import importer, util
+from movies_backend.database import create_db_engine
+from movies_backend.exceptions import JobRunningException
+from movies_backend.importer import ImportJob, ImportJobs, import_movies
+from movies_backend.main import app
+from movies_backend.migrations import migrate_db
+from movies_backend.models import Actor, Movie
+from movies_backend.move import MoveStats
+
+from .media_files import make_mp4
+
+client = TestClient(app)
+
+CASINO = (
+    "[Universal Pictures] Casino (Joe Pesci, Robert De Niro, Sharon Stone).mp4"
+)
+
+
+@pytest.fixture(name="library")
+def library_fixture(
+    tmp_path: Path, request: FixtureRequest
+) -> Generator[Tuple[Engine, Path], None, None]:
+    """
+    Get an engine for the test data and a movie directory to import into.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    request : FixtureRequest
+        Fixture request
+
+    Yields
+    ------
+    Tuple[Engine, Path]
+        The database engine and the movie directory.
+    """
+    path = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(path.as_posix())
+    filename = Path(request.path).parent / "data" / "init.sql"
+    with open(filename, "r", encoding="utf-8") as f:
+        connection.executescript(f.read())
+    connection.close()
+    engine = create_db_engine(path=path.as_posix())
+    migrate_db(engine=engine)
+    (tmp_path / "imports").mkdir()
+    (tmp_path / "movies").mkdir()
+    (tmp_path / "imports" / ".keep").touch()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+        yield engine, tmp_path
+    engine.dispose()
+
+
+def _run(engine: Engine) -> ImportJob:
+    job = ImportJob()
+    import_movies(job=job, session=lambda: Session(engine))
+    return job
+
+
+def test_import_movies(library: Tuple[Engine, Path]) -> None:
+    """
+    Test that an import job records every imported file.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    """
+    engine, path = library
+    files = ["Arrival.mp4", "[Warner Bros.] Tenet (Robert De Niro).mp4"]
+    for file in files:
+        (path / "imports" / file).write_bytes(b"movie")
+    job = _run(engine=engine)
+    assert job.state == "finished"
+    assert (job.total, job.imported, job.failed) == (2, 2, 0)
+    assert job.moved == 10
+    assert job.files_per_second > 0
+    assert job.bytes_per_second > 0
+    events = job.events()
+    assert [event.kind for event in events] == [
+        "imported",
+        "imported",
+        "finished",
+    ]
+    assert [event.filename for event in events[:2]] == files
+    assert sorted(p.name for p in (path / "movies").iterdir()) == files
+    with Session(engine) as db:
+        tenet = db.scalars(select(Movie).where(Movie.name == "Tenet")).one()
+        assert tenet.id == events[1].movie_id
+        assert [actor.name for actor in tenet.actors] == ["Robert De Niro"]
+        assert db.get(Actor, 8) in tenet.actors
+
+
+@pytest.mark.parametrize("batch_size", ["1", "2", "100"])
+def test_import_movies_duplicate(
+    library: Tuple[Engine, Path], batch_size: str
+) -> None:
+    """
+    Test that a duplicate movie is reported and the other files continue.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    batch_size : str
+        Number of files per transaction
+    """
+    engine, path = library
+    files = ["Arrival.mp4", CASINO, "Zodiac.mp4"]
+    for file in files:
+        (path / "imports" / file).touch()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_IMPORT_BATCH_SIZE", batch_size)
+        job = _run(engine=engine)
+    assert job.state == "finished"
+    assert (job.total, job.imported, job.failed) == (3, 2, 1)
+    errors = [event for event in job.events() if event.kind == "error"]
+    assert [event.filename for event in errors] == [CASINO]
+    assert (path / "imports" / CASINO).exists()
+    assert sorted(p.name for p in (path / "movies").iterdir()) == [
+        "Arrival.mp4",
+        "Zodiac.mp4",
+    ]
+    with Session(engine) as db:
+        names = db.scalars(
+            select(Movie.name).where(Movie.name.in_(["Arrival", "Zodiac"]))
+        ).all()
+    assert sorted(names) == ["Arrival", "Zodiac"]
+
+
+@pytest.mark.parametrize("batch_size", ["1", "100"])
+@pytest.mark.parametrize("skip", [False, True])
+def test_import_movies_duplicate_content(
+    library: Tuple[Engine, Path], batch_size: str, skip: bool
+) -> None:
+    """
+    Test that a copy of a movie under another filename is flagged or
+    skipped.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    batch_size : str
+        Number of files per transaction
+    skip : bool
+        Whether duplicates are skipped
+    """
+    engine, path = library
+    (path / "imports" / "Arrival.mp4").write_bytes(b"arrival")
+    (path / "imports" / "Copy of Arrival.mp4").write_bytes(b"arrival")
+    (path / "imports" / "Zodiac.mp4").write_bytes(b"zodiac")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_IMPORT_BATCH_SIZE", batch_size)
+        monkeypatch.setenv("MM_IMPORT_SKIP_DUPLICATES", str(int(skip)))
+        job = _run(engine=engine)
+    assert job.duplicates == 1
+    assert (job.imported, job.skipped, job.failed) == (
+        (2, 1, 0) if skip else (3, 0, 0)
+    )
+    events = {event.filename: event for event in job.events()}
+    copy = events["Copy of Arrival.mp4"]
+    assert copy.kind == ("skipped" if skip else "imported")
+    assert copy.duplicate_of == events["Arrival.mp4"].movie_id
+    assert events["Zodiac.mp4"].duplicate_of is None
+    assert (path / "imports" / "Copy of Arrival.mp4").exists() == skip
+    with Session(engine) as db:
+        arrival = db.get(Movie, events["Arrival.mp4"].movie_id)
+        assert arrival is not None
+        assert arrival.fingerprint is not None
+        assert arrival.content_hash is None
+
+
+def test_import_movies_media(library: Tuple[Engine, Path]) -> None:
+    """
+    Test that imported movies get the media metadata of their file.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    """
+    engine, path = library
+    (path / "imports" / "Arrival.mp4").write_bytes(make_mp4(6960, 1920, 800))
+    (path / "imports" / "Zodiac.mkv").write_bytes(b"zodiac")
+    job = _run(engine=engine)
+    assert job.imported == 2
+    with Session(engine) as db:
+        arrival, zodiac = db.scalars(
+            select(Movie)
+            .where(Movie.name.in_(["Arrival", "Zodiac"]))
+            .order_by(Movie.name)
+        ).all()
+        assert (arrival.duration, arrival.width, arrival.height) == (
+            6960.0,
+            1920,
+            800,
+        )
+        assert arrival.codec == "h264"
+        assert arrival.bitrate is not None
+        assert zodiac.duration is None
+
+
+def test_import_movies_move_conflict(library: Tuple[Engine, Path]) -> None:
+    """
+    Test that a movie whose file cannot be moved is not committed.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    """
+    engine, path = library
+    for file in ("Arrival.mp4", "Zodiac.mp4"):
+        (path / "imports" / file).touch()
+    (path / "movies" / "Zodiac.mp4").write_bytes(b"existing")
+    job = _run(engine=engine)
+    assert (job.imported, job.failed) == (1, 1)
+    assert [event.kind for event in job.events()] == [
+        "error",
+        "imported",
+        "finished",
+    ]
+    assert (path / "imports" / "Zodiac.mp4").exists()
+    assert (path / "movies" / "Zodiac.mp4").read_bytes() == b"existing"
+    with Session(engine) as db:
+        assert (
+            db.scalars(select(Movie).where(Movie.name == "Zodiac")).all() == []
+        )
+        assert db.scalars(select(Movie).where(Movie.name == "Arrival")).one()
+
+
+def test_import_movies_unlocked_moves(library: Tuple[Engine, Path]) -> None:
+    """
+    Test that files are moved while other connections may write.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    """
+    engine, path = library
+    for file in ("Arrival.mp4", CASINO):
+        (path / "imports" / file).write_bytes(b"movie")
+    locked: List[str] = []
+
+    def migrate_file(filename: str, **kwargs: Any) -> MoveStats:
+        connection = sqlite3.connect(
+            (path / "db.sqlite3").as_posix(), timeout=0, isolation_level=None
+        )
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("ROLLBACK")
+        except sqlite3.OperationalError:
+            locked.append(filename)
+        finally:
+            connection.close()
+        return util.migrate_file(filename=filename, **kwargs)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(importer, "migrate_file", migrate_file)
+        job = _run(engine=engine)
+    # The duplicate Casino is moved back after its savepoint failed
+    assert (job.imported, job.failed) == (1, 1)
+    assert not locked
+    assert (path / "imports" / CASINO).exists()
+
+
+def test_import_movies_skipped_copy_of_failed(
+    library: Tuple[Engine, Path],
+) -> None:
+    """
+    Test that a skipped copy is imported if the file it copies failed.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    """
+    engine, path = library
+    (path / "imports" / "Arrival.mp4").write_bytes(b"arrival")
+    (path / "imports" / "Copy of Arrival.mp4").write_bytes(b"arrival")
+    (path / "movies" / "Arrival.mp4").write_bytes(b"existing")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_IMPORT_SKIP_DUPLICATES", "1")
+        job = _run(engine=engine)
+    assert (job.imported, job.skipped, job.failed) == (1, 0, 1)
+    events = {event.filename: event for event in job.events()}
+    assert events["Arrival.mp4"].kind == "error"
+    assert events["Copy of Arrival.mp4"].kind == "imported"
+    assert (path / "movies" / "Copy of Arrival.mp4").exists()
+
+
+def test_import_movies_failed_commit(library: Tuple[Engine, Path]) -> None:
+    """
+    Test that the files of a batch are moved back if its commit fails.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    """
+    engine, path = library
+
+    class FailingSession(Session):
+        """Session whose commits fail."""
+
+        def commit(self) -> None:
+            raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+
+    files = ["Arrival.mp4", "Zodiac.mp4"]
+    for file in files:
+        (path / "imports" / file).touch()
+    job = ImportJob()
+    import_movies(job=job, session=lambda: FailingSession(engine))
+    assert (job.imported, job.failed) == (0, 2)
+    assert sorted(p.name for p in (path / "imports").iterdir()) == [
+        ".keep",
+        *files,
+    ]
+    assert not list((path / "movies").iterdir())
+    with Session(engine) as db:
+        assert (
+            db.scalars(select(Movie).where(Movie.name == "Arrival")).all()
+            == []
+        )
+
+
+def test_import_movies_files(library: Tuple[Engine, Path]) -> None:
+    """
+    Test that an import job only imports the given files.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    """
+    engine, path = library
+    for file in ("Arrival.mp4", "Zodiac.mp4"):
+        (path / "imports" / file).touch()
+    job = ImportJob()
+    import_movies(
+        job=job, session=lambda: Session(engine), files=["Zodiac.mp4"]
+    )
+    assert (job.total, job.imported) == (1, 1)
+    assert (path / "imports" / "Arrival.mp4").exists()
+    assert (path / "movies" / "Zodiac.mp4").exists()
+
+
+def test_import_movies_missing_directory(
+    library: Tuple[Engine, Path],
+) -> None:
+    """
+    Test that an import job fails if the imports directory is missing.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and movie directory
+    """
+    engine, path = library
+    (path / "imports" / ".keep").unlink()
+    (path / "imports").rmdir()
+    job = _run(engine=engine)
+    assert job.state == "failed"
+    assert [event.kind for event in job.events()] == ["finished"]
+
+
+def test_import_jobs_one_at_a_time() -> None:
+    """Test that only one import job runs at a time."""
+    jobs = ImportJobs()
+    release = threading.Event()
+
+    def run(job: ImportJob) -> None:
+        release.wait(timeout=10)
+        job.finish()
+
+    job = jobs.start(run=run)
+    assert jobs.get(job.id) is job
+    with pytest.raises(JobRunningException):
+        jobs.start(run=run)
+    release.set()
+    assert job.events(timeout=10)[-1].kind == "finished"
+    assert jobs.start(run=run).id != job.id
+
+
+def test_import_jobs_failing_run() -> None:
+    """Test that a job whose run raises is ended as failed."""
+    jobs = ImportJobs()
+
+    def run(job: ImportJob) -> None:
+        raise RuntimeError("boom")
+
+    job = jobs.start(run=run)
+    assert job.events(timeout=10)[-1].kind == "finished"
+    assert job.state == "failed"
+    assert "boom" in (job.error or "")
+
+
+def _read_events(job_id: str) -> List[Tuple[str, dict]]:
+    events = []
+    with client.stream("GET", f"/jobs/{job_id}/events") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        for block in response.read().decode().split("\n\n"):
+            fields = dict(
+                line.split(": ", 1)
+                for line in block.splitlines()
+                if not line.startswith(":")
+            )
+            if fields:
+                events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_import_routes(tmp_path: Path) -> None:
+    """
+    Test starting and following an import job.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    (tmp_path / "imports").mkdir()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+        response = client.post("/movies")
+        assert response.status_code == 202
+        job = response.json()
+        assert job["state"] in ("running", "finished")
+        events = _read_events(job["id"])
+    assert events == [
+        (
+            "finished",
+            {
+                "seq": 1,
+                "kind": "finished",
+                "filename": None,
+                "movie_id": None,
+                "message": None,
+                "duplicate_of": None,
+            },
+        )
+    ]
+    response = client.get(f"/jobs/{job['id']}")
+    assert response.status_code == 200
+    assert response.json()["state"] == "finished"
+    assert response.json()["total"] == 0
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.get("/jobs/unknown/events").status_code == 404
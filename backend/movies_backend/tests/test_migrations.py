@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Schema migration tests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 12:31:10 2026 +0200
+Last modified : Sa Okt 17 12:31:10 2026 +0200
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Generator
+
+import pytest
+from pytest import FixtureRequest
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from movies_backend.changes import CHANGES_TABLES
+from movies_backend.database import create_db_engine
+from movies_backend.migrations import (
+    SCHEMA_VERSION,
+    get_schema_version,
+    migrate_db,
+)
+from movies_backend.search import rebuild_search_index
+
+INDEXES = {
+    "movie_actors": {"ix_movie_actors_actor_id_movie_id"},
+    "movie_categories": {"ix_movie_categories_category_id_movie_id"},
+    "movies": {
+        "ix_movies_fingerprint",
+        "ix_movies_list_order",
+        "ix_movies_sort_name",
+        "ix_movies_series_id",
+        "ix_movies_studio_id",
+    },
+}
+
+
+@pytest.fixture(name="legacy_engine")
+def legacy_engine_fixture(
+    tmp_path: Path, request: FixtureRequest
+) -> Generator[Engine, None, None]:
+    """
+    Get an engine for a database created before the migrations existed.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    request : FixtureRequest
+        Fixture request
+
+    Yields
+    ------
+    Engine
+        The database engine.
+    """
+    path = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(path.as_posix())
+    filename = Path(request.path).parent / "data" / "init.sql"
+    with open(filename, "r", encoding="utf-8") as f:
+        connection.executescript(f.read())
+    connection.close()
+    engine = create_db_engine(path=path.as_posix())
+    yield engine
+    engine.dispose()
+
+
+def _index_names(engine: Engine, table: str) -> set[str]:
+    return {str(index["name"]) for index in inspect(engine).get_indexes(table)}
+
+
+def test_migrate_legacy_db(legacy_engine: Engine) -> None:
+    """
+    Test that a legacy database is migrated to the current version.
+
+    Parameters
+    ----------
+    legacy_engine : Engine
+        Database engine
+    """
+    with legacy_engine.connect() as connection:
+        assert get_schema_version(connection) == 0
+    assert migrate_db(engine=legacy_engine) == SCHEMA_VERSION
+    with legacy_engine.connect() as connection:
+        assert get_schema_version(connection) == SCHEMA_VERSION
+        count = connection.scalar(text("SELECT count(*) FROM movies"))
+        assert count == 12
+    for table, names in INDEXES.items():
+        assert names <= _index_names(legacy_engine, table)
+    assert migrate_db(engine=legacy_engine) == 0
+
+
+def test_migrate_new_db(tmp_path: Path) -> None:
+    """
+    Test that a new database is created at the current version.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    engine = create_db_engine(path=(tmp_path / "db.sqlite3").as_posix())
+    assert migrate_db(engine=engine) == SCHEMA_VERSION
+    for table, names in INDEXES.items():
+        assert names <= _index_names(engine, table)
+    assert migrate_db(engine=engine) == 0
+    engine.dispose()
+
+
+def test_migrate_newer_db(tmp_path: Path) -> None:
+    """
+    Test that a database from a newer version is rejected.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    engine = create_db_engine(path=(tmp_path / "db.sqlite3").as_posix())
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"PRAGMA user_version={SCHEMA_VERSION + 1}")
+    with pytest.raises(RuntimeError):
+        migrate_db(engine=engine)
+    engine.dispose()
+
+
+def test_reverse_association_index_used(legacy_engine: Engine) -> None:
+    """
+    Test that looking up the movies of an actor uses the reverse index.
+
+    Parameters
+    ----------
+    legacy_engine : Engine
+        Database engine
+    """
+    migrate_db(engine=legacy_engine)
+    with legacy_engine.connect() as connection:
+        plan = " ".join(
+            str(row[-1])
+            for row in connection.execute(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT movie_id FROM movie_actors"
+                    " WHERE actor_id = 8"
+                )
+            )
+        )
+    assert "ix_movie_actors_actor_id_movie_id" in plan
+
+
+def test_list_order_maintained(legacy_engine: Engine) -> None:
+    """
+    Test that the denormalized sort names follow their studio and series.
+
+    Parameters
+    ----------
+    legacy_engine : Engine
+        Database engine
+    """
+    migrate_db(engine=legacy_engine)
+    query = text("SELECT studio_sort_name FROM movies WHERE id = 1")
+    with legacy_engine.begin() as connection:
+        assert connection.scalar(query) == "universal pictures"
+        connection.execute(
+            text("UPDATE studios SET sort_name = 'universal' WHERE id = 3")
+        )
+        assert connection.scalar(query) == "universal"
+        connection.execute(text("UPDATE movies SET studio_id = NULL"))
+        assert connection.scalar(query) == ""
+        plan = " ".join(
+            str(row[-1])
+            for row in connection.execute(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT id FROM movies WHERE"
+                    " (processed, studio_sort_name, series_sort_name,"
+                    " sort_name, id) > (0, '', '', 'casino', 1)"
+                    " ORDER BY processed, studio_sort_name,"
+                    " series_sort_name, sort_name, id LIMIT 5"
+                )
+            )
+        )
+    assert "ix_movies_list_order" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_search_index_maintained(legacy_engine: Engine) -> None:
+    """
+    Test that the search index is built and follows the indexed tables.
+
+    Parameters
+    ----------
+    legacy_engine : Engine
+        Database engine
+    """
+    migrate_db(engine=legacy_engine)
+    query = text(
+        "SELECT rowid FROM search_index WHERE search_index MATCH :match"
+        " ORDER BY rowid"
+    )
+    with legacy_engine.begin() as connection:
+        # Joe Pesci is actor 10 and plays in movies 1 and 2
+        assert list(connection.scalars(query, {"match": '"pesci"'})) == [
+            1 * 4,
+            2 * 4,
+            10 * 4 + 1,
+        ]
+        connection.execute(
+            text("UPDATE actors SET name = 'Joseph Pesci' WHERE id = 10")
+        )
+        assert list(connection.scalars(query, {"match": '"joseph"'})) == [41]
+        connection.execute(text("DELETE FROM movie_actors WHERE movie_id = 1"))
+        connection.execute(
+            text("DELETE FROM movie_categories WHERE movie_id = 1")
+        )
+        connection.execute(text("DELETE FROM movies WHERE id = 1"))
+        assert list(connection.scalars(query, {"match": '"casino"'})) == []
+        assert rebuild_search_index(connection=connection) == 11 + 19 + 2 + 6
+
+
+def test_change_counters_maintained(legacy_engine: Engine) -> None:
+    """
+    Test that the change counters and movie revisions follow changes.
+
+    Parameters
+    ----------
+    legacy_engine : Engine
+        Database engine
+    """
+    migrate_db(engine=legacy_engine)
+    counters = text("SELECT name, version FROM change_counters")
+    revisions = text("SELECT revision FROM movies WHERE id IN (1, 2)")
+    with legacy_engine.begin() as connection:
+        assert set(connection.execute(counters).tuples()) == {
+            (table, 0) for table in CHANGES_TABLES
+        }
+        assert list(connection.scalars(revisions)) == [0, 0]
+        connection.execute(
+            text("UPDATE movies SET processed = 1 WHERE id = 1")
+        )
+        # Al Pacino is actor 13, movie 1 has two categories
+        connection.execute(
+            text("INSERT INTO movie_actors VALUES (1, 13), (2, 13)")
+        )
+        connection.execute(
+            text("DELETE FROM movie_categories WHERE movie_id = 1")
+        )
+        connection.execute(text("UPDATE actors SET name = 'Al' WHERE id = 13"))
+        connection.execute(
+            text("UPDATE movies SET duration = 60.0 WHERE id = 2")
+        )
+        assert list(connection.scalars(revisions)) == [4, 2]
+        # Revision updates count as changes of the movies table as well
+        assert dict(connection.execute(counters).tuples().all()) == {
+            "actors": 1,
+            "categories": 0,
+            "movie_actors": 2,
+            "movie_categories": 2,
+            "movies": 8,
+            "series": 0,
+            "studios": 0,
+        }
+
+
+def _schema_objects(engine: Engine) -> set[tuple[str, str, str | None]]:
+    # Tables differ in the text of added columns, triggers must not
+    with engine.connect() as connection:
+        return set(
+            connection.execute(
+                text(
+                    "SELECT type, name,"
+                    " CASE type WHEN 'trigger' THEN sql END"
+                    " FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"
+                )
+            ).tuples()
+        )
+
+
+def test_new_db_matches_migrated_db(
+    legacy_engine: Engine, tmp_path: Path
+) -> None:
+    """
+    Test that a new database has the objects of a migrated database.
+
+    Parameters
+    ----------
+    legacy_engine : Engine
+        Database engine
+    tmp_path : Path
+        Temporary path
+    """
+    migrate_db(engine=legacy_engine)
+    engine = create_db_engine(path=(tmp_path / "new.sqlite3").as_posix())
+    migrate_db(engine=engine)
+    assert _schema_objects(engine) == _schema_objects(legacy_engine)
+    assert ("index", "ix_movies_processed_sort_name", None) not in (
+        _schema_objects(engine)
+    )
+    engine.dispose()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : File move tests.
+
+Author        : Vadim Titov
+Created       : So Okt 18 14:51:30 2026 +0200
+Last modified : So Okt 18 14:51:30 2026 +0200
+"""
+
+import errno
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+
+from movies_backend.move import move_file
+
+DATA = bytes(range(256)) * 40 + b"tail"
+
+
+def _exdev(src: str, dst: str) -> None:
+    raise OSError(errno.EXDEV, os.strerror(errno.EXDEV), src, None, dst)
+
+
+def _unsupported(*_: object) -> int:
+    raise OSError(errno.ENOSYS, os.strerror(errno.ENOSYS))
+
+
+def test_move_file_rename(tmp_path: Path) -> None:
+    """
+    Test that a file on the same filesystem is renamed.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    (tmp_path / "a.mp4").write_bytes(DATA)
+    progress: List[int] = []
+    stats = move_file(
+        src=(tmp_path / "a.mp4").as_posix(),
+        dst=(tmp_path / "b.mp4").as_posix(),
+        progress=progress.append,
+    )
+    assert not stats.copied
+    assert stats.size == len(DATA)
+    assert progress == [len(DATA)]
+    assert (tmp_path / "b.mp4").read_bytes() == DATA
+    assert not (tmp_path / "a.mp4").exists()
+
+
+def test_move_file_across_filesystems(tmp_path: Path) -> None:
+    """
+    Test that a file is copied to another filesystem.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    if not os.path.isdir("/dev/shm"):
+        pytest.skip("No second filesystem")
+    with tempfile.TemporaryDirectory(dir="/dev/shm") as other:
+        if os.stat(other).st_dev == os.stat(tmp_path).st_dev:
+            pytest.skip("No second filesystem")
+        src = tmp_path / "a.mp4"
+        src.write_bytes(DATA)
+        os.utime(src, (1000000000, 1000000000))
+        dst = Path(other) / "a.mp4"
+        progress: List[int] = []
+        stats = move_file(
+            src=src.as_posix(),
+            dst=dst.as_posix(),
+            progress=progress.append,
+            chunk=4096,
+        )
+        assert stats.copied
+        assert stats.size == sum(progress) == len(DATA)
+        assert stats.bytes_per_second > 0
+        assert dst.read_bytes() == DATA
+        assert dst.stat().st_mtime == 1000000000
+        assert not src.exists()
+        assert os.listdir(other) == ["a.mp4"]
+
+
+@pytest.mark.parametrize(
+    "unsupported",
+    [
+        pytest.param([], id="copy_file_range"),
+        pytest.param(["copy_file_range"], id="sendfile"),
+        pytest.param(["copy_file_range", "sendfile"], id="read"),
+    ],
+)
+def test_move_file_copy_methods(
+    tmp_path: Path, unsupported: List[str]
+) -> None:
+    """
+    Test that every copy method moves the complete file.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    unsupported : List[str]
+        Copy system calls that fail as unsupported
+    """
+    (tmp_path / "a.mp4").write_bytes(DATA)
+    (tmp_path / "movies").mkdir()
+    progress: List[int] = []
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(os, "rename", _exdev)
+        for name in unsupported:
+            monkeypatch.setattr(os, name, _unsupported)
+        stats = move_file(
+            src=(tmp_path / "a.mp4").as_posix(),
+            dst=(tmp_path / "movies" / "a.mp4").as_posix(),
+            progress=progress.append,
+            chunk=4096,
+        )
+    assert stats.copied
+    assert progress == [4096, 4096, len(DATA) - 8192]
+    assert (tmp_path / "movies" / "a.mp4").read_bytes() == DATA
+    assert os.listdir(tmp_path) == ["movies"]
+
+
+@pytest.mark.parametrize(
+    "copy",
+    [
+        pytest.param(lambda *_: 0, id="short"),
+        pytest.param(_unsupported, id="unsupported"),
+    ],
+)
+def test_move_file_failed_copy(
+    tmp_path: Path, copy: Callable[..., int]
+) -> None:
+    """
+    Test that a failed copy leaves the source and no partial file.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    copy : Callable[..., int]
+        Replaces every copy system call
+    """
+    (tmp_path / "a.mp4").write_bytes(DATA)
+    (tmp_path / "movies").mkdir()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(os, "rename", _exdev)
+        monkeypatch.setattr(os, "copy_file_range", copy)
+        monkeypatch.setattr(os, "sendfile", copy)
+        monkeypatch.setattr(os, "read", copy)
+        with pytest.raises(OSError):
+            move_file(
+                src=(tmp_path / "a.mp4").as_posix(),
+                dst=(tmp_path / "movies" / "a.mp4").as_posix(),
+            )
+    assert (tmp_path / "a.mp4").read_bytes() == DATA
+    assert not os.listdir(tmp_path / "movies")
+
+
+def test_move_file_source_not_removed(tmp_path: Path) -> None:
+    """
+    Test that the copy is removed if the source cannot be removed.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    src = tmp_path / "a.mp4"
+    src.write_bytes(DATA)
+    (tmp_path / "movies").mkdir()
+    unlink = os.unlink
+
+    def unlink_not_source(path: str) -> None:
+        if path == src.as_posix():
+            raise OSError(errno.EACCES, os.strerror(errno.EACCES), path)
+        unlink(path)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(os, "rename", _exdev)
+        monkeypatch.setattr(os, "unlink", unlink_not_source)
+        with pytest.raises(PermissionError):
+            move_file(
+                src=src.as_posix(),
+                dst=(tmp_path / "movies" / "a.mp4").as_posix(),
+            )
+    assert src.read_bytes() == DATA
+    assert not os.listdir(tmp_path / "movies")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Pagination tests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 14:31:09 2026 +0200
+Last modified : Sa Okt 17 14:31:09 2026 +0200
+"""
+
+import base64
+
+import pytest
+
+from movies_backend.exceptions import InvalidCursorException
+from movies_backend.pagination import MovieCursor
+
+
+def test_cursor_roundtrip() -> None:
+    """Test encoding and decoding a cursor."""
+    cursor = MovieCursor(True, "universal", "", "casino", 1, backward=True)
+    token = cursor.encode()
+    assert "=" not in token
+    assert MovieCursor.decode(token) == cursor
+    assert cursor.key == (True, "universal", "", "casino", 1)
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "!!!",
+        base64.urlsafe_b64encode(b"{}").decode(),
+        base64.urlsafe_b64encode(b'[1, "", "", "", 1, false]').decode(),
+    ],
+)
+def test_cursor_invalid(token: str) -> None:
+    """Test decoding invalid cursors."""
+    with pytest.raises(InvalidCursorException):
+        MovieCursor.decode(token)
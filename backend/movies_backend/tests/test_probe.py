@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Media metadata tests.
+
+Author        : Vadim Titov
+Created       : So Okt 18 19:30:14 2026 +0200
+Last modified : So Okt 18 19:30:14 2026 +0200
+"""
+
+import io
+import sqlite3
+from pathlib import Path
+from typing import List
+
+import pytest
+from pytest import FixtureRequest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from movies_backend import probe
+from movies_backend.database import create_db_engine
+from movies_backend.migrations import migrate_db
+from movies_backend.models import Movie
+from movies_backend.probe import MediaInfo, backfill, probe_file, probe_media
+
+from .media_files import make_mkv, make_mp4
+
+
+class CountingReader(io.BytesIO):
+    """In-memory file counting the bytes read."""
+
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size: int | None = -1, /) -> bytes:
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+@pytest.mark.parametrize(
+    "data, media",
+    [
+        pytest.param(
+            make_mp4(seconds=5400, width=1920, height=1080),
+            MediaInfo(duration=5400.0, width=1920, height=1080, codec="h264"),
+            id="mp4",
+        ),
+        pytest.param(
+            make_mp4(seconds=60.5, width=3840, height=2160, entry=b"hvc1"),
+            MediaInfo(duration=60.5, width=3840, height=2160, codec="hevc"),
+            id="mp4-hevc",
+        ),
+        pytest.param(
+            make_mkv(seconds=7200, width=3840, height=2160),
+            MediaInfo(duration=7200.0, width=3840, height=2160, codec="hevc"),
+            id="mkv",
+        ),
+        pytest.param(
+            make_mkv(
+                seconds=90,
+                width=1280,
+                height=720,
+                codec="V_AV1",
+                tracks_last=True,
+            ),
+            MediaInfo(duration=90.0, width=1280, height=720, codec="av1"),
+            id="mkv-seek-head",
+        ),
+    ],
+)
+def test_probe_media(data: bytes, media: MediaInfo) -> None:
+    """
+    Test that the metadata is read from a few KB of headers.
+
+    Parameters
+    ----------
+    data : bytes
+        Content of the file
+    media : MediaInfo
+        The expected metadata without the bitrate
+    """
+    f = CountingReader(data)
+    result = probe_media(f, len(data))
+    assert result is not None
+    assert result.duration == pytest.approx(media.duration)
+    assert (result.width, result.height, result.codec) == (
+        media.width,
+        media.height,
+        media.codec,
+    )
+    assert media.duration is not None
+    assert result.bitrate == round(len(data) * 8 / media.duration)
+    assert f.bytes_read < 2048
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"not a movie file", id="text"),
+        pytest.param(
+            make_mp4(60, 640, 480, media_bytes=0)[:58], id="truncated-mp4"
+        ),
+        pytest.param(make_mkv(60, 640, 480)[:40], id="truncated-mkv"),
+    ],
+)
+def test_probe_media_unsupported(data: bytes) -> None:
+    """
+    Test that files without valid headers have no metadata.
+
+    Parameters
+    ----------
+    data : bytes
+        Content of the file
+    """
+    assert probe_media(io.BytesIO(data), len(data)) is None
+
+
+def test_probe_file(tmp_path: Path) -> None:
+    """
+    Test probing a file and a missing file.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    path = tmp_path / "a.mp4"
+    path.write_bytes(make_mp4(seconds=10, width=720, height=576))
+    media = probe_file(path.as_posix())
+    assert media is not None
+    assert (media.duration, media.width, media.height) == (10.0, 720, 576)
+    with pytest.raises(FileNotFoundError):
+        probe_file((tmp_path / "missing.mp4").as_posix())
+
+
+def test_backfill(tmp_path: Path, request: FixtureRequest) -> None:
+    """
+    Test that the movies with a supported file get media metadata.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    request : FixtureRequest
+        Fixture request
+    """
+    path = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(path.as_posix())
+    script = Path(request.path).parent / "data" / "init.sql"
+    with open(script, "r", encoding="utf-8") as f:
+        connection.executescript(f.read())
+    connection.close()
+    engine = create_db_engine(path=path.as_posix())
+    migrate_db(engine=engine)
+    (tmp_path / "movies").mkdir()
+    with Session(engine) as db:
+        mp4, mkv, text = db.scalars(select(Movie.filename).limit(3)).all()
+    (tmp_path / "movies" / mp4).write_bytes(make_mp4(60, 1920, 800))
+    (tmp_path / "movies" / mkv).write_bytes(make_mkv(120, 1920, 1080))
+    (tmp_path / "movies" / text).write_bytes(b"text")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+        assert backfill(engine=engine, batch_size=2) == (2, 9)
+    with Session(engine) as db:
+        movies = {
+            movie.filename: movie
+            for movie in db.scalars(
+                select(Movie).where(Movie.filename.in_([mp4, mkv, text]))
+            )
+        }
+    assert (movies[mp4].duration, movies[mp4].codec) == (60.0, "h264")
+    assert (movies[mkv].width, movies[mkv].height) == (1920, 1080)
+    assert movies[mkv].bitrate is not None
+    assert movies[text].duration is None
+    engine.dispose()
+
+
+def test_backfill_unlocked(tmp_path: Path, request: FixtureRequest) -> None:
+    """
+    Test that files are probed while other connections may write.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    request : FixtureRequest
+        Fixture request
+    """
+    path = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(path.as_posix())
+    script = Path(request.path).parent / "data" / "init.sql"
+    with open(script, "r", encoding="utf-8") as f:
+        connection.executescript(f.read())
+    connection.close()
+    engine = create_db_engine(path=path.as_posix())
+    migrate_db(engine=engine)
+    (tmp_path / "movies").mkdir()
+    with Session(engine) as db:
+        for name in db.scalars(select(Movie.filename)):
+            (tmp_path / "movies" / name).write_bytes(make_mp4(60, 1920, 800))
+    locked: List[str] = []
+
+    def probe_unlocked(file: str) -> MediaInfo | None:
+        connection = sqlite3.connect(
+            path.as_posix(), timeout=0, isolation_level=None
+        )
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("ROLLBACK")
+        except sqlite3.OperationalError:
+            locked.append(file)
+        finally:
+            connection.close()
+        return probe_file(file)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+        monkeypatch.setattr(probe, "probe_file", probe_unlocked)
+        assert backfill(engine=engine, batch_size=5) == (12, 0)
+    assert not locked
+    engine.dispose()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Link directory reconciliation tests.
+
+Author        : Vadim Titov
+Created       : So Okt 18 20:41:05 2026 +0200
+Last modified : So Okt 18 20:41:05 2026 +0200
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Generator, Tuple
+
+import pytest
+from pytest import FixtureRequest
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from movies_backend.database import create_db_engine
+from movies_backend.migrations import migrate_db
+from movies_backend.relink import relink_property_files
+
+CASINO = (
+    "[Universal Pictures] Casino (Joe Pesci, Robert De Niro, Sharon Stone).mp4"
+)
+
+
+@pytest.fixture(name="library")
+def library_fixture(
+    tmp_path: Path, request: FixtureRequest
+) -> Generator[Tuple[Engine, Path], None, None]:
+    """
+    Get an engine for the test data and an empty link tree.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    request : FixtureRequest
+        Fixture request
+
+    Yields
+    ------
+    Tuple[Engine, Path]
+        The database engine and the database directory.
+    """
+    path = tmp_path / "db.sqlite3"
+    connection = sqlite3.connect(path.as_posix())
+    script = Path(request.path).parent / "data" / "init.sql"
+    with open(script, "r", encoding="utf-8") as f:
+        connection.executescript(f.read())
+    connection.close()
+    engine = create_db_engine(path=path.as_posix())
+    migrate_db(engine=engine)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+        yield engine, tmp_path
+    engine.dispose()
+
+
+def _tree(path: Path) -> Dict[str, str]:
+    tree = {}
+    for kind in ("actors", "categories", "series", "studios"):
+        for root, dirs, files in os.walk(path / kind):
+            for name in dirs + files:
+                entry = Path(root) / name
+                key = entry.relative_to(path).as_posix()
+                if entry.is_symlink():
+                    tree[key] = os.readlink(entry)
+                elif entry.is_dir():
+                    tree[key] = "/"
+                else:
+                    tree[key] = "file"
+    return tree
+
+
+def test_relink(library: Tuple[Engine, Path]) -> None:
+    """
+    Test that missing links are created and stale links removed.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and database directory
+    """
+    engine, path = library
+    with Session(engine) as db:
+        stats = relink_property_files(db=db)
+    assert stats.failed == 0
+    assert stats.created == stats.links
+    assert stats.deleted == 0
+    tree = _tree(path)
+    assert tree[f"actors/Joe Pesci/{CASINO}"] == f"../../movies/{CASINO}"
+    assert (
+        tree[f"studios/Universal Pictures/{CASINO}"]
+        == f"../../movies/{CASINO}"
+    )
+    assert sum(target != "/" for target in tree.values()) == stats.links
+    (path / "actors" / "Nobody").mkdir()
+    (path / "actors" / "Nobody" / "Stale.mp4").symlink_to(
+        "../../movies/Stale.mp4"
+    )
+    (path / "actors" / "Empty").mkdir()
+    (path / "actors" / "Notes").mkdir()
+    (path / "actors" / "Notes" / "notes.txt").write_text("keep")
+    wrong = path / "actors" / "Joe Pesci" / CASINO
+    wrong.unlink()
+    wrong.symlink_to("../../movies/Other.mp4")
+    (path / "studios" / "Universal Pictures" / CASINO).unlink()
+    with Session(engine) as db:
+        stats = relink_property_files(db=db)
+    assert (stats.created, stats.deleted) == (2, 2)
+    assert (stats.dirs_created, stats.dirs_deleted, stats.failed) == (0, 2, 0)
+    assert _tree(path) == {
+        **tree,
+        "actors/Notes": "/",
+        "actors/Notes/notes.txt": "file",
+    }
+    with Session(engine) as db:
+        stats = relink_property_files(db=db)
+    assert (stats.created, stats.deleted, stats.dirs_deleted) == (0, 0, 0)
+
+
+def test_relink_dry_run(library: Tuple[Engine, Path]) -> None:
+    """
+    Test that a dry run plans the changes without applying them.
+
+    Parameters
+    ----------
+    library : Tuple[Engine, Path]
+        Database engine and database directory
+    """
+    engine, path = library
+    (path / "series" / "Stale").mkdir(parents=True)
+    with Session(engine) as db:
+        stats = relink_property_files(db=db, dry_run=True)
+    assert stats.created == stats.links > 0
+    assert stats.dirs_created > 0
+    assert stats.dirs_deleted == 1
+    assert _tree(path) == {"series/Stale": "/"}
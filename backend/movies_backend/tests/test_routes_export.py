@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Export routes tests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 23:24:36 2026 +0200
+Last modified : Sa Okt 17 23:24:36 2026 +0200
+"""
+
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from movies_backend.export import CSV_COLUMNS
+from movies_backend.main import app
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("batch_size", ["1", "5", "500"])
+def test_export_movies_ndjson(batch_size: str) -> None:
+    """
+    Test that the NDJSON export holds the detail of every movie.
+
+    Parameters
+    ----------
+    batch_size : str
+        Number of movies per batch
+    """
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_EXPORT_BATCH_SIZE", batch_size)
+        response = client.get("/export/movies.ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "movies.ndjson" in response.headers["content-disposition"]
+    assert response.text.endswith("\n")
+    movies = [json.loads(line) for line in response.text.splitlines()]
+    ids = [movie["id"] for movie in movies]
+    assert ids == [movie["id"] for movie in client.get("/movies").json()]
+    for movie in movies:
+        assert movie == client.get(f"/movies/{movie['id']}").json()
+
+
+def test_export_movies_csv() -> None:
+    """Test that the CSV export holds every movie with property names."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_EXPORT_BATCH_SIZE", "2")
+        response = client.get("/export/movies.csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    reader = csv.DictReader(io.StringIO(response.text, newline=""))
+    assert tuple(reader.fieldnames or ()) == CSV_COLUMNS
+    rows = {int(row["id"]): row for row in reader}
+    assert len(rows) == len(client.get("/movies").json())
+    casino = rows[1]
+    assert casino["name"] == "Casino"
+    assert casino["studio"] == "Universal Pictures"
+    assert casino["series"] == ""
+    assert "Robert De Niro" in casino["actors"].split("; ")
+    assert len(casino["categories"].split("; ")) == 2
@@ -9,9 +9,19 @@ Created       : Mi Okt 29 15:24:53 2024 +0200
 Last modified : Mi Okt 29 15:45:31 2024 +0200
 """
 
+from pathlib import Path
+
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, update
 
+from movies_backend.crud import add_movie
+from movies_backend.database import db_session
 from movies_backend.main import app
+from movies_backend.models import Movie
+from movies_backend.probe import backfill
+
+from .media_files import make_mp4
 
 client = TestClient(app)
 
@@ -46,9 +56,209 @@ def test_get_movie() -> None:
             "[Universal Pictures] Casino (Joe Pesci, Robert De Niro, Sharon"
             " Stone).mp4"
         ),
+        "duration": None,
+        "width": None,
+        "height": None,
+        "codec": None,
+        "bitrate": None,
     }
     response = client.get("/movies/0")
     assert response.status_code == 404
     assert response.json() == {
         "detail": {"message": "Movie with ID 0 not found."}
     }
+
+
+def test_get_movies_pages() -> None:
+    """Test walking the movie list page by page."""
+    movies = client.get("/movies").json()
+    pages = []
+    response = client.get("/movies", params={"limit": 5})
+    assert "X-Prev-Cursor" not in response.headers
+    pages.append(response.json())
+    while "X-Next-Cursor" in response.headers:
+        response = client.get(
+            "/movies",
+            params={"limit": 5, "cursor": response.headers["X-Next-Cursor"]},
+        )
+        assert response.status_code == 200
+        pages.append(response.json())
+    assert [len(page) for page in pages] == [5, 5, 3]
+    assert [movie for page in pages for movie in page] == movies
+
+    response = client.get(
+        "/movies",
+        params={"limit": 5, "cursor": response.headers["X-Prev-Cursor"]},
+    )
+    assert response.json() == pages[1]
+    response = client.get(
+        "/movies",
+        params={"limit": 5, "cursor": response.headers["X-Prev-Cursor"]},
+    )
+    assert response.json() == pages[0]
+    assert "X-Prev-Cursor" not in response.headers
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_get_movies_invalid_page() -> None:
+    """Test getting a page with an invalid cursor or limit."""
+    response = client.get("/movies", params={"cursor": "invalid"})
+    assert response.status_code == 400
+    assert "InvalidCursorException" in response.json()["detail"]["message"]
+    assert client.get("/movies", params={"limit": 0}).status_code == 422
+
+
+def test_get_movies_filtered() -> None:
+    """Test filtering the movie list."""
+    response = client.get(
+        "/movies", params={"actor": [8, 13], "actor_match": "all"}
+    )
+    assert response.status_code == 200
+    assert {movie["id"] for movie in response.json()} == {3, 10}
+
+    response = client.get("/movies", params={"category": 1, "limit": 5})
+    pages = [response.json()]
+    response = client.get(
+        "/movies",
+        params={
+            "category": 1,
+            "limit": 5,
+            "cursor": response.headers["X-Next-Cursor"],
+        },
+    )
+    pages.append(response.json())
+    assert "X-Next-Cursor" not in response.headers
+    assert [movie for page in pages for movie in page] == client.get(
+        "/movies", params={"category": 1}
+    ).json()
+
+    response = client.get("/movies", params={"actor_match": "some"})
+    assert response.status_code == 422
+
+    for name in ("the ", "é"):
+        response = client.get("/movies", params={"name": name, "limit": 5})
+        assert response.status_code == 200
+        assert response.json() == []
+
+
+def test_update_movies_batch_invalid() -> None:
+    """Test a batch update with invalid IDs."""
+    response = client.post("/movies/batch", json={"movies": [1, 0]})
+    assert response.status_code == 404
+    assert response.json() == {
+        "detail": {
+            "message": "InvalidIDException('Movie IDs [0] do not exist')"
+        }
+    }
+    response = client.post(
+        "/movies/batch",
+        json={"movies": [1], "add_actors": [8], "remove_actors": [8]},
+    )
+    assert response.status_code == 422
+
+
+def test_get_all_movies_snapshot() -> None:
+    """Test that the movie list snapshot matches and follows changes."""
+    response = client.get("/movies")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert (
+        response.json() == client.get("/movies", params={"limit": 1000}).json()
+    )
+    response = client.get("/movies", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert len(response.json()) == 13
+    stats = client.get("/cache").json()["movies"]
+    assert stats["hits"] >= 2
+    assert stats["size"] > len(response.content)
+    studio = client.post("/studios", json={"name": "Miramax"}).json()
+    client.get("/movies")
+    client.delete(f"/studios/{studio['id']}")
+    assert client.get("/cache").json()["movies"]["misses"] == (
+        stats["misses"] + 1
+    )
+
+
+def test_get_movies_not_modified() -> None:
+    """Test that unchanged lists and movies are answered with 304."""
+    for url in ("/movies", "/movies?limit=5", "/movies/1", "/actors"):
+        response = client.get(url)
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert not response.content
+    etags = {
+        url: client.get(url).headers["ETag"]
+        for url in ("/movies", "/movies/1", "/movies/2", "/studios")
+    }
+    studio = client.post("/studios", json={"name": "Miramax"}).json()
+    client.delete(f"/studios/{studio['id']}")
+    for url, etag in etags.items():
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+
+def test_get_movie_probed(tmp_path: Path) -> None:
+    """
+    Test that probing the file of a movie changes its entity tag.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    response = client.get("/movies/1")
+    etag = response.headers["ETag"]
+    (tmp_path / "movies").mkdir()
+    (tmp_path / "movies" / response.json()["filename"]).write_bytes(
+        make_mp4(seconds=123, width=1920, height=1080)
+    )
+    with db_session() as db:
+        engine = db.get_bind()
+    try:
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+            assert backfill(engine=engine)[0] == 1
+        response = client.get("/movies/1", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()["duration"] == 123.0
+    finally:
+        with db_session() as db:
+            db.execute(
+                update(Movie)
+                .where(Movie.id == 1)
+                .values(
+                    duration=None,
+                    width=None,
+                    height=None,
+                    codec=None,
+                    bitrate=None,
+                )
+            )
+            db.commit()
+
+
+def test_get_movie_reused_id() -> None:
+    """Test that a movie with the ID of a deleted movie has another tag."""
+    with db_session() as db:
+        movie_id = add_movie(db=db, filename="deleted.mp4", name="Deleted").id
+    etag = client.get(f"/movies/{movie_id}").headers["ETag"]
+    with db_session() as db:
+        db.execute(delete(Movie).where(Movie.id == movie_id))
+        db.commit()
+        movie = add_movie(db=db, filename="other.mp4", name="Other")
+        assert movie.id == movie_id
+    try:
+        response = client.get(
+            f"/movies/{movie_id}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()["filename"] == "other.mp4"
+    finally:
+        with db_session() as db:
+            db.execute(delete(Movie).where(Movie.id == movie_id))
+            db.commit()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Search routes tests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 16:26:47 2026 +0200
+Last modified : Sa Okt 17 16:26:47 2026 +0200
+"""
+
+from fastapi.testclient import TestClient
+
+from movies_backend.main import app
+
+client = TestClient(app)
+
+
+def test_search() -> None:
+    """Test searching by name prefix."""
+    response = client.get("/search", params={"q": "godf"})
+    assert response.status_code == 200
+    assert {(result["kind"], result["id"]) for result in response.json()} == {
+        ("movie", 10),
+        ("movie", 11),
+        ("movie", 12),
+        ("series", 2),
+    }
+    response = client.get("/search", params={"q": "pes"})
+    assert response.json()[0] == {
+        "kind": "actor",
+        "id": 10,
+        "name": "Joe Pesci",
+    }
+    response = client.get("/search", params={"q": "godfather iii", "limit": 1})
+    assert response.json() == [
+        {"kind": "movie", "id": 11, "name": "The Godfather Part III"}
+    ]
+
+
+def test_search_invalid() -> None:
+    """Test searching without words."""
+    assert client.get("/search", params={"q": "*"}).json() == []
+    assert client.get("/search", params={"q": ""}).status_code == 422
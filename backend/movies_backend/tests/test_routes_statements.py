@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : SQL statements per endpoint tests.
+
+Description   : Guards against N+1 queries: every endpoint has a fixed
+                statement budget that does not depend on the number of
+                rows returned. The caches are cleared before an endpoint
+                is measured, so the budget covers its loaders.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 13:15:51 2026 +0200
+Last modified : Sa Okt 17 13:15:51 2026 +0200
+"""
+
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from movies_backend.cache import MOVIE_LIST_SNAPSHOT, PROPERTY_CACHE
+from movies_backend.database import db_session
+from movies_backend.main import app
+
+from .statement_counter import count_statements
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "url, status_code, budget",
+    [
+        # change counter, list
+        ("/actors", 200, 2),
+        ("/categories", 200, 2),
+        ("/series", 200, 2),
+        ("/studios", 200, 2),
+        ("/movies", 200, 2),
+        ("/movies?limit=5", 200, 2),
+        # revision, movie with studio and series, actors, categories
+        ("/movies/1", 200, 4),
+        # revision, movie, no relationships to load
+        ("/movies/0", 404, 2),
+        # movies with studio and series, actors, categories per batch
+        ("/export/movies.ndjson", 200, 3),
+        ("/export/movies.csv", 200, 3),
+    ],
+)
+def test_statement_budget(url: str, status_code: int, budget: int) -> None:
+    """
+    Test that an endpoint runs exactly its statement budget.
+
+    The caches are cleared first, so the loaders run and an N+1 query in
+    them changes the count.
+
+    Parameters
+    ----------
+    url : str
+        The endpoint URL
+    status_code : int
+        The expected status code
+    budget : int
+        Number of statements
+    """
+    PROPERTY_CACHE.clear()
+    MOVIE_LIST_SNAPSHOT.clear()
+    with count_statements() as statements:
+        response = client.get(url)
+    assert response.status_code == status_code
+    assert len(statements) == budget, "\n".join(statements)
+
+
+def test_property_cache() -> None:
+    """Test that cached property lists only read the change counter."""
+    client.get("/actors")
+    hits = client.get("/cache").json()["hits"]
+    with count_statements() as statements:
+        response = client.get("/actors")
+    assert response.status_code == 200
+    assert len(statements) == 1
+    assert client.get("/cache").json()["hits"] == hits + 1
+    actor = client.post("/actors", json={"name": "Val Kilmer"}).json()
+    with count_statements() as statements:
+        response = client.get("/actors")
+    assert len(statements) == 2
+    assert actor in response.json()
+    client.delete(f"/actors/{actor['id']}")
+    assert actor not in client.get("/actors").json()
+
+
+def test_property_cache_other_worker() -> None:
+    """Test that cached lists follow changes committed by another worker."""
+    first = client.get("/actors")
+    snapshot = client.get("/movies")
+    with db_session() as db:
+        path = db.get_bind().url.database
+    assert path is not None
+    connection = sqlite3.connect(path)
+    with connection:
+        actor_id = connection.execute(
+            "INSERT INTO actors (name) VALUES ('Val Kilmer')"
+        ).lastrowid
+        studio_id = connection.execute(
+            "INSERT INTO studios (name, sort_name)"
+            " VALUES ('Paramount', 'paramount')"
+        ).lastrowid
+    response = client.get(
+        "/actors", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first.headers["ETag"]
+    assert {"id": actor_id, "name": "Val Kilmer"} in response.json()
+    response = client.get(
+        "/movies", headers={"If-None-Match": snapshot.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != snapshot.headers["ETag"]
+    with connection:
+        connection.execute("DELETE FROM actors WHERE id = ?", (actor_id,))
+        connection.execute("DELETE FROM studios WHERE id = ?", (studio_id,))
+    connection.close()
+    assert {"id": actor_id, "name": "Val Kilmer"} not in (
+        client.get("/actors").json()
+    )
+
+
+def test_movie_list_snapshot() -> None:
+    """Test that the movie list snapshot only reads the change counters."""
+    client.get("/movies")
+    with count_statements() as statements:
+        response = client.get("/movies")
+    assert response.status_code == 200
+    assert len(statements) == 1
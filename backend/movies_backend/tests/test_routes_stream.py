@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Movie file streaming tests.
+
+Author        : Vadim Titov
+Created       : So Okt 18 16:02:37 2026 +0200
+Last modified : So Okt 18 16:02:37 2026 +0200
+"""
+
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator, List
+
+import pytest
+from fastapi.responses import FileResponse
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from movies_backend.database import get_async_db_session
+from movies_backend.main import app
+from movies_backend.routes.movies import get_movie_media_type
+
+client = TestClient(app)
+
+DATA = bytes(range(256)) * 64
+FILENAME = (
+    "[Universal Pictures] Casino (Joe Pesci, Robert De Niro, Sharon Stone).mp4"
+)
+
+
+@pytest.fixture(name="movie_file")
+def fixture_movie_file(tmp_path: Path) -> Iterator[Path]:
+    """
+    Provide the file of movie 1 in a temporary movie directory.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+
+    Yields
+    ------
+    Path
+        Path of the movie file
+    """
+    (tmp_path / "movies").mkdir()
+    path = tmp_path / "movies" / FILENAME
+    path.write_bytes(DATA)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+        monkeypatch.setenv("MM_STREAM_CHUNK_BYTES", "4096")
+        yield path
+
+
+def test_stream_movie(movie_file: Path) -> None:
+    """
+    Test that the whole file is streamed inline with its media type.
+
+    Parameters
+    ----------
+    movie_file : Path
+        Path of the movie file
+    """
+    response = client.get("/movies/1/stream")
+    assert response.status_code == 200
+    assert response.content == DATA
+    assert response.headers["content-type"] == "video/mp4"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-disposition"].startswith("inline;")
+    assert "etag" in response.headers
+    response = client.head("/movies/1/stream")
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(DATA))
+    assert not response.content
+
+
+def test_stream_movie_range(movie_file: Path) -> None:
+    """
+    Test that a single range is answered with the part of the file.
+
+    Parameters
+    ----------
+    movie_file : Path
+        Path of the movie file
+    """
+    response = client.get("/movies/1/stream", headers={"Range": "bytes=100-"})
+    assert response.status_code == 206
+    assert response.content == DATA[100:]
+    assert (
+        response.headers["content-range"]
+        == f"bytes 100-{len(DATA) - 1}/{len(DATA)}"
+    )
+    response = client.get("/movies/1/stream", headers={"Range": "bytes=-10"})
+    assert response.status_code == 206
+    assert response.content == DATA[-10:]
+
+
+def test_stream_movie_ranges(movie_file: Path) -> None:
+    """
+    Test that multiple ranges are answered as multipart/byteranges.
+
+    Parameters
+    ----------
+    movie_file : Path
+        Path of the movie file
+    """
+    response = client.get(
+        "/movies/1/stream", headers={"Range": "bytes=0-9,5000-5009"}
+    )
+    assert response.status_code == 206
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    assert int(response.headers["content-length"]) == len(response.content)
+    boundary = content_type.split("boundary=")[1].encode()
+    parts = response.content.split(b"--" + boundary)
+    assert len(parts) == 4
+    assert b"Content-Type: video/mp4" in parts[1]
+    assert b"Content-Range: bytes 0-9/16384" in parts[1]
+    assert parts[1].endswith(b"\r\n\r\n" + DATA[0:10] + b"\r\n")
+    assert parts[2].endswith(b"\r\n\r\n" + DATA[5000:5010] + b"\r\n")
+
+
+def test_stream_movie_if_range(movie_file: Path) -> None:
+    """
+    Test that If-Range answers ranges only while the file is unchanged.
+
+    Parameters
+    ----------
+    movie_file : Path
+        Path of the movie file
+    """
+    etag = client.head("/movies/1/stream").headers["etag"]
+    response = client.get(
+        "/movies/1/stream", headers={"Range": "bytes=0-9", "If-Range": etag}
+    )
+    assert response.status_code == 206
+    assert response.content == DATA[:10]
+    movie_file.write_bytes(DATA + b"changed")
+    response = client.get(
+        "/movies/1/stream", headers={"Range": "bytes=0-9", "If-Range": etag}
+    )
+    assert response.status_code == 200
+    assert response.content == DATA + b"changed"
+
+
+def test_stream_movie_range_not_satisfiable(movie_file: Path) -> None:
+    """
+    Test that a range beyond the end of the file is answered with 416.
+
+    Parameters
+    ----------
+    movie_file : Path
+        Path of the movie file
+    """
+    response = client.get(
+        "/movies/1/stream", headers={"Range": f"bytes={len(DATA)}-"}
+    )
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+def test_stream_movie_not_found(movie_file: Path) -> None:
+    """
+    Test that unknown movies and missing files are answered with 404.
+
+    Parameters
+    ----------
+    movie_file : Path
+        Path of the movie file
+    """
+    assert client.get("/movies/0/stream").status_code == 404
+    movie_file.unlink()
+    response = client.get("/movies/1/stream")
+    assert response.status_code == 404
+    assert "FileNotFoundError" in response.json()["detail"]["message"]
+
+
+def test_stream_movie_session_closed(movie_file: Path) -> None:
+    """
+    Test that the database session is closed before the file is sent.
+
+    Parameters
+    ----------
+    movie_file : Path
+        Path of the movie file
+    """
+    events: List[str] = []
+
+    async def session() -> AsyncIterator[AsyncSession]:
+        async for db in get_async_db_session():
+            yield db
+        events.append("closed")
+
+    send_file = FileResponse.__call__
+
+    async def call(self: FileResponse, *args: Any) -> None:
+        events.append("sending")
+        await send_file(self, *args)
+
+    app.dependency_overrides[get_async_db_session] = session
+    try:
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(FileResponse, "__call__", call)
+            response = client.get("/movies/1/stream")
+    finally:
+        del app.dependency_overrides[get_async_db_session]
+    assert response.content == DATA
+    assert events == ["closed", "sending"]
+
+
+@pytest.mark.parametrize(
+    "filename, media_type",
+    [
+        ("a.mp4", "video/mp4"),
+        ("a.MKV", "video/x-matroska"),
+        ("a.ts", "video/mp2t"),
+        ("a.avi", "video/x-msvideo"),
+        ("a", "application/octet-stream"),
+    ],
+)
+def test_get_movie_media_type(filename: str, media_type: str) -> None:
+    """
+    Test the media types of movie files.
+
+    Parameters
+    ----------
+    filename : str
+        The filename
+    media_type : str
+        The expected media type
+    """
+    assert get_movie_media_type(filename) == media_type
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Search tests.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 16:24:05 2026 +0200
+Last modified : Sa Okt 17 16:24:05 2026 +0200
+"""
+
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from movies_backend.reindex import reindex
+from movies_backend.search import match_expression
+
+
+@pytest.mark.parametrize(
+    "query, expression",
+    [
+        ("god", '"god"*'),
+        ("The Godf", '"The"* "Godf"*'),
+        ('pesci" OR NOT *', '"pesci"* "OR"* "NOT"*'),
+        (" -*- ", ""),
+    ],
+)
+def test_match_expression(query: str, expression: str) -> None:
+    """Test converting user queries into match expressions."""
+    assert match_expression(query) == expression
+
+
+def test_reindex(tmp_path: Path, mocker: MockerFixture) -> None:
+    """
+    Test rebuilding the search index of a new database.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    mocker : MockerFixture
+        Mocker
+    """
+    mocker.patch(
+        "movies_backend.reindex.get_sqlite_path",
+        return_value=(tmp_path / "db.sqlite3").as_posix(),
+    )
+    assert reindex() == 0
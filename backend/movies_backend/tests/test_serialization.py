@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Fast serialization tests.
+
+Description   : Golden tests proving that the fast path encodes the same
+                bytes as the response model path.
+
+Author        : Vadim Titov
+Created       : Sa Okt 17 21:40:02 2026 +0200
+Last modified : Sa Okt 17 21:40:02 2026 +0200
+"""
+
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from movies_backend.cache import MOVIE_LIST_SNAPSHOT, PROPERTY_CACHE
+from movies_backend.main import app
+from movies_backend.schemas import ActorSchema, MovieFileSchema
+from movies_backend.serialization import encode_rows
+
+client = TestClient(app)
+
+NAMES = [
+    "Benicio del Toro",
+    'Dwayne "The Rock" Johnson',
+    "Gérard Depardieu",
+    "Jackie Chan 成龍",
+    "C:\\Movies\\Heat.mp4",
+    "tab\there, newline\nthere",
+    "\x00\x1f\x7f",
+    "line\u2028separator",
+    "emoji 🎬",
+    "",
+]
+
+
+def test_encode_rows() -> None:
+    """Test that encoded rows match the response model encoding."""
+    rows = [(index, name) for index, name in enumerate(NAMES)]
+    for schema, adapter in (
+        (ActorSchema, TypeAdapter(List[ActorSchema])),
+        (MovieFileSchema, TypeAdapter(List[MovieFileSchema])),
+    ):
+        fields = list(schema.model_fields)
+        expected = adapter.dump_json(
+            [schema.model_validate(dict(zip(fields, row))) for row in rows]
+        )
+        assert encode_rows(schema=schema, rows=rows) == expected
+    assert encode_rows(schema=ActorSchema, rows=[]) == b"[]"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/movies",
+        "/movies?category=1",
+        "/movies?actor=8&actor=13&actor_match=all",
+        "/actors",
+        "/categories",
+        "/series",
+        "/studios",
+    ],
+)
+def test_fast_json_identical(url: str) -> None:
+    """
+    Test that the fast path responds with byte-identical bodies.
+
+    Parameters
+    ----------
+    url : str
+        The endpoint URL
+    """
+    bodies = []
+    for fast in ("0", "1"):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setenv("MM_FAST_JSON", fast)
+            PROPERTY_CACHE.clear()
+            MOVIE_LIST_SNAPSHOT.clear()
+            response = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "application/json"
+        bodies.append(response.content)
+    PROPERTY_CACHE.clear()
+    MOVIE_LIST_SNAPSHOT.clear()
+    assert bodies[0] == bodies[1]
+    assert len(bodies[0]) > 2
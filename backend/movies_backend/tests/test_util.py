@@ -9,6 +9,9 @@ Created       : Mi Okt 29 13:28:00 2024 +0200
 Last modified : Do Okt 31 14:15:18 2024 +0100
 """
 
+import os
+from pathlib import Path
+
 import pytest
 from pytest_mock import MockerFixture
 
@@ -20,6 +23,7 @@ from movies_backend.util import (
     generate_movie_filename,
     get_movie_path,
     list_files,
+    rename_link_dir,
 )
 
 
@@ -130,3 +134,46 @@ def test_get_movie_path() -> None:
     for path_type, expected in expected_relative_paths.items():
         result = get_movie_path(path_type, full=False)
         assert result == expected
+
+
+def test_rename_link_dir(tmp_path: Path, mocker: MockerFixture) -> None:
+    """
+    Test rename_link_dir
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    mocker : MockerFixture
+        Mocker
+    """
+    mocker.patch(
+        "movies_backend.util.get_db_path", return_value=tmp_path.as_posix()
+    )
+    (tmp_path / "movies").mkdir()
+    for filename in ("a.mp4", "b.mp4", "c.mp4"):
+        (tmp_path / "movies" / filename).touch()
+    crime = tmp_path / "categories" / "Crime"
+    crime.mkdir(parents=True)
+    for filename in ("a.mp4", "b.mp4"):
+        (crime / filename).symlink_to(f"../../movies/{filename}")
+    rename = mocker.spy(os, "rename")
+
+    rename_link_dir(PathType.CATEGORY, "Crime", "Thriller")
+    assert rename.call_count == 1
+    thriller = tmp_path / "categories" / "Thriller"
+    assert not crime.exists()
+    assert sorted(os.listdir(thriller)) == ["a.mp4", "b.mp4"]
+    assert (thriller / "a.mp4").resolve() == tmp_path / "movies" / "a.mp4"
+
+    drama = tmp_path / "categories" / "Drama"
+    drama.mkdir()
+    for filename in ("b.mp4", "c.mp4"):
+        (drama / filename).symlink_to(f"../../movies/{filename}")
+    rename_link_dir(PathType.CATEGORY, "Thriller", "Drama")
+    assert not thriller.exists()
+    assert sorted(os.listdir(drama)) == ["a.mp4", "b.mp4", "c.mp4"]
+    assert (drama / "a.mp4").resolve() == tmp_path / "movies" / "a.mp4"
+
+    rename_link_dir(PathType.CATEGORY, "Missing", "Drama")
+    assert sorted(os.listdir(drama)) == ["a.mp4", "b.mp4", "c.mp4"]
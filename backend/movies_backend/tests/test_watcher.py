@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Summary       : Imports directory watcher tests.
+
+Author        : Vadim Titov
+Created       : So Okt 18 13:28:14 2026 +0200
+Last modified : So Okt 18 13:28:14 2026 +0200
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from movies_backend import create_app
+from movies_backend.exceptions import JobRunningException
+from movies_backend.watcher import (
+    ChangeSource,
+    ImportWatcher,
+    InotifySource,
+    PollingSource,
+)
+
+SOURCES = [
+    pytest.param(InotifySource, id="inotify"),
+    pytest.param(PollingSource, id="polling"),
+]
+
+
+class Imports:
+    """Records the files the watcher starts importing."""
+
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+        self.times: List[float] = []
+        self.called = threading.Event()
+
+    def __call__(self, files: List[str]) -> None:
+        self.calls.append(files)
+        self.times.append(time.monotonic())
+        self.called.set()
+
+    def wait(self) -> List[str]:
+        """
+        Wait for the next import.
+
+        Returns
+        -------
+        List[str]
+            The files of the import
+        """
+        assert self.called.wait(timeout=10)
+        self.called.clear()
+        return self.calls[-1]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_watcher_imports_new_files(
+    tmp_path: Path, source: Callable[[str], ChangeSource]
+) -> None:
+    """
+    Test that present and new files are imported, hidden files are not.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    source : Callable[[str], ChangeSource]
+        Opens the change source
+    """
+    (tmp_path / ".keep").touch()
+    (tmp_path / "Arrival.mp4").write_bytes(b"a")
+    imports = Imports()
+    watcher = ImportWatcher(
+        path=tmp_path.as_posix(),
+        start_import=imports,
+        settle=0.1,
+        interval=0.05,
+        source=source,
+    )
+    watcher.start()
+    try:
+        assert imports.wait() == ["Arrival.mp4"]
+        (tmp_path / "Zodiac.mp4").write_bytes(b"z")
+        (tmp_path / ".Zodiac.mp4.part").write_bytes(b"z")
+        assert imports.wait() == ["Zodiac.mp4"]
+    finally:
+        watcher.stop()
+    assert imports.calls == [["Arrival.mp4"], ["Zodiac.mp4"]]
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_watcher_waits_for_growing_file(
+    tmp_path: Path, source: Callable[[str], ChangeSource]
+) -> None:
+    """
+    Test that a file is only imported once it stopped growing.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    source : Callable[[str], ChangeSource]
+        Opens the change source
+    """
+    imports = Imports()
+    settle = 0.3
+    watcher = ImportWatcher(
+        path=tmp_path.as_posix(),
+        start_import=imports,
+        settle=settle,
+        interval=0.05,
+        source=source,
+    )
+    watcher.start()
+    try:
+        with open(tmp_path / "Heat.mp4", "wb") as f:
+            for _ in range(6):
+                f.write(b"x" * 1024)
+                f.flush()
+                time.sleep(0.1)
+        written = time.monotonic()
+        assert imports.wait() == ["Heat.mp4"]
+    finally:
+        watcher.stop()
+    # The last write happened right before the file was closed
+    assert imports.times[0] >= written - 0.1 + settle * 0.9
+
+
+def test_watcher_retries_while_job_runs(tmp_path: Path) -> None:
+    """
+    Test that files are imported later if an import job is running.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    imports = Imports()
+    attempts: List[List[str]] = []
+
+    def start_import(files: List[str]) -> None:
+        attempts.append(files)
+        if len(attempts) == 1:
+            raise JobRunningException("Import job is still running")
+        imports(files)
+
+    (tmp_path / "Arrival.mp4").write_bytes(b"a")
+    watcher = ImportWatcher(
+        path=tmp_path.as_posix(),
+        start_import=start_import,
+        settle=0.05,
+        interval=0.05,
+    )
+    watcher.start()
+    try:
+        assert imports.wait() == ["Arrival.mp4"]
+    finally:
+        watcher.stop()
+    assert attempts == [["Arrival.mp4"], ["Arrival.mp4"]]
+
+
+def test_watcher_lifespan(tmp_path: Path) -> None:
+    """
+    Test that the application runs the watcher if it is enabled.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    (tmp_path / "imports").mkdir()
+
+    def watching() -> bool:
+        return any(
+            thread.name == "import-watcher" for thread in threading.enumerate()
+        )
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MM_DB_PATH", tmp_path.as_posix())
+        monkeypatch.setenv("MM_WATCH_IMPORTS", "1")
+        monkeypatch.setenv("MM_WATCH_POLL_SECONDS", "0.05")
+        with TestClient(create_app()):
+            assert watching()
+        assert not watching()
+        monkeypatch.setenv("MM_WATCH_IMPORTS", "0")
+        with TestClient(create_app()):
+            assert not watching()
+
+
+def test_watcher_survives_errors(tmp_path: Path) -> None:
+    """
+    Test that a failing import does not stop the watcher and directories
+    are not imported.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    imports = Imports()
+    attempts: List[List[str]] = []
+
+    def start_import(files: List[str]) -> None:
+        attempts.append(files)
+        if len(attempts) == 1:
+            raise RuntimeError("Import failed")
+        imports(files)
+
+    (tmp_path / "Arrival.mp4").write_bytes(b"a")
+    (tmp_path / "Extras").mkdir()
+    watcher = ImportWatcher(
+        path=tmp_path.as_posix(),
+        start_import=start_import,
+        settle=0.05,
+        interval=0.05,
+    )
+    watcher.start()
+    try:
+        assert imports.wait() == ["Arrival.mp4"]
+        (tmp_path / "Zodiac.mp4").write_bytes(b"z")
+        assert imports.wait() == ["Zodiac.mp4"]
+    finally:
+        watcher.stop()
+    assert attempts == [["Arrival.mp4"], ["Arrival.mp4"], ["Zodiac.mp4"]]
+
+
+def test_watcher_skips_rejected_files(tmp_path: Path) -> None:
+    """
+    Test that a file the importer moved back is only imported again once
+    it changed.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        Temporary path
+    """
+    imports = Imports()
+    (tmp_path / "imports").mkdir()
+    (tmp_path / "movies").mkdir()
+
+    def start_import(files: List[str]) -> None:
+        # Like the importer moving a rejected file back
+        for file in files:
+            os.rename(tmp_path / "imports" / file, tmp_path / "movies" / file)
+            os.rename(tmp_path / "movies" / file, tmp_path / "imports" / file)
+        imports(files)
+
+    (tmp_path / "imports" / "Arrival.mp4").write_bytes(b"a")
+    watcher = ImportWatcher(
+        path=(tmp_path / "imports").as_posix(),
+        start_import=start_import,
+        settle=0.05,
+        interval=0.05,
+        source=InotifySource,
+    )
+    watcher.start()
+    try:
+        assert imports.wait() == ["Arrival.mp4"]
+        time.sleep(0.5)
+        assert len(imports.calls) == 1
+        (tmp_path / "imports" / "Arrival.mp4").write_bytes(b"arrival")
+        assert imports.wait() == ["Arrival.mp4"]
+    finally:
+        watcher.stop()
+    assert len(imports.calls) == 2